@@ -5,6 +5,8 @@ from .tasks import update_status
 @admin.register(Booking)
 class BookingAdmin(admin.ModelAdmin):
     list_display = ('id', 'status', 'start_date', 'end_date')
+    # __str__ (used by the row checkboxes) reads the customer's user and the vehicle
+    list_select_related = ('customer__user', 'vehicle')
 
     actions = ['run_update_status_task']
 
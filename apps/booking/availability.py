@@ -0,0 +1,263 @@
+from collections import defaultdict
+from datetime import timedelta
+from django.db import transaction
+from apps.vehicle.cache import availability_cache
+from .models import Booking, VehicleOccupancy
+from .enums import ACTIVE_BOOKING_STATUSES
+
+
+class DayBitmap:
+    """
+    Set of calendar days stored as an integer bitmask.
+
+    Bit ``i`` is set when the day ``origin + i`` is occupied. The bitmap is
+    kept normalized (bit 0 is always set) so it never grows beyond the span
+    between the first and the last occupied day.
+    """
+
+    def __init__(self, origin=None, bits=0):
+        self.origin = origin
+        self.bits = bits if origin else 0
+
+    @classmethod
+    def from_bytes(cls, origin, data):
+        return cls(origin, int.from_bytes(bytes(data or b''), 'little'))
+
+    def to_bytes(self):
+        return self.bits.to_bytes((self.bits.bit_length() + 7) // 8, 'little')
+
+    @property
+    def last_day(self):
+        if not self.bits:
+            return None
+        return self.origin + timedelta(days=self.bits.bit_length() - 1)
+
+    def mask(self, start_date, end_date):
+        """
+        Bitmask of the days [start_date, end_date] relative to `origin`,
+        clipped to the days this bitmap can represent.
+        """
+        if not self.origin or end_date < start_date:
+            return 0
+        low = max((start_date - self.origin).days, 0)
+        high = (end_date - self.origin).days
+        if high < low:
+            return 0
+        return ((1 << (high - low + 1)) - 1) << low
+
+    def intersects(self, start_date, end_date):
+        return bool(self.bits & self.mask(start_date, end_date))
+
+    def add(self, start_date, end_date):
+        if end_date < start_date:
+            return
+        if not self.bits:
+            self.origin = start_date
+        elif start_date < self.origin:
+            self.bits <<= (self.origin - start_date).days
+            self.origin = start_date
+        self.bits |= self.mask(start_date, end_date)
+
+    def discard(self, start_date, end_date):
+        self.bits &= ~self.mask(start_date, end_date)
+        self._normalize()
+
+    def _normalize(self):
+        if not self.bits:
+            self.origin = None
+            return
+        shift = (self.bits & -self.bits).bit_length() - 1
+        if shift:
+            self.bits >>= shift
+            self.origin += timedelta(days=shift)
+
+    def __eq__(self, other):
+        return isinstance(other, DayBitmap) and (self.origin, self.bits) == (other.origin, other.bits)
+
+
+class AvailabilityIndex:
+    """
+    Per-vehicle day-bitmap index of PENDING / CONFIRMED occupancy.
+
+    Overlap questions ("is vehicle X free between A and B", "which vehicles
+    are busy between A and B") are answered with bitwise operations on the
+    `VehicleOccupancy` rows instead of range scans over `Booking`.
+
+    The index is updated incrementally from booking signals and from the
+    bulk status updates in `tasks.py`; `rebuild` and `check` recompute it
+    from the ORM. Every change also invalidates the cached availability
+    results of the months it touches.
+    """
+
+    def apply(self, occupy=(), release=()):
+        """
+        Apply occupancy changes in one locked pass.
+
+        Args:
+            occupy: Iterable of (vehicle_id, start_date, end_date) to mark busy.
+            release: Iterable of (vehicle_id, start_date, end_date) to mark free.
+                Releases are applied before occupations so a booking that
+                moves within the same vehicle keeps its new days.
+        """
+        changes = defaultdict(lambda: ([], []))
+        for vehicle_id, start_date, end_date in release:
+            changes[vehicle_id][0].append((start_date, end_date))
+        for vehicle_id, start_date, end_date in occupy:
+            changes[vehicle_id][1].append((start_date, end_date))
+        if not changes:
+            return
+
+        with transaction.atomic():
+            # Make sure every row exists so all writers serialize on its lock
+            VehicleOccupancy.objects.bulk_create(
+                [VehicleOccupancy(vehicle_id=vehicle_id) for vehicle_id in changes],
+                ignore_conflicts=True,
+            )
+            rows = list(
+                VehicleOccupancy.objects.select_for_update()
+                .filter(vehicle_id__in=changes.keys())
+                .order_by('vehicle_id')
+            )
+            for row in rows:
+                released, occupied = changes[row.vehicle_id]
+                bitmap = DayBitmap.from_bytes(row.first_day, row.bitmap)
+                for start_date, end_date in released:
+                    bitmap.discard(start_date, end_date)
+                for start_date, end_date in occupied:
+                    bitmap.add(start_date, end_date)
+                self._store(row, bitmap)
+            VehicleOccupancy.objects.bulk_update(rows, ['first_day', 'last_day', 'bitmap'])
+            availability_cache.invalidate_dates(
+                day_range for released, occupied in changes.values() for day_range in released + occupied
+            )
+
+    def occupy(self, vehicle_id, start_date, end_date):
+        self.apply(occupy=[(vehicle_id, start_date, end_date)])
+
+    def release(self, vehicle_id, start_date, end_date):
+        self.apply(release=[(vehicle_id, start_date, end_date)])
+
+    def busy_vehicle_ids(self, start_date, end_date, vehicle_ids=None):
+        """
+        Return the ids of vehicles holding at least one day in
+        [start_date, end_date] (both inclusive).
+        """
+        rows = VehicleOccupancy.objects.filter(first_day__lte=end_date, last_day__gte=start_date)
+        if vehicle_ids is not None:
+            rows = rows.filter(vehicle_id__in=vehicle_ids)
+        return {
+            vehicle_id
+            for vehicle_id, first_day, data in rows.values_list('vehicle_id', 'first_day', 'bitmap')
+            if DayBitmap.from_bytes(first_day, data).intersects(start_date, end_date)
+        }
+
+    def is_available(self, vehicle_id, start_date, end_date, ignore=None):
+        """
+        Check whether a vehicle is free for every day in [start_date, end_date].
+
+        Args:
+            ignore (Booking): Optional booking being edited; the days it
+                currently holds do not count as a conflict.
+        """
+        row = VehicleOccupancy.objects.filter(vehicle_id=vehicle_id).values_list('first_day', 'bitmap').first()
+        if not row:
+            return True
+        bitmap = DayBitmap.from_bytes(*row)
+        held = getattr(ignore, '_loaded_occupancy', None)
+        if held and held[0] == vehicle_id:
+            bitmap.discard(held[1], held[2])
+        return not bitmap.intersects(start_date, end_date)
+
+    def rebuild(self, vehicle_ids=None):
+        """
+        Recompute index rows from the Booking table.
+
+        Args:
+            vehicle_ids: Optional iterable restricting the rebuild; by
+                default the whole index is replaced.
+
+        Returns:
+            int: Number of non-empty rows written.
+        """
+        if vehicle_ids is not None:
+            vehicle_ids = list(vehicle_ids)
+        expected = self.expected_bitmaps(vehicle_ids)
+        with transaction.atomic():
+            stale = VehicleOccupancy.objects.all()
+            if vehicle_ids is None:
+                availability_cache.invalidate_all()
+            else:
+                stale = stale.filter(vehicle_id__in=vehicle_ids)
+                availability_cache.invalidate_dates(self._changed_spans(stale, expected))
+            stale.delete()
+            rows = []
+            for vehicle_id, bitmap in expected.items():
+                row = VehicleOccupancy(vehicle_id=vehicle_id)
+                self._store(row, bitmap)
+                rows.append(row)
+            VehicleOccupancy.objects.bulk_create(rows, batch_size=1000)
+        return len(rows)
+
+    @staticmethod
+    def _changed_spans(stored, expected):
+        """
+        Yield the (first_day, last_day) spans, old and new, of every stored
+        row whose bitmap differs from the expected one.
+        """
+        seen = set()
+        for vehicle_id, first_day, data in stored.values_list('vehicle_id', 'first_day', 'bitmap'):
+            seen.add(vehicle_id)
+            bitmap = DayBitmap.from_bytes(first_day, data)
+            if bitmap == expected.get(vehicle_id, DayBitmap()):
+                continue
+            for changed in (bitmap, expected.get(vehicle_id)):
+                if changed and changed.bits:
+                    yield changed.origin, changed.last_day
+        for vehicle_id, bitmap in expected.items():
+            if vehicle_id not in seen:
+                yield bitmap.origin, bitmap.last_day
+
+    def check(self, vehicle_ids=None):
+        """
+        Compare the stored index with the ORM result.
+
+        Returns:
+            list[int]: Ids of vehicles whose stored bitmap differs from the
+            one computed from their active bookings.
+        """
+        expected = self.expected_bitmaps(vehicle_ids)
+        stored = VehicleOccupancy.objects.exclude(first_day=None)
+        if vehicle_ids is not None:
+            stored = stored.filter(vehicle_id__in=list(vehicle_ids))
+        actual = {
+            vehicle_id: DayBitmap.from_bytes(first_day, data)
+            for vehicle_id, first_day, data in stored.values_list('vehicle_id', 'first_day', 'bitmap')
+        }
+        return sorted(
+            vehicle_id
+            for vehicle_id in expected.keys() | actual.keys()
+            if expected.get(vehicle_id) != actual.get(vehicle_id)
+        )
+
+    def expected_bitmaps(self, vehicle_ids=None):
+        """
+        Build {vehicle_id: DayBitmap} from the active bookings in the database.
+        """
+        bookings = Booking.objects.filter(status__in=ACTIVE_BOOKING_STATUSES)
+        if vehicle_ids is not None:
+            bookings = bookings.filter(vehicle_id__in=list(vehicle_ids))
+        bitmaps = defaultdict(DayBitmap)
+        for vehicle_id, start_date, end_date in bookings.values_list(
+            'vehicle_id', 'start_date', 'end_date'
+        ).iterator(chunk_size=5000):
+            bitmaps[vehicle_id].add(start_date, end_date)
+        return {vehicle_id: bitmap for vehicle_id, bitmap in bitmaps.items() if bitmap.bits}
+
+    @staticmethod
+    def _store(row, bitmap):
+        row.first_day = bitmap.origin
+        row.last_day = bitmap.last_day
+        row.bitmap = bitmap.to_bytes()
+
+
+availability_index = AvailabilityIndex()
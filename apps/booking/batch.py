@@ -0,0 +1,180 @@
+from collections import defaultdict
+from django.db import transaction, DatabaseError
+from django.dispatch import Signal
+from apps.vehicle.models import Vehicle
+from .availability import availability_index
+from .enums import ACTIVE_BOOKING_STATUSES
+from .models import Booking, is_overlap_violation
+
+
+CREATED = "created"
+CONFLICT = "conflict"
+INVALID = "invalid"
+SKIPPED = "skipped"
+
+UNAVAILABLE_ERROR = {"error": "This vehicle is not available in the selected period."}
+
+# Sent with `bookings` (the created rows) after a batch bulk_create,
+# inside its transaction; bulk_create sends no post_save.
+bookings_created = Signal()
+
+
+class BookingBatch:
+    """
+    Create many bookings in a single pass.
+
+    Instead of one overlap query, one vehicle fetch and one INSERT per
+    booking, the batch:
+        1. loads every requested vehicle in one query,
+        2. loads the active bookings of those vehicles that overlap the
+           batch's date span in one query,
+        3. detects conflicts with the database and between batch items with
+           a sort-and-sweep per vehicle,
+        4. inserts the valid rows with one `bulk_create` in one transaction.
+
+    Within the batch, when two items overlap the one starting first wins.
+
+    Args:
+        items (list[dict]): Validated items, each with `index`, `customer`
+            (Customer), `vehicle` (id), `start_date`, `end_date`,
+            `payment_method` and optional `notes`.
+        all_or_nothing (bool): If True, nothing is created unless every
+            item can be created.
+        rejected (dict): Results of items already rejected by the caller
+            (e.g. failed validation), keyed by index.
+    """
+
+    def __init__(self, items, all_or_nothing=False, rejected=None):
+        self.items = items
+        self.all_or_nothing = all_or_nothing
+        self.results = dict(rejected or {})
+
+    def run(self):
+        """
+        Returns:
+            tuple(list[dict], list[Booking]): Per-item results ordered by
+            `index`, and the created bookings.
+        """
+        vehicles = Vehicle.objects.in_bulk({item['vehicle'] for item in self.items})
+        candidates = []
+        for item in self.items:
+            if item['vehicle'] in vehicles:
+                candidates.append(item)
+            else:
+                self._fail(item, INVALID, {"vehicle": "Vehicle not found."})
+
+        accepted = self._sweep(candidates)
+        if self.all_or_nothing and self.results:
+            for item in accepted:
+                self.results[item['index']] = {"index": item['index'], "status": SKIPPED}
+            return self._sorted_results(), []
+
+        bookings = [self._build(item, vehicles[item['vehicle']]) for item in accepted]
+        created = self._insert(accepted, bookings)
+        return self._sorted_results(), created
+
+    def _sweep(self, candidates):
+        """
+        Per vehicle, sort candidates by start date and sweep them against
+        the existing active bookings and the candidates already accepted.
+        Returns the accepted candidates.
+        """
+        if not candidates:
+            return []
+        by_vehicle = defaultdict(list)
+        for item in candidates:
+            by_vehicle[item['vehicle']].append(item)
+
+        existing = defaultdict(list)
+        for vehicle_id, start_date, end_date in Booking.objects.filter(
+            vehicle_id__in=by_vehicle.keys(),
+            status__in=ACTIVE_BOOKING_STATUSES,
+            start_date__lte=max(item['end_date'] for item in candidates),
+            end_date__gte=min(item['start_date'] for item in candidates),
+        ).order_by('vehicle_id', 'start_date').values_list('vehicle_id', 'start_date', 'end_date'):
+            existing[vehicle_id].append((start_date, end_date))
+
+        accepted = []
+        for vehicle_id, items in by_vehicle.items():
+            booked = existing[vehicle_id]
+            position = 0
+            last = None
+            for item in sorted(items, key=lambda item: (item['start_date'], item['index'])):
+                # Active bookings never overlap each other, so sorted by start
+                # they are also sorted by end: skip those ending before this item.
+                while position < len(booked) and booked[position][1] < item['start_date']:
+                    position += 1
+                if position < len(booked) and booked[position][0] <= item['end_date']:
+                    self._fail(item, CONFLICT, UNAVAILABLE_ERROR)
+                elif last and item['start_date'] <= last['end_date']:
+                    self._fail(item, CONFLICT, {
+                        "error": f"Overlaps booking #{last['index']} of this batch for the same vehicle."
+                    })
+                else:
+                    accepted.append(item)
+                    last = item
+        return sorted(accepted, key=lambda item: item['index'])
+
+    def _insert(self, accepted, bookings):
+        if not bookings:
+            return []
+        try:
+            with transaction.atomic():
+                created = Booking.objects.bulk_create(bookings)
+                availability_index.apply(occupy=[booking.occupied_range() for booking in created])
+                bookings_created.send(sender=Booking, bookings=created)
+        except DatabaseError as error:
+            # A concurrent request booked one of the vehicles after the sweep
+            if not is_overlap_violation(error):
+                raise
+            if self.all_or_nothing:
+                for item in accepted:
+                    self._fail(item, CONFLICT, UNAVAILABLE_ERROR)
+                return []
+            created = self._insert_one_by_one(accepted, bookings)
+        else:
+            for item, booking in zip(accepted, created):
+                self._succeed(item, booking)
+        return created
+
+    def _insert_one_by_one(self, accepted, bookings):
+        created = []
+        for item, booking in zip(accepted, bookings):
+            try:
+                with transaction.atomic():
+                    booking.save()
+            except DatabaseError as error:
+                if not is_overlap_violation(error):
+                    raise
+                self._fail(item, CONFLICT, UNAVAILABLE_ERROR)
+            else:
+                created.append(booking)
+                self._succeed(item, booking)
+        return created
+
+    @staticmethod
+    def _build(item, vehicle):
+        booking = Booking(
+            customer=item['customer'],
+            vehicle=vehicle,
+            start_date=item['start_date'],
+            end_date=item['end_date'],
+            payment_method=item['payment_method'],
+            notes=item.get('notes'),
+        )
+        booking.total_price = booking.computed_total_price
+        return booking
+
+    def _succeed(self, item, booking):
+        self.results[item['index']] = {
+            "index": item['index'],
+            "status": CREATED,
+            "id": booking.pk,
+            "total_price": booking.total_price,
+        }
+
+    def _fail(self, item, status, errors):
+        self.results[item['index']] = {"index": item['index'], "status": status, "errors": errors}
+
+    def _sorted_results(self):
+        return [self.results[index] for index in sorted(self.results)]
@@ -7,6 +7,10 @@ class BookingStatus(Enum):
     COMPLETED = "completed"
 
 
+# Statuses that hold the vehicle for the booked days
+ACTIVE_BOOKING_STATUSES = (BookingStatus.PENDING.value, BookingStatus.CONFIRMED.value)
+
+
 class PaymentMethod(Enum):
     CASH = "cash"
     CLIQ = "cliq"
\ No newline at end of file
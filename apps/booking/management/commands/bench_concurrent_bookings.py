@@ -0,0 +1,113 @@
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from apps.booking.enums import ACTIVE_BOOKING_STATUSES
+from apps.booking.models import Booking
+from apps.booking.serializers import BookingSerializer
+from apps.vehicle.models import Vehicle
+
+
+class Command(BaseCommand):
+    """
+    Concurrent-insert benchmark for the booking overlap constraint.
+
+    Several threads create bookings through BookingSerializer for a small
+    pool of vehicles over a short horizon, so most attempts collide.
+    Reports throughput and verifies that no vehicle ends up double-booked.
+    Benchmark vehicles, their bookings and the benchmark user are deleted
+    afterwards unless --keep is given.
+
+    Usage:
+        python manage.py bench_concurrent_bookings --threads 16 --attempts 200
+    """
+    help = "Benchmark concurrent booking inserts and check for double bookings."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help="Concurrent writer threads.")
+        parser.add_argument('--attempts', type=int, default=100, help="Booking attempts per thread.")
+        parser.add_argument('--vehicles', type=int, default=5, help="Vehicles competing for bookings.")
+        parser.add_argument('--horizon', type=int, default=60, help="Days ahead bookings may start.")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--keep', action='store_true', help="Keep the generated data.")
+
+    def handle(self, *args, **options):
+        user = User.objects.create_user(username=f"bench-{time.time_ns()}", password=None)
+        customer = user.customer
+        vehicles = Vehicle.objects.bulk_create([
+            Vehicle(
+                brand="Bench",
+                model=f"Model {index}",
+                year=2020,
+                daily_rate=50,
+                plate_number=f"B{time.time_ns() % 10 ** 12}{index}"[:20],
+            )
+            for index in range(options['vehicles'])
+        ])
+        vehicle_ids = [vehicle.id for vehicle in vehicles]
+
+        def worker(thread_number):
+            rng = random.Random(options['seed'] + thread_number)
+            today = timezone.localdate()
+            created = conflicts = 0
+            try:
+                for _ in range(options['attempts']):
+                    start_date = today + timedelta(days=rng.randrange(options['horizon']))
+                    serializer = BookingSerializer(data={
+                        "vehicle": rng.choice(vehicle_ids),
+                        "start_date": start_date,
+                        "end_date": start_date + timedelta(days=rng.randrange(5)),
+                    })
+                    serializer.is_valid(raise_exception=True)
+                    try:
+                        serializer.save(customer=customer)
+                        created += 1
+                    except ValidationError:
+                        conflicts += 1
+            finally:
+                connection.close()
+            return created, conflicts
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['threads']) as executor:
+            results = list(executor.map(worker, range(options['threads'])))
+        elapsed = time.perf_counter() - started
+
+        created = sum(result[0] for result in results)
+        conflicts = sum(result[1] for result in results)
+        attempts = created + conflicts
+        double_bookings = self.count_double_bookings(vehicle_ids)
+
+        self.stdout.write(
+            f"threads={options['threads']} attempts={attempts} created={created} conflicts={conflicts}\n"
+            f"elapsed={elapsed:.2f}s throughput={attempts / elapsed:.1f} attempts/s\n"
+            f"double_bookings={double_bookings}"
+        )
+
+        if not options['keep']:
+            Vehicle.objects.filter(id__in=vehicle_ids).delete()
+            user.delete()
+
+        if double_bookings:
+            self.stderr.write(self.style.ERROR("Double bookings detected!"))
+        else:
+            self.stdout.write(self.style.SUCCESS("No double bookings."))
+
+    @staticmethod
+    def count_double_bookings(vehicle_ids):
+        """
+        Count active bookings overlapping another active booking of the same vehicle.
+        """
+        active = Booking.objects.filter(vehicle_id__in=vehicle_ids, status__in=ACTIVE_BOOKING_STATUSES)
+        overlapping = active.filter(
+            vehicle_id=OuterRef('vehicle_id'),
+            start_date__lte=OuterRef('end_date'),
+            end_date__gte=OuterRef('start_date'),
+        ).exclude(pk=OuterRef('pk'))
+        return active.filter(Exists(overlapping)).count()
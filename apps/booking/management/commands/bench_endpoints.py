@@ -0,0 +1,316 @@
+import json
+import platform
+import resource
+import statistics
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from itertools import count
+import django
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from apps.booking.availability import availability_index
+from apps.booking.enums import BookingStatus
+from apps.booking.models import Booking
+from apps.customer.models import Customer
+from apps.report.rollup import booking_rollup
+from apps.vehicle.models import Vehicle
+
+
+STATUSES = [status.value for status in BookingStatus]
+
+
+def percentiles(timings):
+    """
+    p50 / p95 / p99 / mean / max of a list of latencies in ms.
+    """
+    if len(timings) == 1:
+        cuts = timings * 99
+    else:
+        cuts = statistics.quantiles(timings, n=100, method='inclusive')
+    return {
+        "p50": round(cuts[49], 3),
+        "p95": round(cuts[94], 3),
+        "p99": round(cuts[98], 3),
+        "mean": round(statistics.fmean(timings), 3),
+        "max": round(max(timings), 3),
+    }
+
+
+class Command(BaseCommand):
+    """
+    Latency benchmark of the hot endpoints, in-process through the test client.
+
+    Seeds --vehicles, --customers and --bookings (non-overlapping bookings
+    spread over the past and the coming months, mixed statuses), then sends
+    --iterations requests to each endpoint:
+
+    - sequentially: latency percentiles, queries per request and the peak
+      Python memory of one request (tracemalloc);
+    - from --threads threads at once (when > 1): percentiles and throughput.
+
+    The results are written as JSON to --output. With --baseline, p95
+    latencies and query counts are compared to a previous run's JSON and
+    the command fails when one regresses by more than --max-regression
+    percent (or issues more queries). Seeded rows are deleted afterwards
+    unless --keep is given.
+
+    Usage:
+        python manage.py bench_endpoints --vehicles 2000 --bookings 20000 --iterations 200 --threads 8 \\
+            --output bench.json --baseline baseline.json
+    """
+    help = "Benchmark latency, queries and memory of the hot API and report endpoints."
+
+    # name -> (method, path builder, body builder)
+    ENDPOINTS = {
+        "vehicle-list": ('get', lambda bench: "/api/vehicles/", None),
+        "vehicle-available": ('get', lambda bench: f"/api/vehicles/available/?{bench.window}", None),
+        "booking-list": ('get', lambda bench: "/api/bookings/", None),
+        "booking-create": ('post', lambda bench: "/api/bookings/", lambda bench: bench.next_booking()),
+        "report-dashboard": ('get', lambda bench: "/reports/dashboard/", None),
+        "report-bookings": ('get', lambda bench: "/reports/bookings/", None),
+        "report-bookings-pdf": ('get', lambda bench: "/reports/bookings/pdf/", None),
+        "report-vehicle-utilization-pdf": ('get', lambda bench: "/reports/vehicle-utilization/pdf/", None),
+    }
+
+    def add_arguments(self, parser):
+        parser.add_argument('--vehicles', type=int, default=500)
+        parser.add_argument('--customers', type=int, default=200)
+        parser.add_argument('--bookings', type=int, default=5000)
+        parser.add_argument('--iterations', type=int, default=50, help="Requests per endpoint and phase.")
+        parser.add_argument('--warmup', type=int, default=3, help="Untimed requests per endpoint.")
+        parser.add_argument('--threads', type=int, default=4, help="Threads of the concurrent phase (1 to skip it).")
+        parser.add_argument('--endpoints', nargs='+', choices=sorted(self.ENDPOINTS), help="Only these endpoints.")
+        parser.add_argument('--output', help="Write the results as JSON to this file.")
+        parser.add_argument('--baseline', help="Compare with the JSON of a previous run.")
+        parser.add_argument('--max-regression', type=float, default=20.0, help="Allowed p95 regression in percent.")
+        parser.add_argument('--keep', action='store_true', help="Keep the generated data.")
+
+    def handle(self, *args, **options):
+        self.prefix = f"bench{time.time_ns() % 10 ** 10}"
+        today = timezone.localdate()
+        self.window = f"start_date={today + timedelta(days=7)}&end_date={today + timedelta(days=9)}"
+        self.admin = User.objects.create_superuser(username=f"{self.prefix}-admin", password=None)
+        self.lock = threading.Lock()
+        self.clients = threading.local()
+        try:
+            seeded = self.seed(options['vehicles'], options['customers'], options['bookings'])
+            self.write_vehicle, self.write_customer = seeded['vehicle'], seeded['customer']
+            self.write_days = count(1)
+            results = {
+                "meta": {
+                    "vehicles": options['vehicles'],
+                    "customers": options['customers'],
+                    "bookings": options['bookings'],
+                    "iterations": options['iterations'],
+                    "threads": options['threads'],
+                    "started_at": timezone.now().isoformat(),
+                    "python": platform.python_version(),
+                    "django": django.get_version(),
+                },
+                "endpoints": {},
+            }
+            for name in options['endpoints'] or self.ENDPOINTS:
+                results["endpoints"][name] = self.bench(name, options)
+                self.report(name, results["endpoints"][name])
+            results["meta"]["peak_rss_kib"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        finally:
+            if not options['keep']:
+                self.cleanup()
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(results, output, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+        if options['baseline']:
+            self.compare(results, options['baseline'], options['max_regression'])
+
+    def seed(self, vehicles, customers, bookings):
+        """
+        Bulk-create the benchmark data and rebuild the availability index
+        and the report rollup.
+
+        Returns:
+            dict: The vehicle and customer used by booking-create (no other
+            bookings, so created bookings never overlap).
+        """
+        created_vehicles = Vehicle.objects.bulk_create(
+            (
+                Vehicle(brand="Bench", model=f"Model {index % 20}", year=2015 + index % 10,
+                        daily_rate=30 + index % 50, plate_number=f"{self.prefix}-{index}")
+                for index in range(vehicles + 1)
+            ),
+            batch_size=5000,
+        )
+        users = User.objects.bulk_create(
+            (User(username=f"{self.prefix}-{index}") for index in range(customers + 1)),
+            batch_size=5000,
+        )
+        created_customers = Customer.objects.bulk_create(
+            (Customer(user=user, phone_number="0790000000") for user in users),
+            batch_size=5000,
+        )
+        write_vehicle, fleet = created_vehicles[0], created_vehicles[1:]
+        write_customer, renters = created_customers[0], created_customers[1:]
+
+        # Consecutive 3-day bookings per vehicle, from ~6 months ago onwards
+        first_day = timezone.localdate() - timedelta(days=180)
+        Booking.objects.bulk_create(
+            (
+                Booking(
+                    vehicle=fleet[index % len(fleet)],
+                    customer=renters[index % len(renters)],
+                    start_date=first_day + timedelta(days=4 * (index // len(fleet))),
+                    end_date=first_day + timedelta(days=4 * (index // len(fleet)) + 2),
+                    total_price=3 * fleet[index % len(fleet)].daily_rate,
+                    status=STATUSES[index % len(STATUSES)],
+                )
+                for index in range(bookings)
+            ),
+            batch_size=5000,
+        )
+        with connection.cursor() as cursor:
+            for model in (Vehicle, Customer, Booking):
+                cursor.execute(f"ANALYZE {model._meta.db_table}")
+        availability_index.rebuild()
+        booking_rollup.rebuild(vehicle.id for vehicle in fleet)
+        return {"vehicle": write_vehicle, "customer": write_customer}
+
+    def cleanup(self):
+        Vehicle.objects.filter(plate_number__startswith=f"{self.prefix}-").delete()
+        User.objects.filter(username__startswith=f"{self.prefix}-").delete()
+
+    def client(self):
+        """
+        One authenticated client per thread (API token and admin session).
+        """
+        client = getattr(self.clients, 'client', None)
+        if client is None:
+            client = self.clients.client = APIClient()
+            client.force_authenticate(self.admin)
+            client.force_login(self.admin)
+        return client
+
+    def next_booking(self):
+        """
+        Body of a booking that does not overlap any previous one.
+        """
+        with self.lock:
+            day = timezone.localdate() + timedelta(days=1000 + next(self.write_days))
+        return {"customer": self.write_customer.id, "vehicle": self.write_vehicle.id,
+                "start_date": str(day), "end_date": str(day)}
+
+    def request(self, name):
+        method, path, body = self.ENDPOINTS[name]
+        response = getattr(self.client(), method)(path(self), body(self) if body else None, format='json')
+        if getattr(response, 'streaming', False):
+            b"".join(response.streaming_content)
+        return response.status_code
+
+    def timed(self, name):
+        started = time.perf_counter()
+        status = self.request(name)
+        return (time.perf_counter() - started) * 1000, status
+
+    def bench(self, name, options):
+        for _ in range(options['warmup']):
+            self.request(name)
+
+        timings, queries, errors = [], [], 0
+        for _ in range(options['iterations']):
+            with CaptureQueriesContext(connection) as captured:
+                elapsed, status = self.timed(name)
+            timings.append(elapsed)
+            queries.append(len(captured))
+            errors += status >= 400
+
+        tracemalloc.start()
+        try:
+            self.request(name)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        result = {
+            "sequential": {**percentiles(timings), "requests": len(timings), "errors": errors},
+            "queries_per_request": statistics.median(queries),
+            "peak_memory_kib": round(peak / 1024, 1),
+        }
+        if options['threads'] > 1:
+            result["concurrent"] = self.bench_concurrent(name, options['iterations'], options['threads'])
+        return result
+
+    def bench_concurrent(self, name, iterations, threads):
+        def worker(share):
+            samples = []
+            try:
+                for _ in range(share):
+                    samples.append(self.timed(name))
+            finally:
+                connection.close()
+            return samples
+
+        shares = [iterations // threads + (index < iterations % threads) for index in range(threads)]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            samples = [sample for result in executor.map(worker, shares) for sample in result]
+        elapsed = time.perf_counter() - started
+        return {
+            **percentiles([timing for timing, _ in samples]),
+            "requests": len(samples),
+            "errors": sum(status >= 400 for _, status in samples),
+            "throughput_rps": round(len(samples) / elapsed, 1),
+        }
+
+    def report(self, name, result):
+        sequential = result["sequential"]
+        line = (
+            f"{name:>32}: p50={sequential['p50']:.2f}ms p95={sequential['p95']:.2f}ms p99={sequential['p99']:.2f}ms "
+            f"queries={result['queries_per_request']:g} peak_mem={result['peak_memory_kib']:.0f}KiB"
+        )
+        if "concurrent" in result:
+            concurrent = result["concurrent"]
+            line += f" | concurrent p95={concurrent['p95']:.2f}ms {concurrent['throughput_rps']:.1f} req/s"
+        errors = sequential["errors"] + result.get("concurrent", {}).get("errors", 0)
+        if errors:
+            line += self.style.ERROR(f" errors={errors}")
+        self.stdout.write(line)
+
+    def compare(self, results, baseline_path, max_regression):
+        """
+        Compare p95 latencies and query counts with a stored run.
+
+        A baseline p95 of 0 (below the timer resolution) has no meaningful
+        relative change, so it is never reported as a latency regression.
+
+        Raises:
+            CommandError: When an endpoint regressed beyond `max_regression`
+                percent or issues more queries than in the baseline.
+        """
+        with open(baseline_path) as baseline_file:
+            baseline = json.load(baseline_file)["endpoints"]
+        regressions = []
+        for name, result in results["endpoints"].items():
+            if name not in baseline:
+                continue
+            before, after = baseline[name], result
+            before_p95, after_p95 = before["sequential"]["p95"], after["sequential"]["p95"]
+            change = (after_p95 - before_p95) / before_p95 * 100 if before_p95 else None
+            self.stdout.write(
+                f"{name:>32}: p95 {before_p95:.2f}ms -> {after_p95:.2f}ms "
+                f"({'n/a' if change is None else f'{change:+.1f}%'}), "
+                f"queries {before['queries_per_request']:g} -> {after['queries_per_request']:g}"
+            )
+            if change is not None and change > max_regression:
+                regressions.append(f"{name}: p95 {change:+.1f}%")
+            if after["queries_per_request"] > before["queries_per_request"]:
+                regressions.append(f"{name}: {after['queries_per_request']:g} queries (was {before['queries_per_request']:g})")
+        if regressions:
+            raise CommandError("Regressions against the baseline:\n" + "\n".join(regressions))
+        self.stdout.write(self.style.SUCCESS("No regression against the baseline."))
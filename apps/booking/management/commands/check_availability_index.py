@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+from apps.booking.availability import availability_index
+
+
+class Command(BaseCommand):
+    """
+    Compare the availability index with the occupancy computed by the ORM
+    from active bookings. Exits with an error when they differ.
+
+    Usage:
+        python manage.py check_availability_index
+        python manage.py check_availability_index --fix
+    """
+    help = "Check the availability index against the Booking table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            help="Rebuild the rows of vehicles found out of sync.",
+        )
+
+    def handle(self, *args, **options):
+        mismatched = availability_index.check()
+        if not mismatched:
+            self.stdout.write(self.style.SUCCESS("Availability index is consistent."))
+            return
+
+        ids = ", ".join(str(vehicle_id) for vehicle_id in mismatched)
+        if options['fix']:
+            availability_index.rebuild(vehicle_ids=mismatched)
+            self.stdout.write(self.style.WARNING(f"Rebuilt {len(mismatched)} out-of-sync vehicles: {ids}"))
+            return
+        raise CommandError(f"Availability index out of sync for {len(mismatched)} vehicles: {ids}")
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from apps.booking.availability import availability_index
+
+
+class Command(BaseCommand):
+    """
+    Rebuild the day-bitmap availability index from the Booking table.
+
+    Usage:
+        python manage.py rebuild_availability_index
+        python manage.py rebuild_availability_index --vehicle 3 --vehicle 7
+    """
+    help = "Rebuild the per-vehicle availability index from active bookings."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--vehicle',
+            action='append',
+            type=int,
+            dest='vehicle_ids',
+            help="Only rebuild the given vehicle id (can be repeated).",
+        )
+
+    def handle(self, *args, **options):
+        count = availability_index.rebuild(vehicle_ids=options['vehicle_ids'])
+        self.stdout.write(self.style.SUCCESS(f"Availability index rebuilt: {count} occupied vehicles."))
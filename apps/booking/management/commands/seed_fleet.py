@@ -0,0 +1,312 @@
+import multiprocessing
+import random
+import time
+from datetime import date, timedelta
+from itertools import islice
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+from django.utils import timezone
+from apps.booking.availability import availability_index
+from apps.booking.enums import BookingStatus, PaymentMethod
+from apps.booking.models import Booking
+from apps.customer.emums import CustomerStatus
+from apps.customer.models import Customer
+from apps.report.rollup import booking_rollup
+from apps.vehicle.enums import VehicleType
+from apps.vehicle.models import Vehicle
+
+
+# vehicle type -> (share of the fleet, daily rate range, {brand: models})
+CATALOGUE = {
+    VehicleType.CAR.value: (70, (25, 120), {
+        "Toyota": ["Corolla", "Camry", "Yaris"],
+        "Hyundai": ["Elantra", "Tucson", "Accent"],
+        "Kia": ["Rio", "Sportage", "Cerato"],
+        "Nissan": ["Sunny", "Altima"],
+        "BMW": ["320i", "X3"],
+        "Mercedes": ["C200", "E200"],
+    }),
+    VehicleType.VAN.value: (12, (60, 150), {
+        "Toyota": ["Hiace"],
+        "Ford": ["Transit"],
+        "Mercedes": ["Sprinter", "Vito"],
+        "Hyundai": ["H1"],
+    }),
+    VehicleType.TRUCK.value: (10, (80, 220), {
+        "Isuzu": ["NPR"],
+        "Mitsubishi": ["Canter"],
+        "Ford": ["F-150"],
+        "Toyota": ["Hilux"],
+    }),
+    VehicleType.MOTORBIKE.value: (8, (15, 60), {
+        "Honda": ["CBR500R", "PCX"],
+        "Yamaha": ["MT-07", "NMAX"],
+        "Vespa": ["Primavera"],
+    }),
+}
+
+# Booking status mix by when the booking happens relative to today
+PAST_STATUSES = ([BookingStatus.COMPLETED.value, BookingStatus.CANCELLED.value], [85, 15])
+CURRENT_STATUSES = ([BookingStatus.CONFIRMED.value, BookingStatus.CANCELLED.value], [90, 10])
+FUTURE_STATUSES = (
+    [BookingStatus.PENDING.value, BookingStatus.CONFIRMED.value, BookingStatus.CANCELLED.value], [40, 45, 15],
+)
+CUSTOMER_STATUSES = ([status.value for status in CustomerStatus], [70, 25, 5])
+PAYMENT_METHODS = [method.value for method in PaymentMethod]
+
+MAX_BOOKING_DAYS = 7
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+class Command(BaseCommand):
+    """
+    Generate a production-sized synthetic dataset.
+
+    - Vehicles of every VehicleType, with brands, models and daily rates
+      typical of their type.
+    - Users with their Customer profile. Users are bulk-created, so the
+      post_save signal that creates profiles one by one does not run; the
+      profiles are bulk-created alongside.
+    - Bookings over --years years up to --future-days days ahead. Each
+      vehicle's timeline is split into one slot per booking, so bookings
+      of a vehicle never overlap. Past bookings are completed or
+      cancelled, current ones confirmed, future ones pending, confirmed
+      or cancelled.
+
+    Rows are inserted with chunked bulk_create, one transaction per chunk;
+    bookings are generated and inserted by --workers forked processes, each
+    taking a group of vehicles at a time. The availability index of the
+    generated vehicles is rebuilt at the end.
+
+    The same --seed always produces the same dataset, whatever --workers
+    and --chunk-size are. Its rows are recognisable by their plate numbers
+    and usernames, and --clear removes them before generating again.
+
+    Usage:
+        python manage.py seed_fleet --vehicles 20000 --customers 500000 --bookings 5000000 --years 3
+    """
+    help = "Generate vehicles, customers and non-overlapping bookings at production scale."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--vehicles', type=int, default=1000)
+        parser.add_argument('--customers', type=int, default=10000)
+        parser.add_argument('--bookings', type=int, default=100000)
+        parser.add_argument('--years', type=int, default=3, help="Years of booking history.")
+        parser.add_argument('--future-days', type=int, default=90, help="Days ahead bookings may reach.")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--chunk-size', type=int, default=10000, help="Rows per bulk_create / transaction.")
+        parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count(),
+                            help="Processes inserting bookings in parallel.")
+        parser.add_argument('--clear', action='store_true', help="Delete the rows of a previous run with this seed first.")
+
+    def handle(self, *args, **options):
+        self.seed = options['seed']
+        self.rng = random.Random(self.seed)
+        self.chunk_size = options['chunk_size']
+        self.plate_prefix = f"S{options['seed']}-"
+        self.username_prefix = f"seed{options['seed']}-"
+        if options['vehicles'] < 1 or options['customers'] < 1:
+            raise CommandError("--vehicles and --customers must be at least 1.")
+
+        today = timezone.localdate()
+        first_day = today - timedelta(days=365 * options['years'])
+        last_day = today + timedelta(days=options['future_days'])
+        per_vehicle = -(-options['bookings'] // options['vehicles'])
+        if per_vehicle > (last_day - first_day).days + 1:
+            raise CommandError(
+                f"{per_vehicle} bookings per vehicle do not fit in {options['years']} years; "
+                f"increase --vehicles or --years."
+            )
+
+        if options['clear']:
+            self.clear()
+        elif Vehicle.objects.filter(plate_number__startswith=self.plate_prefix).exists():
+            raise CommandError(f"Seed {options['seed']} was already generated; use --clear to regenerate it.")
+
+        started = time.perf_counter()
+        vehicles = self.create_vehicles(options['vehicles'])
+        customer_ids = self.create_customers(options['customers'])
+        self.create_bookings(
+            vehicles, customer_ids, options['bookings'], first_day, last_day, today, options['workers'],
+        )
+
+        self.stdout.write("Rebuilding the availability index and the report rollup...")
+        availability_index.rebuild(vehicle_id for vehicle_id, _ in vehicles)
+        booking_rollup.rebuild(vehicle_id for vehicle_id, _ in vehicles)
+        with connection.cursor() as cursor:
+            for model in (Vehicle, User, Customer, Booking):
+                cursor.execute(f"ANALYZE {model._meta.db_table}")
+        self.stdout.write(self.style.SUCCESS(f"Done in {time.perf_counter() - started:.1f}s."))
+
+    def clear(self):
+        """
+        Delete a previous run's rows. Its bookings are removed with one
+        DELETE statement rather than loaded for the per-row delete signals,
+        since the availability index of its vehicles goes with them.
+        """
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"DELETE FROM {Booking._meta.db_table} WHERE vehicle_id IN "
+                    f"(SELECT id FROM {Vehicle._meta.db_table} WHERE plate_number LIKE %s)",
+                    [f"{self.plate_prefix}%"],
+                )
+            Vehicle.objects.filter(plate_number__startswith=self.plate_prefix).delete()
+            User.objects.filter(username__startswith=self.username_prefix).delete()
+
+    def insert(self, model, rows, total, label):
+        """
+        bulk_create `rows` in chunks, one transaction each, reporting progress.
+
+        Returns:
+            list: Primary keys of the created rows, in order.
+        """
+        ids, started = [], time.perf_counter()
+        for chunk in chunked(rows, self.chunk_size):
+            with transaction.atomic():
+                ids.extend(obj.pk for obj in model.objects.bulk_create(chunk))
+            self.progress(label, len(ids), total, started)
+        return ids
+
+    def progress(self, label, done, total, started):
+        self.stdout.write(f"{label}: {done}/{total} ({done / (time.perf_counter() - started):.0f} rows/s)")
+
+    def create_vehicles(self, count):
+        """
+        Returns:
+            list[tuple[int, Decimal]]: (id, daily_rate) of the created vehicles.
+        """
+        types = list(CATALOGUE)
+        weights = [CATALOGUE[vehicle_type][0] for vehicle_type in types]
+        vehicles = []
+        for index in range(count):
+            vehicle_type = self.rng.choices(types, weights)[0]
+            _, (low, high), brands = CATALOGUE[vehicle_type]
+            brand = self.rng.choice(list(brands))
+            vehicles.append(Vehicle(
+                brand=brand,
+                model=self.rng.choice(brands[brand]),
+                year=self.rng.randint(2012, 2025),
+                vehicle_type=vehicle_type,
+                daily_rate=self.rng.randint(low, high),
+                plate_number=f"{self.plate_prefix}{index:07d}",
+            ))
+        ids = self.insert(Vehicle, vehicles, count, "vehicles")
+        return [(vehicle_id, vehicle.daily_rate) for vehicle_id, vehicle in zip(ids, vehicles)]
+
+    def create_customers(self, count):
+        """
+        Returns:
+            list[int]: Ids of the created customers.
+        """
+        password = make_password(None)
+        users = (
+            User(username=f"{self.username_prefix}{index}", email=f"{self.username_prefix}{index}@example.com",
+                 password=password)
+            for index in range(count)
+        )
+        user_ids = self.insert(User, users, count, "users")
+        customers = (
+            Customer(
+                user_id=user_id,
+                phone_number=f"07{self.rng.randint(70000000, 99999999)}",
+                driver_license_number=f"DL{self.rng.randint(10 ** 8, 10 ** 9 - 1)}",
+                date_of_birth=date(1950, 1, 1) + timedelta(days=self.rng.randrange(365 * 55)),
+                status=self.rng.choices(*CUSTOMER_STATUSES)[0],
+            )
+            for user_id in user_ids
+        )
+        return self.insert(Customer, customers, count, "customers")
+
+    def create_bookings(self, vehicles, customer_ids, count, first_day, last_day, today, workers):
+        """
+        Insert bookings from `workers` processes, each job covering a group
+        of vehicles worth about one chunk of bookings.
+        """
+        per_vehicle, extra = divmod(count, len(vehicles))
+        group = max(1, self.chunk_size // max(per_vehicle, 1))
+        jobs = []
+        for begin in range(0, len(vehicles), group):
+            jobs.append([
+                (position, vehicle_id, daily_rate, per_vehicle + (position < extra))
+                for position, (vehicle_id, daily_rate) in enumerate(vehicles[begin:begin + group], start=begin)
+            ])
+        _shared.update(seed=self.seed, customer_ids=customer_ids, first_day=first_day, last_day=last_day, today=today)
+
+        done, started = 0, time.perf_counter()
+        if workers > 1:
+            # Forked workers inherit `_shared` and open their own connection
+            connections.close_all()
+            with multiprocessing.get_context('fork').Pool(workers) as pool:
+                results = pool.imap_unordered(insert_bookings, jobs)
+                for inserted in results:
+                    done += inserted
+                    self.progress("bookings", done, count, started)
+        else:
+            for job in jobs:
+                done += insert_bookings(job)
+                self.progress("bookings", done, count, started)
+
+
+# Read by insert_bookings (set before workers are forked)
+_shared = {}
+
+
+def insert_bookings(job):
+    """
+    Generate and insert the bookings of a group of vehicles in one transaction.
+
+    Args:
+        job: List of (position, vehicle_id, daily_rate, number of bookings).
+
+    Returns:
+        int: Number of bookings inserted.
+    """
+    bookings = [
+        booking
+        for position, vehicle_id, daily_rate, count in job
+        for booking in vehicle_bookings(position, vehicle_id, daily_rate, count, **_shared)
+    ]
+    with transaction.atomic():
+        Booking.objects.bulk_create(bookings)
+    return len(bookings)
+
+
+def vehicle_bookings(position, vehicle_id, daily_rate, count, seed, customer_ids, first_day, last_day, today):
+    """
+    Yield `count` unsaved, non-overlapping bookings of one vehicle.
+
+    The [first_day, last_day] timeline is cut into `count` slots; each
+    booking starts at a random day of its slot and ends within it. The
+    random generator depends only on the seed and the vehicle's position,
+    so the result does not depend on how the work is split.
+    """
+    rng = random.Random(f"{seed}-{position}")
+    slot = ((last_day - first_day).days + 1) // max(count, 1)
+    for number in range(count):
+        offset = rng.randrange(slot)
+        days = rng.randint(1, min(MAX_BOOKING_DAYS, slot - offset))
+        start_date = first_day + timedelta(days=number * slot + offset)
+        end_date = start_date + timedelta(days=days - 1)
+        if end_date < today:
+            statuses = PAST_STATUSES
+        elif start_date <= today:
+            statuses = CURRENT_STATUSES
+        else:
+            statuses = FUTURE_STATUSES
+        yield Booking(
+            vehicle_id=vehicle_id,
+            customer_id=rng.choice(customer_ids),
+            start_date=start_date,
+            end_date=end_date,
+            total_price=days * daily_rate,
+            status=rng.choices(*statuses)[0],
+            payment_method=rng.choice(PAYMENT_METHODS),
+        )
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.7 on 2026-10-17 19:55
+
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def build_occupancy(apps, schema_editor):
+    """
+    Populate the availability index from the existing active bookings.
+
+    The bitmap encoding is inlined (rather than importing
+    `apps.booking.availability.DayBitmap`) so the migration keeps producing
+    this format if that class changes: bit ``i`` marks the day
+    ``first_day + i``, stored as little-endian bytes, with ``first_day``
+    the earliest booked day.
+    """
+    Booking = apps.get_model('booking', 'Booking')
+    VehicleOccupancy = apps.get_model('booking', 'VehicleOccupancy')
+    ranges = {}
+    for vehicle_id, start_date, end_date in Booking.objects.filter(
+        status__in=['pending', 'confirmed']
+    ).values_list('vehicle_id', 'start_date', 'end_date').iterator():
+        if start_date <= end_date:
+            ranges.setdefault(vehicle_id, []).append((start_date, end_date))
+
+    occupancies = []
+    for vehicle_id, vehicle_ranges in ranges.items():
+        first_day = min(start_date for start_date, _ in vehicle_ranges)
+        bits = 0
+        for start_date, end_date in vehicle_ranges:
+            offset = (start_date - first_day).days
+            bits |= ((1 << ((end_date - start_date).days + 1)) - 1) << offset
+        occupancies.append(VehicleOccupancy(
+            vehicle_id=vehicle_id,
+            first_day=first_day,
+            last_day=first_day + timedelta(days=bits.bit_length() - 1),
+            bitmap=bits.to_bytes((bits.bit_length() + 7) // 8, 'little'),
+        ))
+    VehicleOccupancy.objects.bulk_create(occupancies, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0001_initial'),
+        ('vehicle', '0006_alter_vehicle_options'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VehicleOccupancy',
+            fields=[
+                ('vehicle', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='occupancy', serialize=False, to='vehicle.vehicle')),
+                ('first_day', models.DateField(blank=True, null=True)),
+                ('last_day', models.DateField(blank=True, null=True)),
+                ('bitmap', models.BinaryField(default=bytes)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['first_day', 'last_day'], name='occupancy_window_idx')],
+            },
+        ),
+        migrations.RunPython(build_occupancy, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 5.2.7 on 2026-10-17 19:56
+
+import apps.booking.models
+import django.contrib.postgres.constraints
+import django.contrib.postgres.operations
+import django.contrib.postgres.fields.ranges
+from django.db import migrations, models
+
+
+# Conflicts listed in the error when the constraint cannot be added
+MAX_REPORTED_CONFLICTS = 50
+
+
+def check_active_overlaps(apps, schema_editor):
+    """
+    Refuse to add the constraint while active bookings of one vehicle
+    share a day.
+
+    The old serializer check compared dates with exclusive bounds, so it
+    accepted back-to-back bookings where one ends on the day the next
+    one starts; the constraint's inclusive '[]' periods reject them.
+    Those rows have to be moved or cancelled before migrating.
+    """
+    table = apps.get_model('booking', 'Booking')._meta.db_table
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"""
+            SELECT first.vehicle_id, first.id, first.start_date, first.end_date,
+                   second.id, second.start_date, second.end_date
+            FROM {table} AS first
+            JOIN {table} AS second
+              ON second.vehicle_id = first.vehicle_id
+             AND second.id > first.id
+             AND second.start_date <= first.end_date
+             AND second.end_date >= first.start_date
+            WHERE first.status IN ('pending', 'confirmed')
+              AND second.status IN ('pending', 'confirmed')
+            ORDER BY first.vehicle_id, first.id, second.id
+            LIMIT %s
+        """, [MAX_REPORTED_CONFLICTS + 1])
+        conflicts = cursor.fetchall()
+    if conflicts:
+        lines = [
+            f"  vehicle {vehicle_id}: booking {first_id} ({first_start} to {first_end}) "
+            f"overlaps booking {second_id} ({second_start} to {second_end})"
+            for vehicle_id, first_id, first_start, first_end, second_id, second_start, second_end
+            in conflicts[:MAX_REPORTED_CONFLICTS]
+        ]
+        if len(conflicts) > MAX_REPORTED_CONFLICTS:
+            lines.append("  ...")
+        raise RuntimeError(
+            "Active (pending / confirmed) bookings of the same vehicle share a day, so "
+            "booking_no_overlapping_active cannot be added. Move or cancel one booking of each "
+            "pair, then migrate again:\n" + "\n".join(lines)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0002_vehicleoccupancy'),
+        ('customer', '0003_customer_status'),
+        ('vehicle', '0006_alter_vehicle_options'),
+    ]
+
+    operations = [
+        # Needed for the "vehicle WITH =" part of the GiST exclusion constraint
+        django.contrib.postgres.operations.BtreeGistExtension(),
+        migrations.AddField(
+            model_name='booking',
+            name='period',
+            field=models.GeneratedField(db_persist=True, expression=apps.booking.models.DateRange(models.F('start_date'), models.F('end_date'), models.Value('[]')), output_field=django.contrib.postgres.fields.ranges.DateRangeField()),
+        ),
+        migrations.RunPython(check_active_overlaps, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='booking',
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(condition=models.Q(('status__in', ('pending', 'confirmed'))), expressions=[('vehicle', '='), ('period', '&&')], name='booking_no_overlapping_active'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-17 20:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0004_booking_hot_query_indexes'),
+        ('customer', '0003_customer_status'),
+        ('vehicle', '0007_vehicle_keyset_pagination_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['-created_at', 'id'], name='booking_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['customer', '-created_at', 'id'], name='booking_customer_created_idx'),
+        ),
+    ]
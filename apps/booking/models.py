@@ -1,7 +1,41 @@
 from django.db import models
+from django.db.models import F, Func, Q, Value
+from django.db.utils import IntegrityError
+from psycopg2.errorcodes import DEADLOCK_DETECTED
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import DateRangeField, RangeOperators
 from apps.customer.models import Customer
 from apps.vehicle.models import Vehicle
-from apps.booking.enums import BookingStatus, PaymentMethod
+from apps.booking.enums import BookingStatus, PaymentMethod, ACTIVE_BOOKING_STATUSES
+
+
+# Name of the exclusion constraint that forbids overlapping active bookings
+BOOKING_OVERLAP_CONSTRAINT = 'booking_no_overlapping_active'
+
+
+class DateRange(Func):
+    """
+    SQL `daterange(lower, upper, bounds)` constructor.
+    """
+    function = 'DATERANGE'
+    output_field = DateRangeField()
+
+
+def is_overlap_violation(error):
+    """
+    Return True if a database error was raised by the booking overlap constraint.
+
+    Besides the plain violation, two transactions inserting conflicting rows
+    at the same moment wait on each other while checking the constraint;
+    PostgreSQL aborts one of them as a deadlock, which is the same conflict.
+    """
+    cause = error.__cause__
+    diag = getattr(cause, 'diag', None)
+    if diag is None:
+        return False
+    if isinstance(error, IntegrityError):
+        return diag.constraint_name == BOOKING_OVERLAP_CONSTRAINT
+    return cause.pgcode == DEADLOCK_DETECTED and 'exclusion constraint' in (diag.context or '')
 
 
 class Booking(models.Model):
@@ -14,6 +48,7 @@ class Booking(models.Model):
         start_date: Booking start date.
         end_date: Booking end date.
         total_price: Total booking price, auto-calculated if not provided.
+        period: Generated inclusive daterange [start_date, end_date].
         status: Booking status (Pending, Confirmed, Cancelled, Completed).
         payment_method: Payment method (Cash, Cliq).
         notes: Optional booking notes.
@@ -46,6 +81,11 @@ class Booking(models.Model):
         blank=True,
         null=True,  # Price can be auto-calculated if left empty
     )
+    period = models.GeneratedField(
+        expression=DateRange(F('start_date'), F('end_date'), Value('[]')),
+        output_field=DateRangeField(),
+        db_persist=True,  # Stored so the exclusion constraint can index it
+    )
 
     # ----------------------
     # Status and payment method
@@ -68,6 +108,46 @@ class Booking(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)  # Auto timestamp when created
     updated_at = models.DateTimeField(auto_now=True)      # Auto timestamp on every update
 
+    class Meta:
+        indexes = [
+            # update_status: CONFIRMED bookings whose end_date has passed
+            models.Index(
+                fields=['end_date'],
+                condition=Q(status=BookingStatus.CONFIRMED.value),
+                name='booking_confirmed_end_idx',
+            ),
+            # auto_cancel_booking_expired: PENDING bookings older than 24h
+            models.Index(
+                fields=['created_at'],
+                condition=Q(status=BookingStatus.PENDING.value),
+                name='booking_pending_created_idx',
+            ),
+            # Overlap lookups and availability index rebuilds (active rows only)
+            models.Index(
+                fields=['vehicle', 'start_date', 'end_date'],
+                condition=Q(status__in=ACTIVE_BOOKING_STATUSES),
+                name='booking_active_vehicle_idx',
+            ),
+            # Reports: newest bookings first, optionally filtered by status
+            models.Index(fields=['-start_date'], name='booking_start_date_idx'),
+            models.Index(fields=['status', '-start_date'], name='booking_status_start_idx'),
+            # Keyset pagination of the booking list (all / per customer)
+            models.Index(fields=['-created_at', 'id'], name='booking_created_id_idx'),
+            models.Index(fields=['customer', '-created_at', 'id'], name='booking_customer_created_idx'),
+        ]
+        constraints = [
+            # A vehicle cannot hold two active bookings on the same day.
+            # Enforced by a GiST index, so concurrent inserts cannot double-book.
+            ExclusionConstraint(
+                name=BOOKING_OVERLAP_CONSTRAINT,
+                expressions=[
+                    ('vehicle', RangeOperators.EQUAL),
+                    ('period', RangeOperators.OVERLAPS),
+                ],
+                condition=Q(status__in=ACTIVE_BOOKING_STATUSES),
+            ),
+        ]
+
     # ----------------------
     # Helper methods
     # ----------------------
@@ -82,6 +162,39 @@ class Booking(models.Model):
             return days * self.vehicle.daily_rate
         return 0
 
+    def occupied_range(self):
+        """
+        Return (vehicle_id, start_date, end_date) for the days this booking
+        holds the vehicle, or None if its status does not block the vehicle.
+        """
+        if self.status in ACTIVE_BOOKING_STATUSES:
+            return (self.vehicle_id, self.start_date, self.end_date)
+        return None
+
+    def rollup_fact(self):
+        """
+        Return (start_date, vehicle_id, status, booked days, total_price),
+        what this booking adds to the daily report rollup.
+        """
+        days = (self.end_date - self.start_date).days + 1
+        return (self.start_date, self.vehicle_id, self.status, days, self.total_price or 0)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Remember the occupied range and the rollup fact as loaded from the
+        database so the availability index and the report rollup can
+        release them when the booking changes.
+        """
+        instance = super().from_db(db, field_names, values)
+        tracked = {'vehicle_id', 'start_date', 'end_date', 'status'}
+        deferred = instance.get_deferred_fields()
+        if tracked.isdisjoint(deferred):
+            instance._loaded_occupancy = instance.occupied_range()
+            if 'total_price' not in deferred:
+                instance._loaded_fact = instance.rollup_fact()
+        return instance
+
     def save(self, *args, **kwargs):
         """
         Override save to automatically calculate total_price
@@ -97,3 +210,35 @@ class Booking(models.Model):
         Example: "ahmad - Toyota Corolla (pending)"
         """
         return f"{self.customer.user.username} - {self.vehicle} ({self.status})"
+
+
+class VehicleOccupancy(models.Model):
+    """
+    Availability index row: the days a vehicle is held by active
+    (PENDING / CONFIRMED) bookings, stored as a compact day bitmap.
+
+    Maintained incrementally by `apps.booking.availability.availability_index`.
+
+    Fields:
+        vehicle: The indexed vehicle (one row per vehicle).
+        first_day: Day represented by bit 0 of the bitmap (null when empty).
+        last_day: Last occupied day, lets SQL skip rows outside a window.
+        bitmap: Little-endian day bitmap starting at first_day.
+    """
+    vehicle = models.OneToOneField(
+        Vehicle,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='occupancy',
+    )
+    first_day = models.DateField(blank=True, null=True)
+    last_day = models.DateField(blank=True, null=True)
+    bitmap = models.BinaryField(default=bytes)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['first_day', 'last_day'], name='occupancy_window_idx'),
+        ]
+
+    def __str__(self):
+        return f"Occupancy of vehicle {self.vehicle_id} ({self.first_day} - {self.last_day})"
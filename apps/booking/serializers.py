@@ -1,67 +1,106 @@
+from contextlib import contextmanager
 from rest_framework import serializers
-from .models import Booking
+from .models import Booking, is_overlap_violation
 from apps.customer.models import Customer
 from apps.vehicle.models import Vehicle
+from apps.vehicle.repository import VehicleRepository
+from apps.vehicle.serializers import VehicleSerializer
+from apps.sparse_fields import SparseFieldsMixin
 from django.contrib.auth.models import User
-from django.db import transaction
+from django.db import transaction, DatabaseError
 from rest_framework.serializers import ValidationError
 from apps.authentication.serializers import CreateUserSerializer
 from apps.customer.serializers import CustomerSerializer
-from .enums import BookingStatus, PaymentMethod
+from .enums import PaymentMethod
+from .transitions import ACTIONS
 from django.utils import timezone
 
 
+@contextmanager
+def overlap_as_validation_error(detail, booking=None):
+    """
+    Run a booking write in a savepoint and turn a violation of the
+    overlap exclusion constraint into a ValidationError with `detail`.
+
+    When `booking` is given, the error also suggests the nearest free
+    slots of the same length so the client does not retry blindly.
+    """
+    try:
+        with transaction.atomic():
+            yield
+    except DatabaseError as error:
+        if not is_overlap_violation(error):
+            raise
+        if booking is not None:
+            detail = {**detail, "suggestions": free_slot_suggestions(booking)}
+        raise ValidationError(detail)
+
+
+def free_slot_suggestions(booking):
+    """
+    Nearest free slots (before, then after) for the booking's vehicle and
+    length, as ISO date strings.
+    """
+    slots = VehicleRepository().get_free_slots(
+        booking.vehicle_id, booking.start_date, booking.end_date, exclude_booking_id=booking.pk,
+    )
+    return [
+        {"start_date": slot["start_date"].isoformat(), "end_date": slot["end_date"].isoformat()}
+        for slot in slots
+        if slot
+    ]
+
+
+def validate_booking_dates(start_date, end_date):
+    """
+    Shared date rules for new bookings:
+        - start_date not in the past
+        - end_date >= start_date
+    """
+    today = timezone.localdate()
+
+    # Start date cannot be in the past
+    if start_date and start_date < today:
+        raise serializers.ValidationError({
+            "start_date": "Start date cannot be in the past."
+        })
+
+    # End date must be after start date
+    if start_date and end_date and end_date < start_date:
+        raise serializers.ValidationError({
+            "end_date": "End date must be after start date."
+        })
+
+
 # ----------------------
 # Booking Serializer
 # ----------------------
-class BookingSerializer(serializers.ModelSerializer):
+class BookingSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for Booking model.
     Handles validation and auto-calculation of total_price.
+    Supports sparse fieldsets and embedding `customer` / `vehicle` on reads.
+
+    Vehicle availability is enforced by the database exclusion constraint
+    on (vehicle, period); a violation is reported as `unavailable_error`
+    with the nearest free slots under `suggestions`.
     """
+    unavailable_error = {"error": "This vehicle is not available in the selected period."}
+
     class Meta:
         model = Booking
-        fields = "__all__"
+        exclude = ['period']
         # total_price, created_at, updated_at, status, customer are read-only
         read_only_fields = ['total_price', 'created_at', 'updated_at', 'status','customer']
+        expandable = {'customer': CustomerSerializer, 'vehicle': VehicleSerializer}
 
     def validate(self, data):
         """
         Custom validation for:
             - start_date not in the past
             - end_date >= start_date
-            - vehicle availability (no overlapping bookings)
         """
-        start_date = data.get('start_date')
-        end_date = data.get('end_date')
-        vehicle = data.get('vehicle')
-        instance = getattr(self, 'instance', None)  # for updates
-        today = timezone.localdate()
-
-        # Start date cannot be in the past
-        if start_date and start_date < today:
-            raise serializers.ValidationError({
-                "start_date": "Start date cannot be in the past."
-            })
-
-        # End date must be after start date
-        if start_date and end_date and end_date < start_date:
-            raise serializers.ValidationError({
-                "end_date": "End date must be after start date."
-            })
-
-        # Check for overlapping bookings for this vehicle
-        if start_date and end_date and vehicle:
-            overlapping = Booking.objects.filter(
-                vehicle=vehicle,
-                status__in=[BookingStatus.PENDING.value, BookingStatus.CONFIRMED.value],
-                start_date__lte=end_date,
-                end_date__gte=start_date
-            )
-            if instance:
-                overlapping = overlapping.exclude(pk=instance.pk)
-            if overlapping.exists():
-                raise ValidationError({"error": "This vehicle is not available in the selected period."})
+        validate_booking_dates(data.get('start_date'), data.get('end_date'))
         return data
 
     def create(self, validated_data):
@@ -70,7 +109,8 @@ class BookingSerializer(serializers.ModelSerializer):
         """
         booking = Booking(**validated_data)
         booking.total_price = booking.computed_total_price
-        booking.save()
+        with overlap_as_validation_error(self.unavailable_error, booking):
+            booking.save()
         return booking
 
     def update(self, instance, validated_data):
@@ -80,7 +120,8 @@ class BookingSerializer(serializers.ModelSerializer):
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
         instance.total_price = instance.computed_total_price
-        instance.save()
+        with overlap_as_validation_error(self.unavailable_error, instance):
+            instance.save()
         return instance
 
 
@@ -120,13 +161,13 @@ class VersionOneCreateUserCustomerBookingSerializer(serializers.Serializer):
             - Check unique username
             - Check unique driver license
             - Validate booking dates
-            - Check vehicle availability
+
+        Vehicle availability is enforced on insert by the overlap constraint.
         """
         username = data.get('username')
         driver_license_number = data.get('driver_license_number')
         start_date = data.get('start_date')
         end_date = data.get('end_date')
-        vehicle = data.get('vehicle')
 
         if User.objects.filter(username=username).exists():
             raise ValidationError({"username": "Username already exists."})
@@ -137,18 +178,6 @@ class VersionOneCreateUserCustomerBookingSerializer(serializers.Serializer):
         if start_date and end_date and end_date < start_date:
             raise ValidationError({"end_date": "End date must be on or after start date."})
 
-        # Vehicle availability check
-        if vehicle and start_date and end_date:
-            vehicle_id = vehicle.pk if isinstance(vehicle, Vehicle) else int(vehicle)
-            is_conflicting = Booking.objects.filter(
-                vehicle_id=vehicle_id,
-                status__in=[BookingStatus.PENDING.value, BookingStatus.CONFIRMED.value],
-                start_date__lt=end_date,
-                end_date__gt=start_date
-            ).exists()
-            if is_conflicting:
-                raise ValidationError({"vehicle": "Selected vehicle is not available for the given period."})
-
         return data
 
     def create(self, validated_data):
@@ -188,10 +217,10 @@ class VersionOneCreateUserCustomerBookingSerializer(serializers.Serializer):
                 payment_method=validated_data.get('payment_method', PaymentMethod.CASH.value),
                 notes=validated_data.get('notes', '')
             )
-            try:
+            with overlap_as_validation_error(
+                {"vehicle": "Selected vehicle is not available for the given period."}, booking
+            ):
                 booking.save()
-            except ValidationError as e:
-                raise ValidationError(e.message_dict if hasattr(e, "message_dict") else e.messages)
 
         return {'user': user, 'customer': customer, 'booking': booking}
 
@@ -239,3 +268,61 @@ class VersionTwoCreateUserCustomerBookingSerializer(serializers.Serializer):
             "customer": customer,
             "booking": booking
         }
+
+
+# ----------------------
+# Batch creation serializers
+# ----------------------
+class BookingBatchItemSerializer(serializers.Serializer):
+    """
+    One entry of a batch booking request.
+
+    `vehicle` and `customer` are plain ids: the batch loads all vehicles
+    and customers in one query each instead of one lookup per item.
+    `customer` is only read for admin requests.
+    """
+    vehicle = serializers.IntegerField(min_value=1)
+    customer = serializers.IntegerField(min_value=1, required=False)
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+    payment_method = serializers.ChoiceField(
+        choices=[(method.value, method.name.title()) for method in PaymentMethod],
+        default=PaymentMethod.CASH.value,
+    )
+    notes = serializers.CharField(allow_blank=True, allow_null=True, required=False)
+
+    def validate(self, data):
+        validate_booking_dates(data['start_date'], data['end_date'])
+        return data
+
+
+class BookingBatchSerializer(serializers.Serializer):
+    """
+    Batch booking request body.
+
+    Example:
+        {
+            "all_or_nothing": false,
+            "bookings": [
+                {"vehicle": 3, "start_date": "2026-01-10", "end_date": "2026-01-12"},
+                {"vehicle": 4, "start_date": "2026-01-10", "end_date": "2026-01-15", "payment_method": "cliq"}
+            ]
+        }
+
+    Items are validated one by one by the view so a bad item is reported
+    in its own result instead of failing the whole request.
+    """
+    MAX_ITEMS = 500
+
+    bookings = serializers.ListField(child=serializers.DictField(), allow_empty=False, max_length=MAX_ITEMS)
+    all_or_nothing = serializers.BooleanField(default=False)
+
+
+class BookingBulkTransitionSerializer(serializers.Serializer):
+    """
+    Input of the bulk transition endpoint: one action for many booking ids.
+    """
+    action = serializers.ChoiceField(choices=list(ACTIONS))
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=10000,
+    )
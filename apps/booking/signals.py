@@ -0,0 +1,63 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from apps.vehicle.models import Vehicle
+from .models import Booking
+from .availability import availability_index
+from .enums import ACTIVE_BOOKING_STATUSES
+from .transitions import bookings_transitioned
+
+
+_UNKNOWN = object()
+
+
+@receiver(post_save, sender=Booking)
+def sync_availability_on_save(sender, instance, created, raw=False, **kwargs):
+    """
+    Keep the availability index in step with a saved booking.
+
+    Releases the days the booking held when it was loaded and occupies the
+    days it holds now (only PENDING / CONFIRMED bookings hold days).
+    Bookings loaded with deferred date/status fields have no snapshot and
+    fall back to a rebuild of their vehicle's row.
+    """
+    if raw:
+        return
+    previous = None if created else getattr(instance, '_loaded_occupancy', _UNKNOWN)
+    current = instance.occupied_range()
+
+    if previous is _UNKNOWN:
+        availability_index.rebuild(vehicle_ids=[instance.vehicle_id])
+    elif previous != current:
+        availability_index.apply(
+            occupy=[current] if current else [],
+            release=[previous] if previous else [],
+        )
+    instance._loaded_occupancy = current
+
+
+@receiver(post_delete, sender=Booking)
+def release_availability_on_delete(sender, instance, origin=None, **kwargs):
+    """
+    Free the days held by a deleted booking.
+    Skipped when the vehicle itself is deleted: its index row goes with it.
+    """
+    if isinstance(origin, Vehicle) or getattr(origin, 'model', None) is Vehicle:
+        return
+    held = getattr(instance, '_loaded_occupancy', None)
+    if held:
+        availability_index.apply(release=[held])
+
+
+@receiver(bookings_transitioned)
+def sync_availability_on_transition(sender, to_status, transitions, **kwargs):
+    """
+    Release or occupy the days of bookings moved by a bulk transition.
+    """
+    occupy, release = [], []
+    for row in transitions:
+        was_active = row.old_status in ACTIVE_BOOKING_STATUSES
+        if was_active and to_status not in ACTIVE_BOOKING_STATUSES:
+            release.append((row.vehicle_id, row.start_date, row.end_date))
+        elif not was_active and to_status in ACTIVE_BOOKING_STATUSES:
+            occupy.append((row.vehicle_id, row.start_date, row.end_date))
+    availability_index.apply(occupy=occupy, release=release)
@@ -1,22 +1,43 @@
 from celery import shared_task
+from django.conf import settings
 from django.utils import timezone
 from .models import Booking
 import logging
 from .enums import BookingStatus
+from .transitions import transition_in_batches
 from datetime import timedelta
 # Initialize a logger for this module
 logger = logging.getLogger(__name__)
 
 
+def sweep(name, bookings, to_status, from_status, batch_size=None):
+    """
+    Run a status sweep in primary-key batches (see `transition_in_batches`),
+    logging each batch's size and duration.
+
+    Returns:
+        int: Number of bookings updated.
+    """
+    batch_size = batch_size or settings.BOOKING_SWEEP_BATCH_SIZE
+    total = 0
+    for number, (rows, elapsed_ms) in enumerate(
+        transition_in_batches(bookings, to_status, [from_status], batch_size), start=1,
+    ):
+        total += len(rows)
+        logger.info(f"{name}: batch {number} updated {len(rows)} bookings in {elapsed_ms:.1f}ms")
+    return total
+
+
 @shared_task
-def update_status():
+def update_status(batch_size=None):
     """
     Celery task to automatically update the status of bookings.
 
     Workflow:
     1. Get current date.
     2. Filter bookings that are CONFIRMED but have ended (end_date < today).
-    3. Bulk update their status to COMPLETED.
+    3. Move them to COMPLETED in batches of `batch_size` (default
+       BOOKING_SWEEP_BATCH_SIZE), one compare-and-swap UPDATE each.
     4. Log the number of bookings updated.
     
     Returns:
@@ -30,8 +51,10 @@ def update_status():
         end_date__lt=today
     )
 
-    # Bulk update status for efficiency
-    count = completed.update(status=BookingStatus.COMPLETED.value)
+    # The transition signal frees their days in the availability index
+    count = sweep(
+        "update_status", completed, BookingStatus.COMPLETED.value, BookingStatus.CONFIRMED.value, batch_size,
+    )
 
     # Log info for monitoring
     logger.info(f"Auto-completed {count} bookings")
@@ -41,10 +64,16 @@ def update_status():
 
 
 @shared_task
-def auto_cancel_booking_expired():
+def auto_cancel_booking_expired(batch_size=None):
+    """
+    Cancel PENDING bookings created more than 24 hours ago, in batches of
+    `batch_size` (default BOOKING_SWEEP_BATCH_SIZE).
+    """
     expired_time=timezone.now() - timedelta(hours=24)
     expired_bookings = Booking.objects.filter(status=BookingStatus.PENDING.value,created_at__lt=expired_time)
-    count = expired_bookings.count()
-    expired_bookings.update(status=BookingStatus.CANCELLED.value)
+    count = sweep(
+        "auto_cancel_booking_expired", expired_bookings,
+        BookingStatus.CANCELLED.value, BookingStatus.PENDING.value, batch_size,
+    )
 
-    return f"Updated {count} bookings to CANCELLED status"
\ No newline at end of file
+    return f"Updated {count} bookings to CANCELLED status"
@@ -0,0 +1,140 @@
+import time
+from collections import namedtuple
+from django.db import connection, transaction
+from django.db.models import QuerySet
+from django.dispatch import Signal
+from django.utils import timezone
+from .enums import BookingStatus
+from .models import Booking
+
+
+PENDING = BookingStatus.PENDING.value
+CONFIRMED = BookingStatus.CONFIRMED.value
+CANCELLED = BookingStatus.CANCELLED.value
+COMPLETED = BookingStatus.COMPLETED.value
+
+# Booking state machine: status -> statuses it may move to
+ALLOWED_TRANSITIONS = {
+    PENDING: (CONFIRMED, CANCELLED),
+    CONFIRMED: (COMPLETED, CANCELLED),
+}
+
+# Named transitions: action -> (expected current statuses, new status)
+ACTIONS = {
+    'approve': ((PENDING,), CONFIRMED),
+    'reject': ((PENDING,), CANCELLED),
+    'complete': ((CONFIRMED,), COMPLETED),
+    'cancel': ((PENDING, CONFIRMED), CANCELLED),
+}
+
+# Sent once per applied transition statement with `to_status` and
+# `transitions` (list of Transitioned rows), inside its transaction.
+bookings_transitioned = Signal()
+
+Transitioned = namedtuple('Transitioned', ['id', 'vehicle_id', 'start_date', 'end_date', 'old_status', 'total_price'])
+
+
+class InvalidTransition(ValueError):
+    pass
+
+
+def sources_of(to_status):
+    """
+    Statuses a booking may be in to move to `to_status`.
+    """
+    return tuple(status for status, targets in ALLOWED_TRANSITIONS.items() if to_status in targets)
+
+
+def transition(bookings, to_status, from_statuses=None):
+    """
+    Move bookings to `to_status` with one compare-and-swap UPDATE.
+
+    Only rows whose status is still one of `from_statuses` when they are
+    locked are updated, so two admins (or an admin and a sweep task)
+    racing on the same booking cannot both win. Only `status` and
+    `updated_at` are written; `Booking.save` is not called.
+
+    Args:
+        bookings: Iterable of booking ids, or a Booking QuerySet selecting
+            the candidates (used as a subquery, never evaluated in Python).
+        to_status (str): New status.
+        from_statuses: Expected current statuses; defaults to every status
+            allowed to move to `to_status`.
+
+    Returns:
+        list[Transitioned]: The rows that were updated, with their previous status.
+
+    Raises:
+        InvalidTransition: If the state machine forbids the transition.
+    """
+    from_statuses = tuple(from_statuses or sources_of(to_status))
+    if not from_statuses or any(to_status not in ALLOWED_TRANSITIONS.get(status, ()) for status in from_statuses):
+        raise InvalidTransition(f"Cannot move bookings from {list(from_statuses)} to '{to_status}'.")
+
+    if isinstance(bookings, QuerySet):
+        candidates, params = bookings.order_by().values('id').query.sql_with_params()
+        where, params = f"id IN ({candidates})", list(params)
+    else:
+        ids = [int(booking_id) for booking_id in bookings]
+        if not ids:
+            return []
+        where, params = "id = ANY(%s)", [ids]
+
+    table = Booking._meta.db_table
+    sql = f"""
+        UPDATE {table} AS booking
+        SET status = %s, updated_at = %s
+        FROM (
+            SELECT id, status FROM {table}
+            WHERE {where} AND status = ANY(%s)
+            ORDER BY id
+            FOR UPDATE
+        ) AS previous
+        WHERE booking.id = previous.id
+        RETURNING booking.id, booking.vehicle_id, booking.start_date, booking.end_date, previous.status,
+                  booking.total_price
+    """
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [to_status, timezone.now(), *params, list(from_statuses)])
+            rows = [Transitioned(*row) for row in cursor.fetchall()]
+        if rows:
+            bookings_transitioned.send(sender=Booking, to_status=to_status, transitions=rows)
+    return rows
+
+
+def transition_in_batches(bookings, to_status, from_statuses=None, batch_size=1000):
+    """
+    Move the bookings selected by a QuerySet to `to_status` in bounded
+    primary-key batches.
+
+    Each batch selects the next `batch_size` candidate ids after the last
+    one processed, then runs one compare-and-swap `transition` in its own
+    short transaction. Row locks are held for one batch at a time, so
+    admin approvals are not blocked behind a huge sweep. Batches already
+    applied stay committed if the sweep is interrupted; running it again
+    only finds the rows left, since applied rows no longer match.
+
+    Yields:
+        tuple(list[Transitioned], float): Rows updated by each batch and
+        the batch's duration in ms (candidate lookup included).
+    """
+    last_id = 0
+    while True:
+        started = time.perf_counter()
+        ids = list(
+            bookings.filter(pk__gt=last_id).order_by('pk').values_list('pk', flat=True)[:batch_size]
+        )
+        if not ids:
+            return
+        rows = transition(ids, to_status, from_statuses)
+        yield rows, (time.perf_counter() - started) * 1000
+        last_id = ids[-1]
+
+
+def run_action(action, bookings):
+    """
+    Apply a named transition (see ACTIONS) to bookings.
+    """
+    from_statuses, to_status = ACTIONS[action]
+    return transition(bookings, to_status, from_statuses)
@@ -3,17 +3,30 @@ from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from django.db import transaction
+from django.db.models import Count
+from django.http import Http404
 from rest_framework.views import APIView
 from .models import Booking
-from .serializers import BookingSerializer, VersionOneCreateUserCustomerBookingSerializer, VersionTwoCreateUserCustomerBookingSerializer
+from .enums import BookingStatus
+from .transitions import ACTIONS, run_action, sources_of, transition
+from .serializers import (
+    BookingSerializer, BookingBatchSerializer, BookingBatchItemSerializer, BookingBulkTransitionSerializer,
+    VersionOneCreateUserCustomerBookingSerializer, VersionTwoCreateUserCustomerBookingSerializer,
+)
+from .batch import BookingBatch, CREATED, INVALID
 from apps.customer.models import Customer
+from apps.conditional import load_page, probe_object, probe_page, set_validators
+from apps.pagination import KeysetCursorPagination
+from apps.sparse_fields import get_sparse_fields, sparse_queryset
 
 
 class BookingViewSet(viewsets.ModelViewSet):
     """
     Manage vehicle bookings.
 
-    **List**: View all bookings (filtered by user permissions)
+    **List**: View all bookings (filtered by user permissions), keyset-paginated on (-created_at, id)
+    **Sparse reads**: `?fields=id,status,...` and `?expand=customer,vehicle` on list / retrieve / by_status
+    **Conditional reads**: list / retrieve send ETag + Last-Modified and answer 304 when unchanged
     **Create**: Create new booking with profile completeness check
     **Retrieve**: Get specific booking details
     **Update**: Modify pending booking (customer) or any booking (admin)
@@ -24,21 +37,74 @@ class BookingViewSet(viewsets.ModelViewSet):
     - `change_status`: Update the status of a booking (admin only)
     - `approve_booking`: Approve a pending booking (admin only)
     - `reject_booking`: Reject a pending booking (admin only)
+    - `batch`: Create many bookings in one request
+    - `bulk_transition`: Approve / reject / complete / cancel many bookings at once (admin only)
     """
     queryset = Booking.objects.all().select_related("customer", "vehicle")
     serializer_class = BookingSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetCursorPagination
 
     def get_queryset(self):
         """
         Return bookings depending on user role.
         - Admin: all bookings
         - Regular user: only bookings belonging to their customer profile
+
+        Reads load only the columns asked for with `?fields=` and join
+        `customer` / `vehicle` only when asked for with `?expand=`.
         """
         user = self.request.user
         if user.is_staff:
-            return Booking.objects.all().select_related("customer", "vehicle")
-        return Booking.objects.filter(customer__user=user).select_related("vehicle")
+            bookings = Booking.objects.all()
+        else:
+            bookings = Booking.objects.filter(customer__user=user)
+        if self.request.method not in permissions.SAFE_METHODS:
+            return bookings.select_related("customer", "vehicle")
+        fields, expand = self.get_sparse_fields()
+        # id / created_at are the keyset pagination position
+        return sparse_queryset(bookings, self.get_serializer_class(), fields, expand, required=('id', 'created_at'))
+
+    def list(self, request, *args, **kwargs):
+        """
+        Keyset-paginated bookings with an ETag / Last-Modified for the page.
+        The page is first probed as (id, created_at, updated_at); a matching
+        If-None-Match / If-Modified-Since gets a 304 before any booking is
+        loaded or serialized.
+        Responses with expanded relations are not conditional: an embedded
+        vehicle or customer can change without touching the booking.
+        """
+        if self.get_sparse_fields()[1]:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        response, ids, validators = probe_page(request, self.paginator, queryset, self)
+        if response:
+            return response
+        serializer = self.get_serializer(load_page(queryset, ids), many=True)
+        return set_validators(self.get_paginated_response(serializer.data), *validators)
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Booking detail, conditional on its `updated_at` (304 when unchanged).
+        """
+        if self.get_sparse_fields()[1]:
+            return super().retrieve(request, *args, **kwargs)
+        response, validators = probe_object(request, self.filter_queryset(self.get_queryset()), kwargs['pk'])
+        if response:
+            return response
+        response = super().retrieve(request, *args, **kwargs)
+        return set_validators(response, *validators) if validators else response
+
+    def get_sparse_fields(self):
+        if not hasattr(self, '_sparse_fields'):
+            self._sparse_fields = get_sparse_fields(self.request, self.get_serializer_class())
+        return self._sparse_fields
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.request and self.request.method in permissions.SAFE_METHODS:
+            context['fields'], context['expand'] = self.get_sparse_fields()
+        return context
 
     def perform_create(self, serializer):
         """
@@ -57,60 +123,150 @@ class BookingViewSet(viewsets.ModelViewSet):
                 raise serializers.ValidationError({"customer": "Customer not found."})
             serializer.save(customer=customer)
         else:
-            customer = getattr(user, "customer", None)
-            if not customer:
-                raise serializers.ValidationError("User does not have a customer profile.")
-            missing_fields = customer.get_incomplete_fields()
-            if not customer.is_profile_complete():
-                raise serializers.ValidationError(
-                    {"profile": f"Please complete the following fields before creating a new booking: {', '.join(missing_fields)}."}
-                )
-            serializer.save(customer=customer)
+            serializer.save(customer=self._get_customer_profile(user))
+
+    def _get_customer_profile(self, user):
+        """
+        Return the user's customer profile if it is complete enough to book.
+        """
+        customer = getattr(user, "customer", None)
+        if not customer:
+            raise serializers.ValidationError("User does not have a customer profile.")
+        missing_fields = customer.get_incomplete_fields()
+        if not customer.is_profile_complete():
+            raise serializers.ValidationError(
+                {"profile": f"Please complete the following fields before creating a new booking: {', '.join(missing_fields)}."}
+            )
+        return customer
+
+    @action(detail=False, methods=['post'], url_path='batch')
+    def batch(self, request):
+        """
+        Create many bookings in one request.
+
+        Request body: `bookings` (list of booking objects) and optional
+        `all_or_nothing` (default false). Admins must give `customer` on
+        every item; regular users always book for their own profile.
+
+        Responses:
+            201 Created: every booking was created.
+            207 Multi-Status: some bookings were created (partial mode).
+            400 Bad Request: nothing was created (all-or-nothing mode).
+        Each item gets a result with `status` created / conflict / invalid / skipped.
+        """
+        serializer = BookingBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        all_or_nothing = serializer.validated_data['all_or_nothing']
+        raw_items = serializer.validated_data['bookings']
+
+        items, rejected = [], {}
+        for index, raw_item in enumerate(raw_items):
+            item_serializer = BookingBatchItemSerializer(data=raw_item)
+            if item_serializer.is_valid():
+                items.append(dict(item_serializer.validated_data, index=index))
+            else:
+                rejected[index] = {"index": index, "status": INVALID, "errors": item_serializer.errors}
+
+        if request.user.is_staff:
+            customers = Customer.objects.in_bulk({item['customer'] for item in items if 'customer' in item})
+            resolved = []
+            for item in items:
+                customer = customers.get(item.get('customer'))
+                if customer:
+                    resolved.append(dict(item, customer=customer))
+                else:
+                    errors = {"customer": "Customer not found." if 'customer' in item else "Admin must provide customer id."}
+                    rejected[item['index']] = {"index": item['index'], "status": INVALID, "errors": errors}
+            items = resolved
+        else:
+            customer = self._get_customer_profile(request.user)
+            items = [dict(item, customer=customer) for item in items]
+
+        results, created = BookingBatch(items, all_or_nothing=all_or_nothing, rejected=rejected).run()
+
+        if len(created) == len(raw_items):
+            response_status = status.HTTP_201_CREATED
+        elif created:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response(
+            {"created": sum(result['status'] == CREATED for result in results), "results": results},
+            status=response_status,
+        )
 
     @action(detail=False, methods=['get'], url_path="by_status", permission_classes=[permissions.IsAdminUser])
     def get_booking_by_status(self, request):
         """
         Filter bookings by status (admin only).
         Query parameter: `status` (optional)
+
+        Paginated like the list. The response also carries `counts`: the
+        number of bookings per status, from one GROUP BY query.
         """
         status_param = request.query_params.get('status')
-        if not status_param:
-            all_booking = self.queryset.all()
-            serializer = self.get_serializer(all_booking, many=True)
-            return Response(serializer.data)
-        valid_statuses = [choice[0] for choice in Booking.BookingStatus.choices]
-        if status_param not in valid_statuses:
+        valid_statuses = [status.value for status in BookingStatus]
+        if status_param and status_param not in valid_statuses:
             return Response(
                 {"error": f"Invalid status. Must be one of: {valid_statuses}"},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        bookings = self.queryset.filter(status=status_param)
-        serializer = self.get_serializer(bookings, many=True)
-        return Response(serializer.data)
+
+        bookings = self.get_queryset()
+        counts = dict.fromkeys(valid_statuses, 0)
+        counts.update(bookings.order_by().values_list('status').annotate(total=Count('id')))
+        if status_param:
+            bookings = bookings.filter(status=status_param)
+
+        page = self.paginate_queryset(bookings)
+        response = self.get_paginated_response(self.get_serializer(page, many=True).data)
+        response.data['counts'] = counts
+        return response
 
     @action(detail=True, methods=['patch'], url_path='change-status', permission_classes=[permissions.IsAdminUser])
     def change_status(self, request, pk=None):
         """
         Change the status of a booking (admin only).
         Request body: `status` (required)
+
+        The change follows the booking state machine (see `transitions.py`)
+        and is applied with a single compare-and-swap UPDATE.
         """
-        booking = self.get_object()
         new_status = request.data.get("status")
 
-        valid_statuses = [choice[0] for choice in Booking.BookingStatus.choices]
+        valid_statuses = [status.value for status in BookingStatus]
         if new_status not in valid_statuses:
             return Response(
                 {"error": f"Invalid status. Must be one of {valid_statuses}"},
                 status=status.HTTP_400_BAD_REQUEST
             )
+        if not sources_of(new_status):
+            return Response(
+                {"error": f"Bookings cannot be moved to {new_status}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-        booking.status = new_status
-        booking.save()
+        if not transition(self._booking_ids(), new_status):
+            booking = self.get_object()
+            return Response(
+                {"error": f"Cannot change status from {booking.status} to {new_status}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         return Response(
             {"message": f"Booking status updated to {new_status}"},
             status=status.HTTP_200_OK
         )
 
+    def _booking_ids(self):
+        """
+        The booking id of the URL as the id list of a transition.
+        A pk that is not a number matches no booking.
+        """
+        try:
+            return [int(self.kwargs['pk'])]
+        except ValueError:
+            raise Http404("No Booking matches the given query.")
+
     def perform_update(self, serializer):
         """
         Update booking:
@@ -121,7 +277,7 @@ class BookingViewSet(viewsets.ModelViewSet):
         user = self.request.user
 
         if not user.is_staff:
-            if booking.status != Booking.BookingStatus.PENDING:
+            if booking.status != BookingStatus.PENDING.value:
                 raise serializers.ValidationError(
                     {"error": "You can only update bookings that are still pending."}
                 )
@@ -133,11 +289,9 @@ class BookingViewSet(viewsets.ModelViewSet):
         """
         Approve a pending booking (admin only)
         """
-        booking = self.get_object()
-        if booking.status != Booking.BookingStatus.PENDING:
+        if not run_action('approve', self._booking_ids()):
+            self.get_object()
             return Response({"error": "Booking is not pending."}, status=status.HTTP_400_BAD_REQUEST)
-        booking.status = Booking.BookingStatus.CONFIRMED
-        booking.save()
         return Response({"message": "Booking approved successfully."}, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=['patch'], url_path='reject', permission_classes=[IsAdminUser])
@@ -145,13 +299,37 @@ class BookingViewSet(viewsets.ModelViewSet):
         """
         Reject a pending booking (admin only)
         """
-        booking = self.get_object()
-        if booking.status != Booking.BookingStatus.PENDING:
+        if not run_action('reject', self._booking_ids()):
+            self.get_object()
             return Response({"error": "Booking is not pending."}, status=status.HTTP_400_BAD_REQUEST)
-        booking.status = Booking.BookingStatus.CANCELLED
-        booking.save()
         return Response({"message": "Booking rejected successfully."}, status=status.HTTP_200_OK)
 
+    @action(detail=False, methods=['post'], url_path='bulk-transition', permission_classes=[IsAdminUser])
+    def bulk_transition(self, request):
+        """
+        Apply one transition to many bookings in a single statement (admin only).
+
+        Request body:
+            action: approve | reject | complete | cancel
+            ids: Booking ids (up to 10,000)
+
+        Bookings not in an expected status for the action are left as they
+        are and reported under `skipped`.
+        """
+        serializer = BookingBulkTransitionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        action_name = serializer.validated_data['action']
+        ids = serializer.validated_data['ids']
+
+        applied = sorted(row.id for row in run_action(action_name, ids))
+        applied_ids = set(applied)
+        return Response({
+            "action": action_name,
+            "status": ACTIONS[action_name][1],
+            "applied": applied,
+            "skipped": sorted({booking_id for booking_id in ids if booking_id not in applied_ids}),
+        }, status=status.HTTP_200_OK)
+
 
 class VersionOneCreateUserCustomerBookingView(APIView):
     """
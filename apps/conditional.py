@@ -0,0 +1,84 @@
+import hashlib
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+def get_validators(request, rows):
+    """
+    Strong ETag and Last-Modified for a representation built from `rows`.
+
+    Args:
+        rows: Iterable of (pk, updated_at) of every object in the response.
+
+    The ETag also covers the request path and query string, since fields,
+    pagination cursor, etc. change the body for the same rows.
+
+    Returns:
+        tuple(str, int | None): (etag, last_modified timestamp)
+    """
+    digest = hashlib.sha256(request.get_full_path().encode())
+    last_modified = None
+    for pk, updated_at in rows:
+        digest.update(f"|{pk}:{updated_at.isoformat()}".encode())
+        if last_modified is None or updated_at > last_modified:
+            last_modified = updated_at
+    return quote_etag(digest.hexdigest()), int(last_modified.timestamp()) if last_modified else None
+
+
+def not_modified(request, etag, last_modified):
+    """
+    Answer If-None-Match / If-Modified-Since: a 304 response, or None when
+    the full response must be sent.
+    """
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+def probe_object(request, queryset, pk):
+    """
+    Validators of one object from an `updated_at` probe (no full row load).
+
+    Returns:
+        tuple(HttpResponse | None, tuple | None): (304 response or None,
+        (etag, last_modified) or None when the object does not exist).
+    """
+    updated_at = queryset.filter(pk=pk).values_list('updated_at', flat=True).first()
+    if updated_at is None:
+        return None, None
+    validators = get_validators(request, [(pk, updated_at)])
+    return not_modified(request, *validators), validators
+
+
+def probe_page(request, paginator, queryset, view=None):
+    """
+    Paginate a probe of (id, created_at, updated_at) and derive the page's
+    validators from it, before any full row is loaded or serialized.
+
+    The paginator keeps the probe's page position, so its paginated
+    response (next / previous links) can be built afterwards from the full
+    rows returned by `load_page`.
+
+    Returns:
+        tuple(HttpResponse | None, list, tuple): (304 response or None,
+        ids of the page in order, (etag, last_modified)).
+    """
+    probe = paginator.paginate_queryset(queryset.values('id', 'created_at', 'updated_at'), request, view)
+    validators = get_validators(request, [(row['id'], row['updated_at']) for row in probe])
+    return not_modified(request, *validators), [row['id'] for row in probe], validators
+
+
+def load_page(queryset, ids):
+    """
+    Load the full rows of a probed page, in page order.
+    """
+    objects = queryset.in_bulk(ids)
+    return [objects[pk] for pk in ids if pk in objects]
@@ -1,10 +1,16 @@
+from celery.result import GroupResult
 from django.contrib import admin , messages
+from django.http import Http404
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
+from django.utils.html import format_html
 from .models import Customer
-from .tasks import sync_customers_status_task,sync_single_customer_status_task
+from .tasks import dispatch_customer_sync, sync_customers_status_task
 
 @admin.register(Customer)
 class CustomerAdmin(admin.ModelAdmin):
     list_display = ('get_username','status','phone_number')
+    list_select_related = ('user',)
 
     actions = ['run_sync_customers_status_task','run_sync_single_customers_task']
 
@@ -13,6 +19,15 @@ class CustomerAdmin(admin.ModelAdmin):
 
     get_username.short_description = "Username"
 
+    def get_urls(self):
+        return [
+            path(
+                'sync-progress/<str:group_id>/',
+                self.admin_site.admin_view(self.sync_progress_view),
+                name='customer_customer_sync_progress',
+            ),
+        ] + super().get_urls()
+
     def run_sync_customers_status_task(self, request, queryset):
         sync_customers_status_task.delay()
         self.message_user(request, "Customer status task is running.")
@@ -20,10 +35,43 @@ class CustomerAdmin(admin.ModelAdmin):
     run_sync_customers_status_task.short_description = "Update ALL customer statuses"
 
     def run_sync_single_customers_task(self, request, queryset):
-        count =0
-        for customer in queryset:
-            sync_single_customer_status_task.delay(customer.id)
-            count += 1
+        # Ids only: the batch tasks fetch their own customers
+        customer_ids = list(queryset.order_by('id').values_list('id', flat=True))
+        result = dispatch_customer_sync(customer_ids)
+        progress_url = reverse('admin:customer_customer_sync_progress', args=[result.id])
+
+        self.message_user(request, format_html(
+            'Task group {} started: updating status for {} selected customers in {} batches. '
+            '<a href="{}">View progress</a>',
+            result.id, len(customer_ids), len(result.results), progress_url,
+        ))
+    run_sync_single_customers_task.short_description = "Update SELECTED customers statuses"
+
+    def sync_progress_view(self, request, group_id):
+        """
+        Aggregate progress of a customer sync task group.
+        """
+        result = GroupResult.restore(group_id)
+        if result is None:
+            raise Http404(f"Unknown task group {group_id}")
+
+        totals = {"checked": 0, "changed": 0, "failed": 0}
+        batches = {"total": len(result.results), "done": 0, "errors": 0}
+        for batch in result.results:
+            if batch.successful():
+                batches["done"] += 1
+                for key in totals:
+                    totals[key] += batch.result[key]
+            elif batch.failed():
+                batches["errors"] += 1
 
-        self.message_user(request, f"Task started: Updating status for {count} selected customers.")
-    run_sync_single_customers_task.short_description = "Update SELECTED customers statuses"
\ No newline at end of file
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": f"Customer status sync {group_id}",
+            "group_id": group_id,
+            "batches": batches,
+            "totals": totals,
+            "finished": batches["done"] + batches["errors"] == batches["total"],
+        }
+        return TemplateResponse(request, "admin/customer/customer/sync_progress.html", context)
@@ -1,9 +1,159 @@
+import logging
 import random
+import threading
+import time
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from .emums import CustomerStatus
 
+
+STATUSES = {status.value for status in CustomerStatus}
+# Shortest counting window of SharedRateLimiter, in seconds
+MIN_WINDOW = 0.1
+
+logger = logging.getLogger(__name__)
+
+
+class VerificationError(Exception):
+    """
+    The verification service did not return a usable status.
+    """
+
+
 def get_customer_status_mock(customer_id):
 
     return random.choice([
         CustomerStatus.VERIFIED.value,
         CustomerStatus.UNVERIFIED.value,
-        CustomerStatus.BLOCKED.value])
\ No newline at end of file
+        CustomerStatus.BLOCKED.value])
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter spacing calls `1 / rate` seconds apart.
+
+    `acquire()` reserves the next free slot under a lock and sleeps until
+    it outside the lock, so waiting threads do not block each other.
+    """
+
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate else 0
+        self.next_slot = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            slot = max(self.next_slot, now)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class SharedRateLimiter:
+    """
+    Limiter shared by every worker process through the default cache
+    (Redis), so concurrent sync tasks together stay under `rate`.
+
+    Calls are counted per window of `max(1 / rate, MIN_WINDOW)` seconds
+    in an atomic cache counter; once a window's share of the rate is
+    used, callers sleep until the next window. If the cache is down, each
+    process falls back to its own in-process `RateLimiter`.
+    """
+
+    def __init__(self, rate, key='verification-rate'):
+        self.window = max(1 / rate, MIN_WINDOW) if rate else 0
+        self.budget = round(rate * self.window) if rate else 0
+        self.key = key
+        self.fallback = RateLimiter(rate)
+
+    def acquire(self):
+        if not self.window:
+            return
+        while True:
+            now = time.time()
+            window = int(now // self.window)
+            key = f"{self.key}:{window}"
+            try:
+                cache.add(key, 0, timeout=int(self.window) + 2)
+                count = cache.incr(key)
+            except ValueError:
+                # Evicted between add and incr
+                continue
+            except Exception as error:
+                logger.warning(f"Shared rate limiter unavailable, limiting per process: {error}")
+                self.fallback.acquire()
+                return
+            if count <= self.budget:
+                return
+            time.sleep(max((window + 1) * self.window - now, 0))
+
+
+class VerificationClient:
+    """
+    HTTP client of the customer verification service.
+
+    GET `<base_url>/customers/<id>/status` answers `{"status": "<CustomerStatus value>"}`.
+    Connection errors, 429 and 5xx responses are retried `retries` times
+    with exponential backoff (honouring Retry-After). One requests session
+    (connection pool) is kept per thread.
+
+    Calls are spaced by `limiter` when given, else by an in-process
+    `RateLimiter(rate)`.
+    """
+
+    def __init__(self, base_url, timeout=5, retries=3, backoff=0.5, rate=None, limiter=None):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.retry = Retry(
+            total=retries, backoff_factor=backoff, status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=('GET',), raise_on_status=False,
+        )
+        self.limiter = limiter or RateLimiter(rate)
+        self.sessions = threading.local()
+
+    def session(self):
+        session = getattr(self.sessions, 'session', None)
+        if session is None:
+            session = self.sessions.session = requests.Session()
+            session.mount(self.base_url, HTTPAdapter(max_retries=self.retry))
+        return session
+
+    def get_status(self, customer_id):
+        """
+        Raises:
+            VerificationError: On a failed request (after retries) or an unknown status.
+        """
+        self.limiter.acquire()
+        try:
+            response = self.session().get(f"{self.base_url}/customers/{customer_id}/status", timeout=self.timeout)
+            response.raise_for_status()
+            status = response.json().get('status')
+        except (requests.RequestException, ValueError) as error:
+            raise VerificationError(f"Customer {customer_id}: {error}") from error
+        if status not in STATUSES:
+            raise VerificationError(f"Customer {customer_id}: unknown status {status!r}")
+        return status
+
+
+def get_status_fetcher():
+    """
+    Status lookup used by the sync tasks: the verification service when
+    CUSTOMER_VERIFICATION_URL is set, the mock otherwise.
+
+    Every fetcher shares one CUSTOMER_VERIFICATION_RATE budget across
+    threads, tasks and worker processes.
+    """
+    if not settings.CUSTOMER_VERIFICATION_URL:
+        return get_customer_status_mock
+    return VerificationClient(
+        settings.CUSTOMER_VERIFICATION_URL,
+        timeout=settings.CUSTOMER_VERIFICATION_TIMEOUT,
+        retries=settings.CUSTOMER_VERIFICATION_RETRIES,
+        limiter=SharedRateLimiter(settings.CUSTOMER_VERIFICATION_RATE),
+    ).get_status
@@ -0,0 +1,67 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from .external_api import VerificationError
+from .models import Customer
+
+logger = logging.getLogger(__name__)
+
+
+def sync_statuses(fetch_status, customers=None, workers=8, chunk_size=500):
+    """
+    Refresh customer statuses from the verification service.
+
+    Pipeline:
+        1. Stream (id, status) of the customers with a server-side cursor,
+           `chunk_size` rows at a time.
+        2. Fetch the chunk's statuses from `workers` threads (the fetcher
+           does its own rate limiting and retries).
+        3. Write only the customers whose status changed, with one
+           `bulk_update(['status'])` per chunk.
+
+    At most one chunk of lookups is in flight. A lookup that still fails
+    after its retries is counted and skipped; the customer keeps its status.
+
+    Args:
+        fetch_status: Callable(customer_id) -> status value, raising
+            VerificationError on failure.
+        customers: Customer QuerySet to sync (default: all).
+
+    Returns:
+        dict: checked, changed and failed counts, seconds and customers_per_second.
+    """
+    customers = Customer.objects.all() if customers is None else customers
+    rows = customers.order_by('id').values_list('id', 'status').iterator(chunk_size=chunk_size)
+
+    def lookup(customer_id):
+        try:
+            return fetch_status(customer_id)
+        except VerificationError as error:
+            logger.warning(f"Customer status sync: {error}")
+            return None
+
+    checked = changed = failed = 0
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while chunk := list(islice(rows, chunk_size)):
+            statuses = executor.map(lookup, [customer_id for customer_id, _ in chunk])
+            updates = []
+            for (customer_id, current), status in zip(chunk, statuses):
+                if status is None:
+                    failed += 1
+                elif status != current:
+                    updates.append(Customer(id=customer_id, status=status))
+            Customer.objects.bulk_update(updates, ['status'])
+            checked += len(chunk)
+            changed += len(updates)
+            logger.info(f"Customer status sync: {checked} checked, {changed} changed, {failed} failed")
+
+    seconds = time.perf_counter() - started
+    return {
+        "checked": checked,
+        "changed": changed,
+        "failed": failed,
+        "seconds": round(seconds, 3),
+        "customers_per_second": round(checked / seconds, 1) if seconds else None,
+    }
@@ -1,27 +1,70 @@
-from celery import shared_task
+from celery import group, shared_task
+from django.conf import settings
 from .models import Customer
-from .external_api import get_customer_status_mock
+from .external_api import get_status_fetcher
+from .status_sync import sync_statuses
 
 
 @shared_task
 def sync_customers_status_task():
-    customers = Customer.objects.all()
-    updated = 0
-    for customer in customers:
-        new_status = get_customer_status_mock(customer.id)
-        customer.status=new_status
-        customer.save()
-        updated += 1
-
-    return f"{updated} customers status updated successfully"
+    """
+    Refresh every customer's status from the verification service
+    (see `sync_statuses`); only changed rows are written.
+    """
+    stats = sync_statuses(
+        get_status_fetcher(),
+        workers=settings.CUSTOMER_SYNC_WORKERS,
+        chunk_size=settings.CUSTOMER_SYNC_CHUNK_SIZE,
+    )
+    return (
+        f"{stats['checked']} customers checked, {stats['changed']} status updated, {stats['failed']} failed "
+        f"({stats['customers_per_second']} customers/s)"
+    )
 
 @shared_task
 def sync_single_customer_status_task(customer_id):
 
     customer = Customer.objects.get(id=customer_id)
 
-    new_status = get_customer_status_mock(customer.id)
-    customer.status = new_status
-    customer.save()
+    new_status = get_status_fetcher()(customer.id)
+    if new_status != customer.status:
+        customer.status = new_status
+        customer.save(update_fields=['status'])
 
     return f"Customer {customer_id} status updated successfully"
+
+
+@shared_task
+def sync_customer_batch_task(customer_ids):
+    """
+    Refresh the statuses of a batch of customers: one fetch of the batch,
+    concurrent lookups and one bulk_update of the changed rows.
+
+    Returns:
+        dict: The `sync_statuses` stats of the batch.
+    """
+    return sync_statuses(
+        get_status_fetcher(),
+        customers=Customer.objects.filter(id__in=customer_ids),
+        workers=settings.CUSTOMER_SYNC_WORKERS,
+        chunk_size=max(len(customer_ids), 1),
+    )
+
+
+def dispatch_customer_sync(customer_ids, batch_size=None):
+    """
+    Fan the sync of `customer_ids` out as a Celery group of
+    `sync_customer_batch_task`, one message per batch of `batch_size`
+    (default CUSTOMER_SYNC_BATCH_SIZE) ids.
+
+    The group result is saved in the result backend so its progress can
+    be looked up later from its id (`GroupResult.restore`).
+
+    Returns:
+        GroupResult
+    """
+    batch_size = batch_size or settings.CUSTOMER_SYNC_BATCH_SIZE
+    batches = [customer_ids[index:index + batch_size] for index in range(0, len(customer_ids), batch_size)]
+    result = group(sync_customer_batch_task.s(batch) for batch in batches).apply_async()
+    result.save()
+    return result
@@ -0,0 +1,62 @@
+import json
+from django.db import connection
+from rest_framework.pagination import CursorPagination
+from rest_framework.settings import api_settings
+
+
+def estimate_count(queryset):
+    """
+    Cheap row-count estimate, instead of a COUNT(*) that rescans the table.
+
+    - Unfiltered querysets read `pg_class.reltuples` (kept up to date by
+      autovacuum / ANALYZE).
+    - Filtered querysets use the planner's row estimate from EXPLAIN.
+
+    Returns:
+        int | None: The estimate, or None if the table was never analyzed.
+    """
+    if not queryset.query.where:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        if row and row[0] >= 0:
+            return row[0]
+    plan = json.loads(queryset.order_by().explain(format='json'))
+    rows = plan[0]['Plan']['Plan Rows']
+    return int(rows) if rows is not None else None
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Cursor (keyset) pagination on `(-created_at, id)`.
+
+    Pages are fetched with `WHERE created_at < <cursor> ORDER BY created_at
+    DESC, id LIMIT n`, so any page costs the same as the first one and no
+    COUNT(*) is run. `id` breaks ties between rows created at the same
+    instant.
+
+    Query params:
+        - cursor: Opaque position returned in `next` / `previous`
+        - page_size: Rows per page (default PAGE_SIZE, at most `max_page_size`)
+        - count=estimate: Add `estimated_count` from the table statistics
+    """
+    ordering = ('-created_at', 'id')
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    estimate_query_param = 'count'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.estimated_count = None
+        if request.query_params.get(self.estimate_query_param) == 'estimate':
+            self.estimated_count = estimate_count(queryset)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if self.estimated_count is not None:
+            response.data['estimated_count'] = self.estimated_count
+        return response
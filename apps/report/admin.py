@@ -1,3 +1,10 @@
 from django.contrib import admin
+from .models import ReportJob
 
-# Register your models here.
+
+@admin.register(ReportJob)
+class ReportJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'report', 'status', 'requested_by', 'created_at', 'duration_ms')
+    list_filter = ('report', 'status')
+    list_select_related = ('requested_by',)
+    readonly_fields = [field.name for field in ReportJob._meta.fields]
@@ -0,0 +1,148 @@
+import hashlib
+import json
+import logging
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+PREFIX = "dashboard"
+VERSION_KEY = f"{PREFIX}:v"
+POLL_INTERVAL = 0.05
+
+logger = logging.getLogger(__name__)
+
+
+class DashboardCache:
+    """
+    Cache of the report dashboard context, one entry per filter combination.
+
+    An entry is fresh for `timeout` seconds and while the data version it
+    was computed under is current; booking, vehicle and customer writes
+    bump the version once their transaction commits. Expired entries are
+    kept for `stale_timeout` seconds so they can still be served.
+
+    Single flight: when an entry is expired, the first worker to take the
+    entry's lock (`cache.add`) recomputes it while the others serve the
+    stale entry. With no entry at all they wait for the lock holder, up
+    to `lock_timeout` seconds, instead of all querying the database.
+
+    When the cache is unreachable the context is computed directly and a
+    warning is logged.
+    """
+
+    def __init__(self, timeout=None, stale_timeout=None, lock_timeout=None):
+        self._timeout = timeout
+        self._stale_timeout = stale_timeout
+        self._lock_timeout = lock_timeout
+
+    @property
+    def timeout(self):
+        if self._timeout is not None:
+            return self._timeout
+        return getattr(settings, 'REPORT_DASHBOARD_CACHE_TIMEOUT', 60)
+
+    @property
+    def stale_timeout(self):
+        if self._stale_timeout is not None:
+            return self._stale_timeout
+        return getattr(settings, 'REPORT_DASHBOARD_STALE_TIMEOUT', 3600)
+
+    @property
+    def lock_timeout(self):
+        if self._lock_timeout is not None:
+            return self._lock_timeout
+        return getattr(settings, 'REPORT_DASHBOARD_LOCK_TIMEOUT', 30)
+
+    def get(self, filters, compute):
+        """
+        Return the cached entry of `filters`, recomputing it with
+        `compute()` when it is expired and no other worker is.
+
+        Returns:
+            dict: `context` (the result of `compute()`), `computed_at`
+            (epoch seconds) and `version`.
+        """
+        key = self._key(filters)
+        lock = f"{key}:lock"
+        try:
+            # Read the version first: a write committed while computing
+            # leaves the new entry already stale.
+            version = self._version()
+            entry = cache.get(key)
+            if entry and self.is_fresh(entry, version):
+                return entry
+            locked = cache.add(lock, 1, self.lock_timeout)
+        except Exception as error:
+            logger.warning(f"Dashboard cache read failed, computing the dashboard: {error}")
+            return self._entry(compute(), None)
+
+        if locked:
+            try:
+                return self._compute(key, version, compute)
+            finally:
+                try:
+                    cache.delete(lock)
+                except Exception as error:
+                    logger.warning(f"Dashboard cache lock not released: {error}")
+        if entry:
+            return entry
+
+        deadline = time.monotonic() + self.lock_timeout
+        try:
+            while time.monotonic() < deadline:
+                time.sleep(POLL_INTERVAL)
+                entry = cache.get(key)
+                if entry:
+                    return entry
+        except Exception as error:
+            logger.warning(f"Dashboard cache read failed, computing the dashboard: {error}")
+        # The lock holder died without storing anything
+        return self._compute(key, version, compute)
+
+    def is_fresh(self, entry, version):
+        return entry['version'] == version and time.time() - entry['computed_at'] < self.timeout
+
+    def invalidate(self):
+        """
+        Expire every entry once the current transaction commits.
+        """
+        # A cache outage must not fail a write that already committed
+        transaction.on_commit(self._bump, robust=True)
+
+    def _compute(self, key, version, compute):
+        entry = self._entry(compute(), version)
+        try:
+            cache.set(key, entry, self.stale_timeout)
+        except Exception as error:
+            logger.warning(f"Dashboard cache write failed: {error}")
+        return entry
+
+    @staticmethod
+    def _entry(context, version):
+        return {"context": context, "computed_at": time.time(), "version": version}
+
+    @staticmethod
+    def _key(filters):
+        digest = hashlib.md5(json.dumps(filters, default=str).encode()).hexdigest()
+        return f"{PREFIX}:entry:{digest}"
+
+    @staticmethod
+    def _version():
+        # Seeded from the clock so an evicted counter never restarts at a used value
+        version = cache.get(VERSION_KEY)
+        if version is None:
+            cache.add(VERSION_KEY, time.time_ns(), None)
+            version = cache.get(VERSION_KEY)
+        return version
+
+    @staticmethod
+    def _bump():
+        try:
+            cache.incr(VERSION_KEY)
+        except ValueError:
+            cache.add(VERSION_KEY, time.time_ns(), None)
+
+
+dashboard_cache = DashboardCache()
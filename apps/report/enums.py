@@ -0,0 +1,12 @@
+from enum import Enum
+
+class ReportKind(Enum):
+    BOOKINGS = "bookings"
+    VEHICLE_UTILIZATION = "vehicle-utilization"
+
+
+class ReportJobStatus(Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
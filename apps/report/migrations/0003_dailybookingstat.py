@@ -0,0 +1,65 @@
+# Generated by Django 5.2.7 on 2026-10-17 21:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def build_daily_stats(apps, schema_editor):
+    """
+    Populate the daily booking rollup from the existing bookings.
+    """
+    from django.db.models import Count, Sum
+    from apps.report.utils.calculations import InclusiveDays
+
+    Booking = apps.get_model('booking', 'Booking')
+    DailyBookingStat = apps.get_model('report', 'DailyBookingStat')
+    rows = (
+        Booking.objects.order_by()
+        .values('start_date', 'vehicle_id', 'vehicle__vehicle_type', 'status')
+        .annotate(count=Count('id'), days=Sum(InclusiveDays('start_date', 'end_date')), revenue=Sum('total_price'))
+    )
+    DailyBookingStat.objects.bulk_create(
+        (
+            DailyBookingStat(
+                day=row['start_date'],
+                vehicle_id=row['vehicle_id'],
+                vehicle_type=row['vehicle__vehicle_type'],
+                status=row['status'],
+                booking_count=row['count'],
+                booked_days=row['days'],
+                revenue=row['revenue'] or 0,
+            )
+            for row in rows.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0005_booking_keyset_pagination_indexes'),
+        ('report', '0002_remove_vehiclepartobservation_report_and_more'),
+        ('vehicle', '0007_vehicle_keyset_pagination_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyBookingStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('vehicle_type', models.CharField(choices=[('car', 'Car'), ('van', 'Van'), ('truck', 'Truck'), ('motorbike', 'Motorbike')], max_length=20)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('confirmed', 'Confirmed'), ('cancelled', 'Cancelled'), ('completed', 'Completed')], max_length=20)),
+                ('booking_count', models.IntegerField(default=0)),
+                ('booked_days', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('vehicle', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='vehicle.vehicle')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['day', 'status'], name='daily_stat_day_status_idx')],
+                'constraints': [models.UniqueConstraint(fields=('day', 'vehicle', 'vehicle_type', 'status'), name='daily_booking_stat_key')],
+            },
+        ),
+        migrations.RunPython(build_daily_stats, migrations.RunPython.noop),
+    ]
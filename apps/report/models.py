@@ -1,3 +1,92 @@
+import uuid
+from django.conf import settings
 from django.db import models
+from apps.booking.enums import BookingStatus
+from apps.vehicle.models import Vehicle
+from apps.vehicle.enums import VehicleType
+from .enums import ReportJobStatus, ReportKind
 
-# Create your models here.
+
+class DailyBookingStat(models.Model):
+    """
+    Daily booking rollup read by the reports: one row per start day,
+    vehicle and status, with the totals of the bookings starting that day.
+
+    Maintained incrementally by `apps.report.rollup.booking_rollup` from
+    booking writes and status transitions.
+
+    Fields:
+        day: Start date of the counted bookings.
+        vehicle: Booked vehicle.
+        vehicle_type: Type of the vehicle (kept in step when it changes).
+        status: Booking status.
+        booking_count: Number of bookings.
+        booked_days: Sum of their durations in days (both ends included).
+        revenue: Sum of their total prices.
+    """
+    day = models.DateField()
+    vehicle = models.ForeignKey(Vehicle, on_delete=models.CASCADE, related_name='daily_stats')
+    vehicle_type = models.CharField(max_length=20, choices=[(type.value, type.name.title()) for type in VehicleType])
+    status = models.CharField(max_length=20, choices=[(status.value, status.name.title()) for status in BookingStatus])
+    booking_count = models.IntegerField(default=0)
+    booked_days = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['day', 'vehicle', 'vehicle_type', 'status'],
+                name='daily_booking_stat_key',
+            ),
+        ]
+        indexes = [
+            # Report windows, optionally filtered by status
+            models.Index(fields=['day', 'status'], name='daily_stat_day_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} vehicle {self.vehicle_id} ({self.status}): {self.booking_count} bookings"
+
+
+class ReportJob(models.Model):
+    """
+    PDF report rendered in the background by `generate_report_task`.
+
+    Fields:
+        id: Random UUID, used in the status and download URLs.
+        report: Which report (ReportKind).
+        params: Report query parameters, {name: [values]}.
+        status: Pending, Running, Done or Failed.
+        file: The rendered PDF in media storage (once done).
+        error: Failure message.
+        requested_by: User who requested the report.
+        created_at / started_at / finished_at: Job timestamps.
+        duration_ms: Rendering time, from start to finish.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    report = models.CharField(max_length=30, choices=[(kind.value, kind.name.title()) for kind in ReportKind])
+    params = models.JSONField(default=dict, blank=True)
+    status = models.CharField(
+        max_length=20,
+        choices=[(status.value, status.name.title()) for status in ReportJobStatus],
+        default=ReportJobStatus.PENDING.value,
+    )
+    file = models.FileField(upload_to='reports/%Y/%m/', blank=True)
+    error = models.TextField(blank=True)
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='report_jobs',
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    duration_ms = models.PositiveIntegerField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.report} report {self.id} ({self.status})"
@@ -0,0 +1,78 @@
+from datetime import datetime
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpRequest, QueryDict
+from apps.booking.enums import BookingStatus
+from .enums import ReportKind
+from .utils.calculations import UTILIZATION_STATUSES, report_summary, vehicle_utilization
+from .utils.filters import get_filtered_bookings, get_utilization_filters
+from .utils.pdf import render_to_pdf
+
+
+def bookings_pdf_context(request):
+    bookings = get_filtered_bookings(request)
+    return {
+        "bookings": bookings,
+        **report_summary(bookings),
+        "generated_at": datetime.now(),
+    }
+
+
+def utilization_context(request):
+    start, end, statuses = get_utilization_filters(request)
+    return {
+        "vehicles_data": vehicle_utilization(start, end, statuses or UTILIZATION_STATUSES),
+        "start_date": start,
+        "end_date": end,
+        "status_choices": [(status.name, status.value) for status in BookingStatus],
+        "selected_statuses": request.GET.getlist('status'),
+        "generated_at": datetime.now(),
+    }
+
+
+def utilization_pdf_context(request):
+    context = utilization_context(request)
+    user = request.user
+    # A background job's requester may have been deleted since
+    context["user_name"] = (user.get_full_name() or user.username) if user.is_authenticated else ""
+    return context
+
+
+# report -> (template, context builder, file name builder)
+PDF_REPORTS = {
+    ReportKind.BOOKINGS.value: (
+        "report/bookings_report_pdf.html",
+        bookings_pdf_context,
+        lambda context: "bookings_report.pdf",
+    ),
+    ReportKind.VEHICLE_UTILIZATION.value: (
+        "report/vehicle_utilization_report_pdf.html",
+        utilization_pdf_context,
+        lambda context: f"vehicle_utilization_{context['start_date']}_{context['end_date']}.pdf",
+    ),
+}
+
+
+def render_pdf_report(report, request):
+    """
+    Render a PDF report with the filters of `request`.
+
+    Returns:
+        tuple(bytes | None, str): The PDF (None if rendering failed) and its file name.
+    """
+    template, build_context, filename = PDF_REPORTS[report]
+    context = build_context(request)
+    return render_to_pdf(template, context), filename(context)
+
+
+def job_request(job):
+    """
+    Request carrying a report job's parameters and user, for the report
+    context builders (which read `request.GET` and `request.user`).
+    The user is anonymous once the requester has been deleted.
+    """
+    request = HttpRequest()
+    request.GET = QueryDict(mutable=True)
+    for name, values in job.params.items():
+        request.GET.setlist(name, values if isinstance(values, list) else [values])
+    request.user = job.requested_by or AnonymousUser()
+    return request
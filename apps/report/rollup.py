@@ -0,0 +1,159 @@
+from collections import defaultdict
+from decimal import Decimal
+from django.db import connection, transaction
+from django.db.models import Count, DecimalField, Sum, Value
+from django.db.models.functions import Coalesce
+from apps.booking.models import Booking
+from apps.vehicle.models import Vehicle
+from .models import DailyBookingStat
+from .utils.calculations import InclusiveDays
+
+
+class BookingRollup:
+    """
+    Incrementally maintained `DailyBookingStat` table.
+
+    Booking writes are turned into facts, (start_date, vehicle_id, status,
+    booked days, total_price), and applied as signed deltas: a new booking
+    adds its fact, a deleted one removes it, and an edit or a status
+    transition removes the old fact and adds the new one. The reports then
+    aggregate a few rows per day instead of the whole Booking table.
+
+    `rebuild` and `check` recompute the rows from the ORM (backfill and
+    reconciliation).
+    """
+
+    def apply(self, add=(), remove=()):
+        """
+        Add and remove booking facts with one upsert.
+
+        Counters are incremented in SQL (INSERT ... ON CONFLICT DO UPDATE),
+        so concurrent writers never lose an update. Rows left with no
+        booking keep zero counters until the next booking of their key or
+        the next rebuild.
+
+        Args:
+            add: Iterable of facts (see `Booking.rollup_fact`) to count.
+            remove: Iterable of facts to stop counting.
+        """
+        deltas = defaultdict(lambda: [0, 0, Decimal(0)])
+        for sign, facts in ((1, add), (-1, remove)):
+            for day, vehicle_id, status, days, revenue in facts:
+                delta = deltas[(day, vehicle_id, status)]
+                delta[0] += sign
+                delta[1] += sign * days
+                delta[2] += sign * Decimal(revenue)
+        keys = sorted(key for key, delta in deltas.items() if any(delta))
+        if not keys:
+            return
+
+        table = DailyBookingStat._meta.db_table
+        sql = f"""
+            INSERT INTO {table} AS stat (day, vehicle_id, vehicle_type, status, booking_count, booked_days, revenue)
+            SELECT delta.day, delta.vehicle_id, vehicle.vehicle_type, delta.status,
+                   delta.booking_count, delta.booked_days, delta.revenue
+            FROM UNNEST(%s::date[], %s::bigint[], %s::varchar[], %s::integer[], %s::integer[], %s::numeric[])
+                AS delta(day, vehicle_id, status, booking_count, booked_days, revenue)
+            JOIN {Vehicle._meta.db_table} AS vehicle ON vehicle.id = delta.vehicle_id
+            ORDER BY delta.day, delta.vehicle_id, delta.status
+            ON CONFLICT (day, vehicle_id, vehicle_type, status) DO UPDATE SET
+                booking_count = stat.booking_count + EXCLUDED.booking_count,
+                booked_days = stat.booked_days + EXCLUDED.booked_days,
+                revenue = stat.revenue + EXCLUDED.revenue
+        """
+        columns = [list(column) for column in zip(*keys)]
+        counters = [list(column) for column in zip(*(deltas[key] for key in keys))]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, columns + counters)
+
+    def add(self, *facts):
+        self.apply(add=facts)
+
+    def remove(self, *facts):
+        self.apply(remove=facts)
+
+    def retype(self, vehicle_id, vehicle_type):
+        """
+        Move the rows of a vehicle whose type changed to its new type.
+        """
+        DailyBookingStat.objects.filter(vehicle_id=vehicle_id).exclude(vehicle_type=vehicle_type).update(
+            vehicle_type=vehicle_type,
+        )
+
+    def rebuild(self, vehicle_ids=None):
+        """
+        Recompute rollup rows from the Booking table with one
+        INSERT ... SELECT (the backfill).
+
+        Args:
+            vehicle_ids: Optional iterable restricting the rebuild; by
+                default the whole table is replaced.
+
+        Returns:
+            int: Number of rows written.
+        """
+        if vehicle_ids is not None:
+            vehicle_ids = list(vehicle_ids)
+        select, params = self.expected_rows(vehicle_ids).query.sql_with_params()
+        table = DailyBookingStat._meta.db_table
+        with transaction.atomic():
+            stale = DailyBookingStat.objects.all()
+            if vehicle_ids is not None:
+                stale = stale.filter(vehicle_id__in=vehicle_ids)
+            stale.delete()
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"INSERT INTO {table} (day, vehicle_id, vehicle_type, status, booking_count, booked_days, revenue) "
+                    f"{select}",
+                    params,
+                )
+                return cursor.rowcount
+
+    def check(self, vehicle_ids=None):
+        """
+        Compare the stored rollup with the totals computed from the Booking table.
+
+        Returns:
+            list[int]: Ids of vehicles whose rows differ.
+        """
+        stored = DailyBookingStat.objects.exclude(booking_count=0)
+        if vehicle_ids is not None:
+            vehicle_ids = list(vehicle_ids)
+            stored = stored.filter(vehicle_id__in=vehicle_ids)
+        expected = {
+            (row['start_date'], row['vehicle_id'], row['vehicle__vehicle_type'], row['status']):
+                (row['booking_count'], row['booked_days'], row['revenue'])
+            for row in self.expected_rows(vehicle_ids)
+        }
+        actual = {
+            (day, vehicle_id, vehicle_type, status): (count, days, revenue)
+            for day, vehicle_id, vehicle_type, status, count, days, revenue in stored.values_list(
+                'day', 'vehicle_id', 'vehicle_type', 'status', 'booking_count', 'booked_days', 'revenue',
+            )
+        }
+        return sorted({
+            key[1] for key in expected.keys() | actual.keys() if expected.get(key) != actual.get(key)
+        })
+
+    @staticmethod
+    def expected_rows(vehicle_ids=None):
+        """
+        Booking totals grouped by (start_date, vehicle, vehicle type, status),
+        in the column order of `DailyBookingStat`.
+        """
+        bookings = Booking.objects.all()
+        if vehicle_ids is not None:
+            bookings = bookings.filter(vehicle_id__in=vehicle_ids)
+        return (
+            bookings
+            .order_by()
+            .values('start_date', 'vehicle_id', 'vehicle__vehicle_type', 'status')
+            .annotate(
+                booking_count=Count('id'),
+                booked_days=Sum(InclusiveDays('start_date', 'end_date')),
+                revenue=Coalesce(Sum('total_price'), Value(0), output_field=DecimalField()),
+            )
+        )
+
+
+booking_rollup = BookingRollup()
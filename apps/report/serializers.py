@@ -0,0 +1,41 @@
+from rest_framework import serializers
+from django.urls import reverse
+from .enums import ReportJobStatus, ReportKind
+from .models import ReportJob
+
+# Query parameters the PDF reports understand
+REPORT_PARAMS = ('start_date', 'end_date', 'status')
+
+
+class ReportJobRequestSerializer(serializers.Serializer):
+    report = serializers.ChoiceField(choices=[kind.value for kind in ReportKind])
+    params = serializers.DictField(required=False, default=dict)
+
+    def validate_params(self, params):
+        unknown = set(params) - set(REPORT_PARAMS)
+        if unknown:
+            raise serializers.ValidationError(f"Unknown parameters: {', '.join(sorted(unknown))}.")
+        return {
+            name: [str(value) for value in values] if isinstance(values, list) else [str(values)]
+            for name, values in params.items()
+        }
+
+
+class ReportJobSerializer(serializers.ModelSerializer):
+    status_url = serializers.SerializerMethodField()
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ReportJob
+        fields = [
+            'id', 'report', 'params', 'status', 'error', 'created_at', 'started_at', 'finished_at',
+            'duration_ms', 'status_url', 'download_url',
+        ]
+
+    def get_status_url(self, job):
+        return self.context['request'].build_absolute_uri(reverse('report:report_job', args=[job.id]))
+
+    def get_download_url(self, job):
+        if job.status != ReportJobStatus.DONE.value:
+            return None
+        return self.context['request'].build_absolute_uri(reverse('report:report_job_download', args=[job.id]))
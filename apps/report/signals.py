@@ -0,0 +1,88 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from apps.booking.batch import bookings_created
+from apps.booking.models import Booking
+from apps.booking.transitions import bookings_transitioned
+from apps.customer.models import Customer
+from apps.vehicle.models import Vehicle
+from .cache import dashboard_cache
+from .rollup import booking_rollup
+
+
+_UNKNOWN = object()
+
+
+@receiver(post_save, sender=Booking)
+def sync_rollup_on_save(sender, instance, created, raw=False, **kwargs):
+    """
+    Move a saved booking's fact in the report rollup.
+
+    Bookings loaded with deferred date/status/price fields have no
+    snapshot and fall back to a rebuild of their vehicle's rows.
+    """
+    if raw:
+        return
+    previous = None if created else getattr(instance, '_loaded_fact', _UNKNOWN)
+    current = instance.rollup_fact()
+
+    if previous is _UNKNOWN:
+        booking_rollup.rebuild(vehicle_ids=[instance.vehicle_id])
+    elif previous != current:
+        booking_rollup.apply(add=[current], remove=[previous] if previous else [])
+    instance._loaded_fact = current
+
+
+@receiver(post_delete, sender=Booking)
+def sync_rollup_on_delete(sender, instance, origin=None, **kwargs):
+    """
+    Stop counting a deleted booking.
+    Skipped when the vehicle itself is deleted: its rollup rows go with it.
+    """
+    if isinstance(origin, Vehicle) or getattr(origin, 'model', None) is Vehicle:
+        return
+    fact = getattr(instance, '_loaded_fact', None)
+    if fact:
+        booking_rollup.remove(fact)
+
+
+@receiver(bookings_created)
+def sync_rollup_on_batch(sender, bookings, **kwargs):
+    booking_rollup.apply(add=[booking.rollup_fact() for booking in bookings])
+
+
+@receiver(bookings_transitioned)
+def sync_rollup_on_transition(sender, to_status, transitions, **kwargs):
+    """
+    Move the facts of bookings changed by a bulk transition to their new status.
+    """
+    add, remove = [], []
+    for row in transitions:
+        days = (row.end_date - row.start_date).days + 1
+        price = row.total_price or 0
+        remove.append((row.start_date, row.vehicle_id, row.old_status, days, price))
+        add.append((row.start_date, row.vehicle_id, to_status, days, price))
+    booking_rollup.apply(add=add, remove=remove)
+
+
+@receiver(post_save, sender=Vehicle)
+def sync_rollup_on_vehicle_save(sender, instance, created, raw=False, **kwargs):
+    """
+    Keep the rollup's vehicle_type in step with the vehicle (a no-op
+    UPDATE unless the type changed).
+    """
+    if raw or created:
+        return
+    booking_rollup.retype(instance.id, instance.vehicle_type)
+
+
+@receiver([post_save, post_delete], sender=Booking)
+@receiver([post_save, post_delete], sender=Vehicle)
+@receiver([post_save, post_delete], sender=Customer)
+@receiver(bookings_created)
+@receiver(bookings_transitioned)
+def invalidate_dashboard(sender, raw=False, **kwargs):
+    """
+    Expire the cached dashboards after any booking, vehicle or customer write.
+    """
+    if not raw:
+        dashboard_cache.invalidate()
@@ -0,0 +1,71 @@
+import logging
+import time
+from celery import shared_task
+from django.core.files.base import ContentFile
+from django.utils import timezone
+from .enums import ReportJobStatus
+from .models import ReportJob
+from .pdf_reports import job_request, render_pdf_report
+from .rollup import booking_rollup
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def rebuild_booking_rollup_task(vehicle_ids=None):
+    """
+    Backfill the daily booking rollup from the Booking table.
+    """
+    count = booking_rollup.rebuild(vehicle_ids=vehicle_ids)
+    return f"Booking rollup rebuilt: {count} rows"
+
+
+@shared_task
+def reconcile_booking_rollup_task():
+    """
+    Compare the daily booking rollup with the Booking table and rebuild
+    the rows of the vehicles that drifted (e.g. after raw SQL or bulk
+    imports that bypass the signals).
+    """
+    drifted = booking_rollup.check()
+    if not drifted:
+        return "Booking rollup is consistent"
+    logger.warning(f"Booking rollup out of sync for {len(drifted)} vehicles, rebuilding them")
+    booking_rollup.rebuild(vehicle_ids=drifted)
+    return f"Booking rollup rebuilt for {len(drifted)} vehicles"
+
+
+@shared_task
+def generate_report_task(job_id):
+    """
+    Render a ReportJob's PDF with the report's template and store it in
+    media storage. The job records its status, duration and any error.
+
+    The job is claimed by moving it from PENDING to RUNNING in one UPDATE,
+    so a redelivered message skips a job that is running or finished.
+    """
+    claimed = ReportJob.objects.filter(id=job_id, status=ReportJobStatus.PENDING.value).update(
+        status=ReportJobStatus.RUNNING.value, started_at=timezone.now(),
+    )
+    if not claimed:
+        logger.info(f"Report job {job_id} is not pending, skipping it")
+        return f"Report job {job_id} skipped"
+    job = ReportJob.objects.select_related('requested_by').get(id=job_id)
+
+    started = time.perf_counter()
+    try:
+        pdf, filename = render_pdf_report(job.report, job_request(job))
+        if pdf is None:
+            raise ValueError("Error generating PDF")
+        job.file.save(f"{job.id}/{filename}", ContentFile(pdf), save=False)
+        job.status = ReportJobStatus.DONE.value
+    except Exception as error:
+        logger.exception(f"Report job {job.id} ({job.report}) failed")
+        job.status = ReportJobStatus.FAILED.value
+        job.error = str(error)
+    job.finished_at = timezone.now()
+    job.duration_ms = round((time.perf_counter() - started) * 1000)
+    job.save(update_fields=['status', 'file', 'error', 'finished_at', 'duration_ms'])
+
+    logger.info(f"Report job {job.id} ({job.report}) {job.status} in {job.duration_ms}ms")
+    return f"Report job {job.id} {job.status} in {job.duration_ms}ms"
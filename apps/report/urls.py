@@ -9,4 +9,7 @@ urlpatterns = [
     path("bookings/pdf/", views.bookings_report_pdf, name="bookings_report_pdf"),
     path('vehicle-utilization/', views.vehicle_utilization_report, name='vehicle_utilization'),
     path('vehicle-utilization/pdf/', views.vehicle_utilization_report_pdf, name='vehicle_utilization_pdf'),
+    path('jobs/', views.ReportJobCreateView.as_view(), name='report_jobs'),
+    path('jobs/<uuid:job_id>/', views.ReportJobDetailView.as_view(), name='report_job'),
+    path('jobs/<uuid:job_id>/download/', views.ReportJobDownloadView.as_view(), name='report_job_download'),
 ]
@@ -1,43 +1,137 @@
-from collections import Counter
 from calendar import month_name
 from datetime import datetime
+from decimal import Decimal
 from apps.booking.models import Booking
+from apps.report.models import DailyBookingStat
 from apps.vehicle.models import Vehicle
 from apps.booking.enums import BookingStatus
-from django.db.models import Sum
+from django.db.models import Count, DateField, Func, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, ExtractMonth, Greatest, Least
 
-def bookings_by_status(bookings_qs):
-    status_counter = Counter([b.status for b in bookings_qs])
-    return [
-        {"status": status.name.title(), "count": status_counter.get(status.value, 0)}
-        for status in BookingStatus
-    ]
+# Statuses that count as booked days by default (cancelled bookings never used the vehicle)
+UTILIZATION_STATUSES = tuple(status.value for status in BookingStatus if status != BookingStatus.CANCELLED)
 
-def calculate_vehicle_utilization(vehicle, month, year, days_in_month):
-    bookings = Booking.objects.filter(
-        vehicle=vehicle,
-        start_date__month=month,
-        start_date__year=year,
-    )
-    total_bookings_days = sum([(b.end_date - b.start_date).days + 1 for b in bookings], 0)
-    utilization = (total_bookings_days / days_in_month) * 100 if days_in_month > 0 else 0
+def _summary(queryset, count, revenue):
+    """
+    Overall and per-status totals of `queryset` in one aggregate query:
+    `count(matches)` and `revenue(matches)` build the aggregates, and
+    the per-status ones are conditional (... FILTER (WHERE status = ...)).
+    """
+    aggregates = {"total_bookings": count(None), "total_revenue": revenue(None)}
+    for status in BookingStatus:
+        matches = Q(status=status.value)
+        aggregates[f"{status.value}_count"] = count(matches)
+        aggregates[f"{status.value}_revenue"] = revenue(matches)
+    totals = queryset.aggregate(**aggregates)
     return {
-        "vehicle": vehicle,
-        "booked_days": total_bookings_days,
-        "total_days": days_in_month,
-        "utilization": round(utilization, 1),
+        "total_bookings": totals["total_bookings"],
+        "total_revenue": totals["total_revenue"],
+        "by_status": [
+            {
+                "status": status.name.title(),
+                "count": totals[f"{status.value}_count"],
+                "revenue": totals[f"{status.value}_revenue"],
+            }
+            for status in BookingStatus
+        ],
     }
 
+
+def report_summary(bookings_qs):
+    """
+    Totals of a Booking queryset (the rows a report lists) in one query.
+
+    Returns:
+        dict: total_bookings, total_revenue and by_status
+        (list of {status, count, revenue}, one per BookingStatus).
+    """
+    return _summary(
+        bookings_qs,
+        count=lambda matches: Count('id', filter=matches),
+        revenue=lambda matches: Coalesce(Sum('total_price', filter=matches), Decimal(0)),
+    )
+
+
+def rollup_summary(stats_qs):
+    """
+    Same totals as `report_summary`, from daily rollup rows
+    (DailyBookingStat) instead of bookings; used by the unfiltered
+    dashboard.
+    """
+    return _summary(
+        stats_qs,
+        count=lambda matches: Coalesce(Sum('booking_count', filter=matches), 0),
+        revenue=lambda matches: Coalesce(Sum('revenue', filter=matches), Decimal(0)),
+    )
+
+class InclusiveDays(Func):
+    """
+    Number of days from `start` to `end`, both included (PostgreSQL date
+    subtraction returns whole days).
+    """
+    template = "(%(expressions)s + 1)"
+    arg_joiner = " - "
+    output_field = IntegerField()
+
+    def __init__(self, start, end):
+        super().__init__(end, start)
+
+
+def vehicle_utilization(start, end, statuses=UTILIZATION_STATUSES, vehicles=None):
+    """
+    Booked days and utilization of every vehicle over [start, end].
+
+    Each booking overlapping the window is clipped to it in SQL (a booking
+    that started before `start` or ends after `end` only counts its days
+    inside the window), and the days are summed per vehicle in a
+    correlated subquery, so the whole report is one query whatever the
+    fleet size.
+
+    Args:
+        start, end (date): Reporting window, both included.
+        statuses: Booking statuses that count as booked.
+        vehicles: Vehicle QuerySet (default: all vehicles).
+
+    Returns:
+        list[dict]: vehicle, booked_days, total_days, utilization (%).
+    """
+    start_value, end_value = Value(start, DateField()), Value(end, DateField())
+    booked_days = (
+        Booking.objects
+        .filter(vehicle=OuterRef('pk'), status__in=statuses, start_date__lte=end, end_date__gte=start)
+        .order_by()
+        .values('vehicle')
+        .annotate(days=Sum(InclusiveDays(Greatest('start_date', start_value), Least('end_date', end_value))))
+        .values('days')
+    )
+    vehicles = Vehicle.objects.all() if vehicles is None else vehicles
+    vehicles = vehicles.annotate(booked_days=Coalesce(Subquery(booked_days, output_field=IntegerField()), 0))
+
+    total_days = (end - start).days + 1
+    return [
+        {
+            "vehicle": vehicle,
+            "booked_days": vehicle.booked_days,
+            "total_days": total_days,
+            "utilization": round(vehicle.booked_days / total_days * 100, 1) if total_days > 0 else 0,
+        }
+        for vehicle in vehicles
+    ]
+
 def monthly_revenue(current_year):
-    monthly_data = []
-    for month in range(1, 13):
-        total = Booking.objects.filter(
-            start_date__year=current_year,
-            start_date__month=month
-        ).aggregate(total=Sum('total_price'))['total'] or 0
-
-        monthly_data.append({
-            "month": month_name[month],
-            "revenue": total,
-        })
-    return monthly_data
+    """
+    Revenue of the bookings starting in each month of `current_year`,
+    from the daily rollup in one grouped query.
+    """
+    totals = dict(
+        DailyBookingStat.objects
+        .filter(day__year=current_year)
+        .annotate(month=ExtractMonth('day'))
+        .values('month')
+        .annotate(revenue=Sum('revenue'))
+        .values_list('month', 'revenue')
+    )
+    return [
+        {"month": month_name[month], "revenue": totals.get(month, 0)}
+        for month in range(1, 13)
+    ]
@@ -2,32 +2,75 @@ from apps.booking.models import Booking
 from apps.booking.enums import BookingStatus
 from datetime import datetime
 
+def get_report_filters(request):
+    """
+    Filters of the bookings reports: the start_date / end_date window
+    and a BookingStatus name. Invalid values are ignored.
+
+    Returns:
+        tuple(date | None, date | None, str | None): (start, end, status value)
+    """
+    start = end = status = None
+
+    try:
+        start = datetime.fromisoformat(request.GET.get('start_date') or '').date()
+    except ValueError:
+        pass
+
+    try:
+        end = datetime.fromisoformat(request.GET.get('end_date') or '').date()
+    except ValueError:
+        pass
+
+    status_name = request.GET.get('status')
+    if status_name in BookingStatus.__members__:
+        status = BookingStatus[status_name].value
+
+    return start, end, status
+
+
 def get_filtered_bookings(request):
+    """
+    Bookings listed by the reports: starting on or after start_date and
+    ending on or before end_date.
+    """
     qs = Booking.objects.select_related('customer__user', 'vehicle').all().order_by('-start_date')
-    
-    start = request.GET.get('start_date')
-    end = request.GET.get('end_date')
-    status_name = request.GET.get('status')
+    start, end, status = get_report_filters(request)
 
     if start:
-        try:
-            s = datetime.fromisoformat(start).date()
-            qs = qs.filter(start_date__gte=s)
-        except:
-            pass
-
+        qs = qs.filter(start_date__gte=start)
     if end:
-        try:
-            e = datetime.fromisoformat(end).date()
-            qs = qs.filter(end_date__lte=e)
-        except:
-            pass
-
-    if status_name:
-        try:
-            status_value = BookingStatus[status_name].value
-            qs = qs.filter(status=status_value)
-        except KeyError:
-            pass
+        qs = qs.filter(end_date__lte=end)
+    if status:
+        qs = qs.filter(status=status)
 
     return qs
+
+
+def get_utilization_filters(request):
+    """
+    Reporting window and statuses of the utilization report.
+
+    Query params (invalid values are ignored like in the bookings report):
+        - start_date / end_date: Window, both included (default: from the
+          first of the current month to today)
+        - status: BookingStatus name, repeatable (default: every status but CANCELLED)
+
+    Returns:
+        tuple(date, date, tuple | None): (start, end, status values or None for the default)
+    """
+    today = datetime.today().date()
+    start, end = today.replace(day=1), today
+    try:
+        start = datetime.fromisoformat(request.GET.get('start_date', '')).date()
+    except ValueError:
+        pass
+    try:
+        end = datetime.fromisoformat(request.GET.get('end_date', '')).date()
+    except ValueError:
+        pass
+
+    statuses = tuple(
+        BookingStatus[name].value for name in request.GET.getlist('status') if name in BookingStatus.__members__
+    )
+    return start, end, statuses or None
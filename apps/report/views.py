@@ -1,29 +1,54 @@
 from django.shortcuts import render
 from datetime import datetime
+import time
 from apps.vehicle.models import Vehicle
 from apps.customer.models import Customer
-from .utils.filters import get_filtered_bookings
-from .utils.calculations import bookings_by_status, calculate_vehicle_utilization, monthly_revenue
-from .utils.pdf import render_to_pdf, pdf_response
-from django.http import HttpResponse
-from django.db.models import Sum
-from calendar import month_name
+from .cache import dashboard_cache
+from .pdf_reports import render_pdf_report, utilization_context
+from .utils.filters import get_filtered_bookings, get_report_filters
+from .utils.calculations import report_summary, rollup_summary
+from .utils.pdf import pdf_response
+from django.db import transaction
+from django.http import FileResponse, HttpResponse
+from django.shortcuts import get_object_or_404
+from rest_framework import status
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
 from apps.booking.enums import BookingStatus
+from .enums import ReportJobStatus, ReportKind
+from .models import DailyBookingStat, ReportJob
+from .serializers import ReportJobRequestSerializer, ReportJobSerializer
+from .tasks import generate_report_task
 
 # ----------------------------
 # Dashboard
 # ----------------------------
-def reports_dashboard(request):
-    bookings_qs = get_filtered_bookings(request)
+def dashboard_context(request):
+    # Unfiltered totals come from the daily rollup, filtered ones from the
+    # same bookings the bookings report lists
+    if any(get_report_filters(request)):
+        summary = report_summary(get_filtered_bookings(request))
+    else:
+        summary = rollup_summary(DailyBookingStat.objects.all())
     vehicles_qs = Vehicle.objects.all()
     customers_qs = Customer.objects.all()
 
-    context = {
-        "total_bookings": bookings_qs.count(),
-        "total_revenue": bookings_qs.aggregate(total=Sum('total_price'))['total'] or 0,
-        "by_status": bookings_by_status(bookings_qs),
+    return {
+        **summary,
         "total_customers": customers_qs.count(),
         "total_vehicles": vehicles_qs.count(),
+    }
+
+
+def reports_dashboard(request):
+    entry = dashboard_cache.get(get_report_filters(request), lambda: dashboard_context(request))
+    context = {
+        **entry["context"],
+        "computed_at": datetime.fromtimestamp(entry["computed_at"]),
+        "data_age": int(time.time() - entry["computed_at"]),
         "user_name": request.user.get_full_name() or request.user.username,
     }
     return render(request, "report/dashboard.html", context)
@@ -36,9 +61,7 @@ def bookings_report_view(request):
     qs = get_filtered_bookings(request)
     context = {
         "bookings": qs,
-        "total_bookings": qs.count(),
-        "total_revenue": qs.aggregate(total=Sum('total_price'))['total'] or 0,
-        "by_status": bookings_by_status(qs),
+        **report_summary(qs),
         "status_choices": [(status.name, status.value) for status in BookingStatus],
         "filters": {
             "start_date": request.GET.get('start_date', ''),
@@ -49,51 +72,74 @@ def bookings_report_view(request):
     return render(request, "report/bookings_report.html", context)
 
 def bookings_report_pdf(request):
-    qs = get_filtered_bookings(request)
-    context = {
-        "bookings": qs,
-        "total_bookings": qs.count(),
-        "total_revenue": qs.aggregate(total=Sum('total_price'))['total'] or 0,
-        "by_status": bookings_by_status(qs),
-        "generated_at": datetime.now(),
-    }
-    pdf = render_to_pdf("report/bookings_report_pdf.html", context)
+    pdf, filename = render_pdf_report(ReportKind.BOOKINGS.value, request)
     if pdf:
-        return pdf_response(pdf, "bookings_report.pdf")
+        return pdf_response(pdf, filename)
     return HttpResponse("Error generating PDF", status=500)
 
 # ----------------------------
 # Vehicle Utilization Report 
 # ----------------------------
 def vehicle_utilization_report(request):
-    vehicles = Vehicle.objects.all()
-    today = datetime.today().date()
-    days_in_month = today.day
-
-    data = [calculate_vehicle_utilization(v, today.month, today.year, days_in_month) for v in vehicles]
-
-    context = {
-        "vehicles_data": data,
-        "month": month_name[today.month],
-        "generated_at": datetime.now(),
-        
-    }
+    context = utilization_context(request)
     return render(request, "report/vehicle_utilization_report.html", context)
 
 def vehicle_utilization_report_pdf(request):
-    vehicles = Vehicle.objects.all()
-    today = datetime.today().date()
-    days_in_month = today.day
-
-    data = [calculate_vehicle_utilization(v, today.month, today.year, days_in_month) for v in vehicles]
-
-    context = {
-        "vehicles_data": data,
-        "month": month_name[today.month],
-        "generated_at": datetime.now(),
-        "user_name": request.user.get_full_name() or request.user.username
-    }
-    pdf = render_to_pdf("report/vehicle_utilization_report_pdf.html", context)
+    pdf, filename = render_pdf_report(ReportKind.VEHICLE_UTILIZATION.value, request)
     if pdf:
-        return pdf_response(pdf, f"vehicle_utilization_{today.month}.pdf")
+        return pdf_response(pdf, filename)
     return HttpResponse("Error generating PDF", status=500)
+
+
+# ----------------------------
+# Background PDF report jobs
+# ----------------------------
+class ReportJobMixin:
+    authentication_classes = [JWTAuthentication, SessionAuthentication]
+    permission_classes = [IsAdminUser]
+
+
+class ReportJobCreateView(ReportJobMixin, APIView):
+    """
+    POST: Request a PDF report, rendered by a Celery worker.
+
+    Body: {"report": "bookings" | "vehicle-utilization", "params": {...}}
+    where params are the report's query parameters (start_date, end_date,
+    status; a list for repeated ones). Answers 202 with the job; poll its
+    `status_url` until `status` is "done", then fetch `download_url`.
+    """
+
+    def post(self, request):
+        serializer = ReportJobRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        job = ReportJob.objects.create(**serializer.validated_data, requested_by=request.user)
+        transaction.on_commit(lambda: generate_report_task.delay(str(job.id)))
+        return Response(
+            ReportJobSerializer(job, context={"request": request}).data,
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+
+class ReportJobDetailView(ReportJobMixin, APIView):
+    """
+    GET: Status of a report job.
+    """
+
+    def get(self, request, job_id):
+        job = get_object_or_404(ReportJob, id=job_id)
+        return Response(ReportJobSerializer(job, context={"request": request}).data)
+
+
+class ReportJobDownloadView(ReportJobMixin, APIView):
+    """
+    GET: The rendered PDF of a finished report job.
+    """
+
+    def get(self, request, job_id):
+        job = get_object_or_404(ReportJob, id=job_id)
+        if job.status != ReportJobStatus.DONE.value:
+            return Response(
+                {"error": f"Report is not ready (status: {job.status})."},
+                status=status.HTTP_409_CONFLICT,
+            )
+        return FileResponse(job.file.open('rb'), as_attachment=True, filename=job.file.name.rsplit('/', 1)[-1])
@@ -0,0 +1,87 @@
+from rest_framework.exceptions import ValidationError
+
+
+def parse_list_param(request, name):
+    """
+    Read a comma separated query parameter; None when it is absent.
+    """
+    value = request.query_params.get(name)
+    if value is None:
+        return None
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def get_sparse_fields(request, serializer_class):
+    """
+    Validate `?fields=` and `?expand=` against a serializer.
+
+    Expanded relations are always part of the selected fields.
+
+    Returns:
+        tuple(list | None, list): (fields, expand). `fields` is None when
+        the client did not restrict the fields.
+
+    Raises:
+        ValidationError: On an unknown field or a relation that cannot be expanded.
+    """
+    fields = parse_list_param(request, 'fields')
+    expand = parse_list_param(request, 'expand') or []
+    expandable = getattr(serializer_class.Meta, 'expandable', {})
+
+    unknown = [name for name in expand if name not in expandable]
+    if unknown:
+        raise ValidationError({"expand": f"Cannot expand {unknown}. Must be among: {sorted(expandable)}"})
+    if fields is not None:
+        available = serializer_class().fields
+        unknown = [name for name in fields if name not in available]
+        if unknown:
+            raise ValidationError({"fields": f"Unknown fields {unknown}. Must be among: {list(available)}"})
+        fields = list(dict.fromkeys([*fields, *expand]))
+    return fields, expand
+
+
+def sparse_queryset(queryset, serializer_class, fields=None, expand=(), required=()):
+    """
+    Load only what a sparse response needs.
+
+    - Relations are joined with `select_related` only when expanded.
+    - When `fields` is given, `.only()` restricts the SELECT to their
+      columns plus `required` ones (e.g. the pagination ordering).
+      Fields not backed by a model column (computed fields) disable the
+      restriction, since they may read any attribute.
+    """
+    queryset = queryset.select_related(None)
+    if expand:
+        queryset = queryset.select_related(*expand)
+    if fields is None:
+        return queryset
+
+    columns = {field.name for field in queryset.model._meta.concrete_fields}
+    serializer_fields = serializer_class().fields
+    selected = set(required)
+    for name in fields:
+        source = serializer_fields[name].source
+        if source not in columns:
+            return queryset
+        selected.add(source)
+    return queryset.only(*selected)
+
+
+class SparseFieldsMixin:
+    """
+    Serializer mixin honouring the `fields` and `expand` serializer context
+    (see `get_sparse_fields`).
+
+    `Meta.expandable` maps a relation field to the serializer used to embed
+    it; unexpanded relations stay primary keys.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        expandable = getattr(self.Meta, 'expandable', {})
+        for name in self.context.get('expand') or ():
+            self.fields[name] = expandable[name](read_only=True)
+        fields = self.context.get('fields')
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
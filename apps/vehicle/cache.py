@@ -0,0 +1,236 @@
+import hashlib
+import json
+import logging
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+PREFIX = "availability"
+FLEET_VERSION_KEY = f"{PREFIX}:v:fleet"
+STAT_KEYS = {
+    "hits": f"{PREFIX}:stats:hits",
+    "misses": f"{PREFIX}:stats:misses",
+    "vehicle_hits": f"{PREFIX}:stats:vehicle_hits",
+    "vehicle_misses": f"{PREFIX}:stats:vehicle_misses",
+}
+
+logger = logging.getLogger(__name__)
+
+
+def month_buckets(start_date, end_date):
+    """
+    Month buckets ("YYYY-MM") covered by [start_date, end_date].
+    """
+    buckets = []
+    year, month = start_date.year, start_date.month
+    while (year, month) <= (end_date.year, end_date.month):
+        buckets.append(f"{year:04d}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return buckets
+
+
+def bucket_version_key(bucket):
+    return f"{PREFIX}:v:bucket:{bucket}"
+
+
+def vehicle_version_key(vehicle_id):
+    return f"{PREFIX}:v:vehicle:{vehicle_id}"
+
+
+class AvailabilityCache:
+    """
+    Versioned cache of `/vehicles/available/` results.
+
+    Two levels are cached:
+        - the ids of the available vehicles, keyed by (date range, filters)
+          plus the version of the fleet and of every month bucket the range
+          touches;
+        - the serialized payload of each vehicle, keyed by the vehicle's
+          own version.
+
+    Nothing is ever deleted. Writers bump a version after their transaction
+    commits, so the keys built from the old version are simply never read
+    again and expire on their own:
+        - a booking change bumps the month buckets of the days it frees or
+          occupies,
+        - a vehicle create / delete, or a change of a filtered field, bumps
+          the fleet version,
+        - any vehicle change bumps that vehicle's version.
+
+    Versions are read before the database is queried, so a result computed
+    while a writer commits is stored under a version that is already stale.
+
+    The cache is an optimisation only: when it is unreachable, results are
+    computed from the database and a warning is logged.
+    """
+
+    def __init__(self, timeout=None):
+        self._timeout = timeout
+
+    @property
+    def timeout(self):
+        if self._timeout is not None:
+            return self._timeout
+        return getattr(settings, 'AVAILABILITY_CACHE_TIMEOUT', 300)
+
+    def get_vehicle_ids(self, start_date, end_date, filters, compute):
+        """
+        Return the cached available vehicle ids, or call `compute()` and
+        cache its result.
+        """
+        try:
+            key = self._result_key(start_date, end_date, filters)
+            vehicle_ids = cache.get(key)
+        except Exception as error:
+            logger.warning(f"Availability cache read failed, querying the database: {error}")
+            return list(compute())
+        if vehicle_ids is not None:
+            self._count("hits")
+            return vehicle_ids
+        self._count("misses")
+        vehicle_ids = list(compute())
+        self._store({key: vehicle_ids})
+        return vehicle_ids
+
+    def get_payloads(self, vehicle_ids, fetch, serialize):
+        """
+        Return the serialized payloads of `vehicle_ids`, in order.
+
+        Args:
+            fetch: Callable receiving the ids missing from the cache and
+                returning their Vehicle instances.
+            serialize: Callable turning a list of vehicles into a list of dicts.
+        """
+        if not vehicle_ids:
+            return []
+        try:
+            versions = self._versions([vehicle_version_key(vehicle_id) for vehicle_id in vehicle_ids])
+            keys = {
+                vehicle_id: f"{PREFIX}:vehicle:{vehicle_id}:{versions[vehicle_version_key(vehicle_id)]}"
+                for vehicle_id in vehicle_ids
+            }
+            cached = cache.get_many(keys.values())
+        except Exception as error:
+            logger.warning(f"Availability cache read failed, loading the vehicles from the database: {error}")
+            keys, cached = {}, {}
+        payloads = {vehicle_id: cached[key] for vehicle_id, key in keys.items() if key in cached}
+        missing = [vehicle_id for vehicle_id in vehicle_ids if vehicle_id not in payloads]
+        self._count("vehicle_hits", len(payloads))
+        if missing:
+            self._count("vehicle_misses", len(missing))
+            vehicles = list(fetch(missing))
+            fresh = {vehicle.id: payload for vehicle, payload in zip(vehicles, serialize(vehicles))}
+            if keys:
+                self._store({keys[vehicle_id]: payload for vehicle_id, payload in fresh.items()})
+            payloads.update(fresh)
+        # A vehicle deleted since the ids were cached is skipped
+        return [payloads[vehicle_id] for vehicle_id in vehicle_ids if vehicle_id in payloads]
+
+    def invalidate_dates(self, ranges):
+        """
+        Bump the month buckets covered by (start_date, end_date) ranges once
+        the current transaction commits.
+        """
+        buckets = set()
+        for start_date, end_date in ranges:
+            buckets.update(month_buckets(start_date, end_date))
+        if buckets:
+            self._bump_on_commit([bucket_version_key(bucket) for bucket in sorted(buckets)])
+
+    def invalidate_vehicle(self, vehicle_id, fleet=False):
+        """
+        Bump a vehicle's payload version, and the fleet version when the set
+        of vehicles matching some filters may have changed.
+        """
+        keys = [vehicle_version_key(vehicle_id)]
+        if fleet:
+            keys.append(FLEET_VERSION_KEY)
+        self._bump_on_commit(keys)
+
+    def invalidate_all(self):
+        """
+        Drop every cached result (not the vehicle payloads).
+        """
+        self._bump_on_commit([FLEET_VERSION_KEY])
+
+    def stats(self):
+        try:
+            counters = cache.get_many(STAT_KEYS.values())
+        except Exception as error:
+            logger.warning(f"Availability cache stats unavailable: {error}")
+            counters = {}
+        stats = {name: counters.get(key, 0) for name, key in STAT_KEYS.items()}
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else None
+        return stats
+
+    def reset_stats(self):
+        try:
+            cache.delete_many(STAT_KEYS.values())
+        except Exception as error:
+            logger.warning(f"Availability cache stats not reset: {error}")
+
+    def _result_key(self, start_date, end_date, filters):
+        bucket_keys = [bucket_version_key(bucket) for bucket in month_buckets(start_date, end_date)]
+        versions = self._versions([FLEET_VERSION_KEY, *bucket_keys])
+        digest = hashlib.md5(json.dumps(
+            {
+                "filters": sorted((filters or {}).items()),
+                "versions": [versions[key] for key in (FLEET_VERSION_KEY, *bucket_keys)],
+            },
+            default=str,
+        ).encode()).hexdigest()
+        return f"{PREFIX}:ids:{start_date.isoformat()}:{end_date.isoformat()}:{digest}"
+
+    @staticmethod
+    def _versions(keys):
+        """
+        Read version counters, seeding the missing ones. Seeds come from the
+        clock so a counter evicted from the cache never restarts at a value
+        that was already used.
+        """
+        versions = cache.get_many(keys)
+        missing = [key for key in keys if key not in versions]
+        if missing:
+            for key in missing:
+                cache.add(key, time.time_ns(), None)
+            versions.update(cache.get_many(missing))
+        return versions
+
+    @staticmethod
+    def _bump(keys):
+        for key in keys:
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.add(key, time.time_ns(), None)
+
+    def _store(self, entries):
+        try:
+            cache.set_many(entries, self.timeout)
+        except Exception as error:
+            logger.warning(f"Availability cache write failed: {error}")
+
+    def _bump_on_commit(self, keys):
+        # A cache outage must not fail a write that already committed
+        transaction.on_commit(lambda: self._bump(keys), robust=True)
+
+    @staticmethod
+    def _count(name, amount=1):
+        if amount <= 0:
+            return
+        key = STAT_KEYS[name]
+        try:
+            try:
+                cache.incr(key, amount)
+            except ValueError:
+                if not cache.add(key, amount, None):
+                    cache.incr(key, amount)
+        except Exception as error:
+            # The counters are best effort
+            logger.warning(f"Availability cache stats not counted: {error}")
+
+
+availability_cache = AvailabilityCache()
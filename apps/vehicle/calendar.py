@@ -0,0 +1,172 @@
+from datetime import date, timedelta
+from apps.booking.availability import DayBitmap
+
+FREE = "free"
+OCCUPIED = "occupied"
+
+
+def merge_ranges(ranges, start_date, end_date):
+    """
+    Clip (start, end) day ranges to [start_date, end_date] and merge the
+    overlapping or adjacent ones.
+
+    Returns:
+        list[tuple(date, date)]: Sorted, disjoint occupied ranges.
+    """
+    merged = []
+    for range_start, range_end in sorted(ranges):
+        range_start, range_end = max(range_start, start_date), min(range_end, end_date)
+        if range_start > range_end:
+            continue
+        if merged and range_start <= merged[-1][1] + timedelta(days=1):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], range_end))
+        else:
+            merged.append((range_start, range_end))
+    return merged
+
+
+def free_intervals(ranges, start_date, end_date):
+    """
+    Free gaps of [start_date, end_date] not covered by the occupied ranges.
+    Cost depends on the number of ranges, not on the number of days.
+
+    Returns:
+        list[dict]: [{"start_date": date, "end_date": date}, ...]
+    """
+    intervals = []
+    cursor = start_date
+    for range_start, range_end in merge_ranges(ranges, start_date, end_date):
+        if range_start > cursor:
+            intervals.append({"start_date": cursor, "end_date": range_start - timedelta(days=1)})
+        cursor = range_end + timedelta(days=1)
+    if cursor <= end_date:
+        intervals.append({"start_date": cursor, "end_date": end_date})
+    return intervals
+
+
+def day_states(ranges, start_date, end_date):
+    """
+    Expand occupied ranges into one entry per day of [start_date, end_date].
+
+    Returns:
+        list[dict]: [{"date": date, "status": "free" | "occupied"}, ...]
+    """
+    days = []
+    day = start_date
+    for range_start, range_end in merge_ranges(ranges, start_date, end_date):
+        while day < range_start:
+            days.append({"date": day, "status": FREE})
+            day += timedelta(days=1)
+        while day <= range_end:
+            days.append({"date": day, "status": OCCUPIED})
+            day += timedelta(days=1)
+    while day <= end_date:
+        days.append({"date": day, "status": FREE})
+        day += timedelta(days=1)
+    return days
+
+
+def window_clusters(windows, max_days):
+    """
+    Group windows into spans of at most `max_days` days, in date order:
+    windows close together share a span, distant ones get their own.
+
+    Args:
+        windows (list[tuple(date, date)]): Windows of at most `max_days` days each.
+
+    Returns:
+        list[tuple(date, date)]: Disjoint spans, each covering whole windows.
+    """
+    clusters = []
+    for start_date, end_date in sorted(windows):
+        if clusters and (end_date - clusters[-1][0]).days < max_days:
+            clusters[-1] = (clusters[-1][0], max(clusters[-1][1], end_date))
+        else:
+            clusters.append((start_date, end_date))
+    return clusters
+
+
+def availability_matrix(vehicle_ids, ranges, windows, max_days):
+    """
+    Evaluate every (vehicle, window) pair with bitwise interval tests.
+
+    The windows are grouped into clusters of at most `max_days` days (see
+    `window_clusters`), each laid out on its own bitmask frame: each window
+    and each vehicle's occupancy clipped to the cluster becomes an integer
+    mask, so a vehicle is tested against a window with a single AND, and
+    no mask is longer than `max_days` bits however far apart the windows are.
+
+    Args:
+        vehicle_ids (list[int]): Matrix rows.
+        ranges (dict): {vehicle_id: [(start_date, end_date), ...]} occupied ranges.
+        windows (list[tuple(date, date)]): Matrix columns.
+        max_days (int): Longest cluster, in days.
+
+    Returns:
+        list[list[bool]]: matrix[row][column] is True if the vehicle is free
+        for the whole window.
+    """
+    clusters = window_clusters(windows, max_days)
+    frames = [DayBitmap(origin=cluster_start) for cluster_start, _ in clusters]
+    columns = []
+    for start_date, end_date in windows:
+        index = next(
+            index for index, (cluster_start, cluster_end) in enumerate(clusters)
+            if cluster_start <= start_date and end_date <= cluster_end
+        )
+        columns.append((index, frames[index].mask(start_date, end_date)))
+
+    matrix = []
+    for vehicle_id in vehicle_ids:
+        occupied = [0] * len(clusters)
+        for range_start, range_end in ranges.get(vehicle_id, ()):
+            for index, (cluster_start, cluster_end) in enumerate(clusters):
+                if range_start <= cluster_end and range_end >= cluster_start:
+                    occupied[index] |= frames[index].mask(range_start, min(range_end, cluster_end))
+        matrix.append([not occupied[index] & window_mask for index, window_mask in columns])
+    return matrix
+
+
+def nearest_free_slots(ranges, start_date, end_date, earliest):
+    """
+    Gap search for the free slots closest to [start_date, end_date] with
+    the same number of days.
+
+    The occupied ranges are merged and walked once in start order; each gap
+    between them is checked for a slot ending as late as possible before
+    start_date and for a slot starting as early as possible from start_date.
+
+    Args:
+        ranges (list[tuple(date, date)]): Occupied ranges of one vehicle.
+        start_date (date): Requested start.
+        end_date (date): Requested end.
+        earliest (date): No slot may start before this day (usually today).
+
+    Returns:
+        tuple(dict | None, dict): (before, after) slots as
+        {"start_date": date, "end_date": date}. `before` is None when no slot
+        fits between `earliest` and start_date; `after` always exists since
+        the last gap is open-ended.
+    """
+    length = end_date - start_date
+    before = after = None
+    cursor = earliest
+    gaps = []
+    for range_start, range_end in merge_ranges(ranges, earliest, date.max):
+        gaps.append((cursor, range_start - timedelta(days=1)))
+        cursor = range_end + timedelta(days=1)
+    gaps.append((cursor, None))
+
+    for gap_start, gap_end in gaps:
+        # Latest start before the requested one; later gaps are nearer
+        latest = start_date - timedelta(days=1)
+        if gap_end is not None:
+            latest = min(latest, gap_end - length)
+        if latest >= gap_start:
+            before = {"start_date": latest, "end_date": latest + length}
+        # Earliest start from the requested one
+        slot_start = max(gap_start, start_date)
+        if gap_end is None or slot_start + length <= gap_end:
+            after = {"start_date": slot_start, "end_date": slot_start + length}
+            break
+    return before, after
@@ -0,0 +1,120 @@
+import statistics
+import time
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.pagination import Cursor, PageNumberPagination
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+from apps.pagination import KeysetCursorPagination
+from apps.vehicle.models import Vehicle
+from apps.vehicle.serializers import VehicleSerializer
+from apps.vehicle.views import VehicleViewSet
+
+
+class Command(BaseCommand):
+    """
+    Page 1 vs deep page latency of the vehicle list.
+
+    Compares the offset pagination the list used to have (COUNT(*) plus
+    OFFSET) with the keyset cursor pagination it uses now, at the first
+    page and at --page. Vehicles are seeded up to the depth needed and
+    deleted afterwards unless --keep is given.
+
+    Usage:
+        python manage.py bench_pagination --page 10000 --repeat 20
+    """
+    help = "Benchmark offset vs keyset pagination of the vehicle list at page 1 and a deep page."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page', type=int, default=10000, help="Deep page number to measure.")
+        parser.add_argument('--page-size', type=int, default=api_settings.PAGE_SIZE)
+        parser.add_argument('--repeat', type=int, default=10, help="Requests per measurement.")
+        parser.add_argument('--keep', action='store_true', help="Keep the generated vehicles.")
+
+    def handle(self, *args, **options):
+        page_size = options['page_size']
+        page = options['page']
+        seeded = self.seed(page * page_size)
+        user = User.objects.create_user(username=f"bench-{time.time_ns()}", password=None, is_staff=True)
+        try:
+            offset = (page - 1) * page_size
+            for label, page_number in (("page 1", 1), (f"page {page}", page)):
+                offset_ms, offset_queries = self.measure(
+                    options['repeat'], lambda: self.offset_page(user, page_number, page_size),
+                )
+                cursor = self.cursor_at(offset if page_number > 1 else None)
+                cursor_ms, cursor_queries = self.measure(
+                    options['repeat'], lambda: self.cursor_page(user, cursor, page_size),
+                )
+                self.stdout.write(
+                    f"{label:>12}: offset p50={offset_ms:.2f}ms queries={offset_queries} | "
+                    f"keyset p50={cursor_ms:.2f}ms queries={cursor_queries}"
+                )
+        finally:
+            user.delete()
+            if seeded and not options['keep']:
+                Vehicle.objects.filter(id__in=seeded).delete()
+
+    @staticmethod
+    def seed(needed):
+        missing = needed - Vehicle.objects.count()
+        if missing <= 0:
+            return []
+        prefix = f"P{time.time_ns() % 10 ** 10}"
+        vehicles = Vehicle.objects.bulk_create(
+            (
+                Vehicle(brand="Bench", model="Page", year=2020, daily_rate=50, plate_number=f"{prefix}-{index}")
+                for index in range(missing)
+            ),
+            batch_size=5000,
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE vehicle_vehicle")
+        return [vehicle.id for vehicle in vehicles]
+
+    @staticmethod
+    def measure(repeat, call):
+        timings = []
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                call()
+                timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings), len(queries)
+
+    @staticmethod
+    def offset_page(user, page_number, page_size):
+        # What the list did before keyset pagination
+        request = Request(APIRequestFactory().get('/api/vehicles/', {'page': page_number}))
+        request.user = user
+        paginator = PageNumberPagination()
+        paginator.page_size = page_size
+        page = paginator.paginate_queryset(Vehicle.objects.all(), request)
+        return paginator.get_paginated_response(VehicleSerializer(page, many=True).data)
+
+    @staticmethod
+    def cursor_at(offset):
+        """
+        Cursor token pointing `offset` rows into the list (setup, not timed).
+        """
+        if offset is None:
+            return None
+        paginator = KeysetCursorPagination()
+        paginator.base_url = 'http://testserver/api/vehicles/'
+        created_at = Vehicle.objects.values_list('created_at', flat=True)[offset]
+        url = paginator.encode_cursor(Cursor(offset=0, reverse=False, position=str(created_at)))
+        return url.split('cursor=')[1]
+
+    @staticmethod
+    def cursor_page(user, cursor, page_size):
+        params = {'page_size': page_size}
+        if cursor:
+            params['cursor'] = cursor
+        request = APIRequestFactory().get('/api/vehicles/', params)
+        force_authenticate(request, user=user)
+        response = VehicleViewSet.as_view({'get': 'list'})(request)
+        assert response.status_code == 200, response.data
+        return response
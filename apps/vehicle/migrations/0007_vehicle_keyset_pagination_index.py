@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-17 20:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vehicle', '0006_alter_vehicle_options'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='vehicle',
+            options={'ordering': ['-created_at', 'id']},
+        ),
+        migrations.AddIndex(
+            model_name='vehicle',
+            index=models.Index(fields=['-created_at', 'id'], name='vehicle_created_id_idx'),
+        ),
+    ]
@@ -1,5 +1,10 @@
 from django.db import models
 from .enums import VehicleType
+
+# Fields the vehicle listings filter on
+FILTERED_FIELDS = ('vehicle_type', 'brand', 'model')
+
+
 class Vehicle(models.Model):
     """
     Represents a vehicle in the rental system.
@@ -22,7 +27,25 @@ class Vehicle(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     class Meta:
-        ordering = ["-created_at"]
+        ordering = ["-created_at", "id"]
+        indexes = [
+            # Keyset pagination of the vehicle list
+            models.Index(fields=['-created_at', 'id'], name='vehicle_created_id_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Remember the filtered fields as loaded from the database so cached
+        listings are only invalidated fleet-wide when one of them changes.
+        """
+        instance = super().from_db(db, field_names, values)
+        if set(FILTERED_FIELDS).isdisjoint(instance.get_deferred_fields()):
+            instance._loaded_filters = instance.filter_values()
+        return instance
+
+    def filter_values(self):
+        return tuple(getattr(self, field) for field in FILTERED_FIELDS)
 
     def __str__(self):
         return f"{self.brand} {self.model} ({self.plate_number})"
@@ -1,6 +1,12 @@
 from .models import Vehicle
 from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import Count, Exists, OuterRef, Q
+from django.utils import timezone
+from collections import defaultdict
+from ..booking.availability import availability_index
+from ..booking.enums import ACTIVE_BOOKING_STATUSES
 from ..booking.models import Booking
+from .calendar import nearest_free_slots
 
 class VehicleRepository:
     """
@@ -33,11 +39,9 @@ class VehicleRepository:
         """
         Get vehicles available within a given date range.
 
-        A vehicle is unavailable if it has a booking that:
-        - Is in status PENDING or CONFIRMED
-        - Overlaps the target date range:
-            booking.start_date < end_date  AND
-            booking.end_date   > start_date
+        A vehicle is unavailable if any day in [start_date, end_date] is held
+        by a PENDING or CONFIRMED booking. Busy vehicles are looked up in the
+        day-bitmap availability index instead of scanning bookings.
 
         Args:
             start_date (date): Start of requested period.
@@ -45,18 +49,101 @@ class VehicleRepository:
             filters (dict): Optional vehicle filters.
 
         Returns:
-            QuerySet: Vehicles NOT in conflicting bookings.
+            QuerySet: Vehicles with no conflicting bookings.
         """
         queryset = self.get_all(filters)
-        conflicting_bookings = Booking.objects.filter(
-            status__in=[Booking.BookingStatus.PENDING, Booking.BookingStatus.CONFIRMED],
-            start_date__lt=end_date,
-            end_date__gt=start_date
-        ).values_list('vehicle_id', flat=True)
-
-        queryset  = queryset.exclude(id__in=conflicting_bookings)
+        busy_ids = availability_index.busy_vehicle_ids(start_date, end_date)
+        if busy_ids:
+            queryset = queryset.exclude(id__in=busy_ids)
         return queryset
 
+    def get_occupied_ranges(self, vehicle_ids, start_date, end_date):
+        """
+        Fetch the active booking ranges overlapping [start_date, end_date]
+        for the given vehicles in a single range query.
+
+        Args:
+            vehicle_ids (Iterable[int]): Vehicles to look up.
+            start_date (date): Start of the window (inclusive).
+            end_date (date): End of the window (inclusive).
+
+        Returns:
+            dict: {vehicle_id: [(start_date, end_date), ...]}
+        """
+        return self.get_occupied_ranges_in(vehicle_ids, [(start_date, end_date)])
+
+    def get_occupied_ranges_in(self, vehicle_ids, spans):
+        """
+        Like `get_occupied_ranges` for several disjoint spans, still in a
+        single query (one range condition per span).
+
+        Args:
+            vehicle_ids (Iterable[int]): Vehicles to look up.
+            spans (list[tuple(date, date)]): Windows, both ends inclusive.
+
+        Returns:
+            dict: {vehicle_id: [(start_date, end_date), ...]}
+        """
+        overlaps = Q()
+        for start_date, end_date in spans:
+            overlaps |= Q(start_date__lte=end_date, end_date__gte=start_date)
+        ranges = defaultdict(list)
+        bookings = Booking.objects.filter(
+            overlaps,
+            vehicle_id__in=vehicle_ids,
+            status__in=ACTIVE_BOOKING_STATUSES,
+        ).values_list('vehicle_id', 'start_date', 'end_date')
+        for vehicle_id, booking_start, booking_end in bookings:
+            ranges[vehicle_id].append((booking_start, booking_end))
+        return ranges
+
+    def count_free(self, vehicles, windows):
+        """
+        Number of `vehicles` with no active booking in each window, in one
+        query (a conditional count per window).
+
+        Args:
+            vehicles (QuerySet): Vehicles to count, e.g. `get_all(filters)`.
+            windows (list[tuple(date, date)]): Windows, both ends inclusive.
+
+        Returns:
+            list[int]: One count per window, in order.
+        """
+        counts = vehicles.aggregate(**{
+            f"window_{index}": Count('id', filter=~Q(Exists(Booking.objects.filter(
+                vehicle=OuterRef('pk'),
+                status__in=ACTIVE_BOOKING_STATUSES,
+                start_date__lte=end_date,
+                end_date__gte=start_date,
+            ))))
+            for index, (start_date, end_date) in enumerate(windows)
+        })
+        return [counts[f"window_{index}"] for index in range(len(windows))]
+
+    def get_free_slots(self, vehicle_id, start_date, end_date, exclude_booking_id=None):
+        """
+        Find the nearest free slots of the same length as [start_date, end_date]
+        before and after it, from one query over the vehicle's upcoming
+        active bookings in start order.
+
+        Args:
+            exclude_booking_id (int): Booking being edited; the days it
+                currently holds are treated as free.
+
+        Returns:
+            tuple(dict | None, dict): (before, after), see `nearest_free_slots`.
+        """
+        today = timezone.localdate()
+        bookings = Booking.objects.filter(
+            vehicle_id=vehicle_id,
+            status__in=ACTIVE_BOOKING_STATUSES,
+            end_date__gte=today,
+        ).order_by('start_date')
+        if exclude_booking_id:
+            bookings = bookings.exclude(id=exclude_booking_id)
+        ranges = list(bookings.values_list('start_date', 'end_date'))
+        return nearest_free_slots(ranges, start_date, end_date, earliest=today)
+
     def get_by_id(self,vehicle_id):
         """
         Retrieve a single Vehicle by ID.
@@ -68,6 +155,15 @@ class VehicleRepository:
             return Vehicle.objects.get(id=vehicle_id)
         except ObjectDoesNotExist:
             return None
+    def get_by_ids(self, vehicle_ids):
+        """
+        Retrieve the vehicles with the given IDs in a single query.
+
+        Returns:
+            QuerySet: Matching vehicles (missing IDs are skipped).
+        """
+        return Vehicle.objects.filter(id__in=vehicle_ids)
+
     def create(self, **data):
         """
         Create a new Vehicle instance.
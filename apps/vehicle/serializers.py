@@ -2,13 +2,14 @@ from rest_framework import serializers
 from .models import Vehicle
 from rest_framework.serializers import ValidationError
 from datetime import date
-class VehicleSerializer(serializers.ModelSerializer):
+from apps.sparse_fields import SparseFieldsMixin
+class VehicleSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer responsible for validating and transforming Vehicle model data.
     Used for:
     - Creating vehicles
     - Updating vehicles
-    - Listing & retrieving vehicle details
+    - Listing & retrieving vehicle details (with optional sparse fieldsets)
     """
     class Meta:
         model = Vehicle
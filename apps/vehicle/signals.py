@@ -0,0 +1,24 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Vehicle
+from .cache import availability_cache
+
+
+@receiver(post_save, sender=Vehicle)
+def invalidate_availability_on_save(sender, instance, created, raw=False, **kwargs):
+    """
+    Bump the vehicle's cached payload version. New vehicles, and vehicles
+    whose filtered fields changed, also bump the fleet version because the
+    cached id lists may now include or exclude them.
+    """
+    if raw:
+        return
+    previous = getattr(instance, '_loaded_filters', None)
+    current = instance.filter_values()
+    availability_cache.invalidate_vehicle(instance.id, fleet=created or previous != current)
+    instance._loaded_filters = current
+
+
+@receiver(post_delete, sender=Vehicle)
+def invalidate_availability_on_delete(sender, instance, **kwargs):
+    availability_cache.invalidate_vehicle(instance.id, fleet=True)
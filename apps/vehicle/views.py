@@ -1,9 +1,14 @@
 from rest_framework import status
 from rest_framework.views import APIView
 
+from apps.conditional import load_page, probe_object, probe_page, set_validators
+from apps.pagination import KeysetCursorPagination
+from apps.sparse_fields import get_sparse_fields, sparse_queryset
 from .repository import VehicleRepository
 from .serializers import VehicleSerializer
-from rest_framework.permissions import BasePermission, SAFE_METHODS , IsAuthenticated
+from .calendar import day_states, free_intervals, availability_matrix, window_clusters
+from .cache import availability_cache
+from rest_framework.permissions import BasePermission, SAFE_METHODS , IsAuthenticated, IsAdminUser
 from django.utils.dateparse import parse_date
 from django.utils import timezone
 from rest_framework.viewsets import ViewSet
@@ -11,11 +16,77 @@ from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.decorators import action
 import logging
+import time
 from rest_framework.pagination import PageNumberPagination
 from django.core.cache import cache
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
 
 logger = logging.getLogger(__name__)
 
+VEHICLE_FILTERS = ['vehicle_type', 'model', 'brand']
+CALENDAR_MODES = ['days', 'intervals']
+CALENDAR_MAX_DAYS = 366
+MATRIX_MAX_WINDOWS = 20
+NDJSON_CONTENT_TYPE = 'application/x-ndjson'
+STREAM_CHUNK_SIZE = 500
+
+
+def get_vehicle_filters(request):
+    """
+    Collect the supported vehicle filters present in the query string.
+    """
+    return {
+        key: request.query_params.get(key)
+        for key in VEHICLE_FILTERS
+        if request.query_params.get(key)
+    }
+
+
+def parse_date_range(request, start_param='start_date', end_param='end_date', allow_past=False):
+    """
+    Read a (start, end) date pair from the query string.
+
+    Validates:
+    - Both dates exist
+    - Valid date format (YYYY-MM-DD)
+    - Dates not in the past (unless allow_past)
+    - end is not before start
+
+    Returns:
+        tuple(date, date)
+    """
+    start = request.query_params.get(start_param)
+    end = request.query_params.get(end_param)
+
+    if not start or not end:
+        raise ValidationError(f"Both {start_param} and {end_param} are required. Format: YYYY-MM-DD.")
+
+    start_date = parse_date(start)
+    end_date = parse_date(end)
+
+    if not start_date or not end_date:
+        raise ValidationError("Invalid date format. Use YYYY-MM-DD.")
+
+    today = timezone.now().date()
+    if not allow_past and (start_date < today or end_date < today):
+        raise ValidationError("Dates cannot be in the past.")
+
+    if end_date < start_date:
+        raise ValidationError(f"{end_param} cannot be before {start_param}.")
+    return start_date, end_date
+
+
+def stream_ndjson(queryset, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Yield one serialized vehicle per line. Rows are fetched in chunks with
+    `.iterator()` so memory stays flat whatever the number of vehicles.
+    """
+    encoder = JSONEncoder()
+    for vehicle in queryset.iterator(chunk_size=chunk_size):
+        yield encoder.encode(VehicleSerializer(vehicle).data) + '\n'
+
+
 class IsAdminOrIsAuthenticated(BasePermission):
     """
     Custom permission:
@@ -36,7 +107,7 @@ class VehicleViewSet(ViewSet):
     Built using Django REST Framework with a clean separation via the repository layer.
 
     **Core Endpoints:**
-    - **List**: Retrieve paginated list of vehicles with optional filters (vehicle_type, model, brand)
+    - **List**: Retrieve cursor-paginated list of vehicles with optional filters (vehicle_type, model, brand)
     - **Retrieve**: Get detailed information about a specific vehicle
     - **Create**: Add new vehicle (admin only)
     - **Update**: Edit existing vehicle data (admin only)
@@ -45,13 +116,22 @@ class VehicleViewSet(ViewSet):
     **Custom Actions:**
     - `available`: Check and return all vehicles available within a specified date range
       Requires: `start_date`, `end_date` → Format `YYYY-MM-DD`
+      Paginated like list, or streamed as NDJSON with `stream=ndjson`
+    - `available_cache_stats`: Hit/miss counters of the availability cache (admin only)
+    - `calendar`: Day-by-day availability (or free intervals) of one vehicle
+      Requires: `from`, `to` → Format `YYYY-MM-DD`
+    - `fleet_calendar`: Paginated calendar of every vehicle (`/vehicles/calendar/`)
+    - `next_free`: Nearest free slots of the requested length around a window
+      Requires: `start_date`, `end_date` → Format `YYYY-MM-DD`
+    - `availability_matrix`: Paginated vehicle × window availability for several candidate date windows
+      Requires: `windows` → `YYYY-MM-DD:YYYY-MM-DD,...`
 
     **Permissions:**
     - Authenticated users can view data (safe methods)
     - Only admin users can modify vehicle data (POST/PUT/DELETE)
 
     **Utilities Used:**
-    - Pagination via `PageNumberPagination`
+    - Keyset pagination via `KeysetCursorPagination` (list), `PageNumberPagination` elsewhere
     - Repository layer for database access abstraction
     - Logging for tracking destructive actions
     """
@@ -68,76 +148,258 @@ class VehicleViewSet(ViewSet):
     def list(self, request):
         """
         GET /vehicles/
-        Returns a paginated list of vehicles.
+        Returns a cursor-paginated list of vehicles.
         Supports filtering by:
         - vehicle_type
         - brand
         - model
+
+        Uses keyset pagination on (-created_at, id): pass the `cursor`
+        from `next` / `previous`, optional `page_size`, and
+        `count=estimate` for an estimated total.
+        `fields=id,brand,...` returns (and selects) only those fields.
+
+        Sends an ETag / Last-Modified for the page, computed from an
+        (id, updated_at) probe; a matching If-None-Match /
+        If-Modified-Since gets a 304 before any vehicle is loaded.
         """
-        filters={
-            key:request.query_params.get(key)
-            for key in ['vehicle_type', 'model', 'brand']
-            if request.query_params.get(key)
-        }
-        vehicles = self.repository.get_all(filters)
-        paginator = self.pagination_class()
-        page = paginator.paginate_queryset(vehicles, request)
-        serializer = VehicleSerializer(page, many=True)
-        return paginator.get_paginated_response(serializer.data)
+        fields, expand = get_sparse_fields(request, VehicleSerializer)
+        vehicles = sparse_queryset(
+            self.repository.get_all(get_vehicle_filters(request)), VehicleSerializer, fields,
+            required=('id', 'created_at'),
+        )
+        paginator = KeysetCursorPagination()
+        response, ids, validators = probe_page(request, paginator, vehicles)
+        if response:
+            return response
+        serializer = VehicleSerializer(load_page(vehicles, ids), many=True, context={'fields': fields})
+        return set_validators(paginator.get_paginated_response(serializer.data), *validators)
     
     @action(detail=False, methods=['get'],url_path='available')
     def available(self,request):
         """
         GET /vehicles/available/
-        Returns a list of vehicles available between a given date range.
+        Returns a page-numbered list of vehicles available between a given
+        date range (`page`; count / next / previous / results).
+
+        Unlike list, this does not use keyset pagination: the page is a
+        slice of the cached id list, so the cursor's `created_at` filter
+        would need a query per page and bypass the cache.
         Required query params:
         - start_date (YYYY-MM-DD)
         - end_date   (YYYY-MM-DD)
+        Optional:
+        - stream=ndjson: stream every available vehicle as one JSON object
+          per line instead of pages
 
         Validates:
         - Both dates exist
         - Valid date format
         - Dates not in the past
         - end_date is not before start_date
-        """
-        start = request.query_params.get('start_date')
-        end = request.query_params.get('end_date')
-
-        if not start or not end:
-            raise ValidationError("Both start_date and end_date are required. Format: YYYY-MM-DD.")
 
-        start_date = parse_date(start)
-        end_date = parse_date(end)
+        Results are served from the versioned availability cache
+        (see `apps.vehicle.cache`).
+        """
+        start_date, end_date = parse_date_range(request)
+        filters = get_vehicle_filters(request)
+        stream = request.query_params.get('stream')
+        if stream:
+            if stream != 'ndjson':
+                raise ValidationError("Invalid stream format. Must be: ndjson")
+            available = self.repository.get_available(start_date, end_date, filters)
+            return StreamingHttpResponse(stream_ndjson(available), content_type=NDJSON_CONTENT_TYPE)
+
+        vehicle_ids = availability_cache.get_vehicle_ids(
+            start_date, end_date, filters,
+            lambda: self.repository.get_available(start_date, end_date, filters).values_list('id', flat=True),
+        )
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(vehicle_ids, request)
+        data = availability_cache.get_payloads(
+            page,
+            self.repository.get_by_ids,
+            lambda vehicles: VehicleSerializer(vehicles, many=True).data,
+        )
+        return paginator.get_paginated_response(data)
 
-        if not start_date or not end_date:
-            raise ValidationError("Invalid date format. Use YYYY-MM-DD.")
+    @action(detail=False, methods=['get'], url_path='available/cache-stats', permission_classes=[IsAdminUser])
+    def available_cache_stats(self, request):
+        """
+        GET /vehicles/available/cache-stats/
+        Hit/miss counters of the availability cache, for sizing it.
+        Pass `reset=true` to start counting again.
+        """
+        stats = availability_cache.stats()
+        if request.query_params.get('reset') == 'true':
+            availability_cache.reset_stats()
+        return Response(stats)
 
+    @action(detail=False, methods=['get'], url_path='availability-matrix')
+    def availability_matrix(self, request):
+        """
+        GET /vehicles/availability-matrix/?windows=2030-01-01:2030-01-05,2030-02-01:2030-02-03
+        Answers "which of these date windows has a vehicle free".
+        Supports the same filters as list (vehicle_type, brand, model).
+        At most MATRIX_MAX_WINDOWS windows of at most CALENDAR_MAX_DAYS
+        days each.
+
+        Vehicle rows are paginated like the fleet calendar (`page`). One
+        query loads the page's vehicle ids and one query loads their
+        active bookings overlapping the window clusters (windows grouped
+        into spans of at most CALENDAR_MAX_DAYS days); the matrix is then
+        evaluated in memory. One more query counts the free vehicles of
+        every window over all the matching vehicles.
+
+        Response:
+            count / next / previous: Pagination of the vehicle rows.
+            windows: The parsed windows with the number of free matching vehicles.
+            vehicles: Matrix row ids.
+            matrix: matrix[row][column] is true if the vehicle is free for the window.
+            timings: Milliseconds spent per phase (parse, fetch, evaluate).
+        """
+        started = time.perf_counter()
+        raw_windows = [item for item in request.query_params.get('windows', '').split(',') if item]
+        if not raw_windows:
+            raise ValidationError("windows is required. Format: YYYY-MM-DD:YYYY-MM-DD,...")
+        if len(raw_windows) > MATRIX_MAX_WINDOWS:
+            raise ValidationError(f"At most {MATRIX_MAX_WINDOWS} windows are allowed.")
+        windows = []
         today = timezone.now().date()
-        if start_date < today or end_date < today:
-            raise ValidationError("Dates cannot be in the past.")
-
-        if end_date < start_date:
-            raise ValidationError("end_date cannot be before start_date.")
-        filters = {
-            key: request.query_params.get(key)
-            for key in ['vehicle_type', 'model', 'brand']
-            if request.query_params.get(key)
-        }
-        available = self.repository.get_available(start_date, end_date, filters)
-        serializer = VehicleSerializer(available, many=True)
-        return Response(serializer.data)
+        for raw_window in raw_windows:
+            start, _, end = raw_window.partition(':')
+            start_date, end_date = parse_date(start), parse_date(end)
+            if not start_date or not end_date:
+                raise ValidationError(f"Invalid window '{raw_window}'. Use YYYY-MM-DD:YYYY-MM-DD.")
+            if start_date < today:
+                raise ValidationError("Dates cannot be in the past.")
+            if end_date < start_date:
+                raise ValidationError(f"Invalid window '{raw_window}': end is before start.")
+            if (end_date - start_date).days >= CALENDAR_MAX_DAYS:
+                raise ValidationError(f"Invalid window '{raw_window}': it cannot exceed {CALENDAR_MAX_DAYS} days.")
+            windows.append((start_date, end_date))
+        parsed = time.perf_counter()
+
+        vehicles = self.repository.get_all(get_vehicle_filters(request))
+        paginator = self.pagination_class()
+        vehicle_ids = list(paginator.paginate_queryset(vehicles.values_list('id', flat=True), request))
+        ranges = self.repository.get_occupied_ranges_in(
+            vehicle_ids, window_clusters(windows, CALENDAR_MAX_DAYS),
+        ) if vehicle_ids else {}
+        free_counts = self.repository.count_free(vehicles, windows)
+        fetched = time.perf_counter()
+
+        matrix = availability_matrix(vehicle_ids, ranges, windows, CALENDAR_MAX_DAYS)
+        evaluated = time.perf_counter()
+
+        return Response({
+            "count": paginator.page.paginator.count,
+            "next": paginator.get_next_link(),
+            "previous": paginator.get_previous_link(),
+            "windows": [
+                {"start_date": start_date, "end_date": end_date, "free_vehicles": free_count}
+                for (start_date, end_date), free_count in zip(windows, free_counts)
+            ],
+            "vehicles": vehicle_ids,
+            "matrix": matrix,
+            "timings": {
+                "parse_ms": round((parsed - started) * 1000, 3),
+                "fetch_ms": round((fetched - parsed) * 1000, 3),
+                "evaluate_ms": round((evaluated - fetched) * 1000, 3),
+            },
+        })
+
+    @action(detail=True, methods=['get'], url_path='next-free')
+    def next_free(self, request, pk=None):
+        """
+        GET /vehicles/{id}/next-free/?start_date=YYYY-MM-DD&end_date=YYYY-MM-DD
+        Returns the nearest free slots with the same number of days as the
+        requested window, before and after it. `available` is true when
+        the requested window itself is free.
+        """
+        start_date, end_date = parse_date_range(request)
+        vehicle = self.repository.get_by_id(pk)
+        if not vehicle:
+            return Response({'detail': 'Vehicle not found.'}, status=status.HTTP_404_NOT_FOUND)
+        before, after = self.repository.get_free_slots(vehicle.id, start_date, end_date)
+        return Response({
+            "vehicle": vehicle.id,
+            "start_date": start_date,
+            "end_date": end_date,
+            "available": after["start_date"] == start_date,
+            "before": before,
+            "after": after,
+        })
+
+    def _calendar_window(self, request):
+        """
+        Parse `from` / `to` / `mode` for the calendar endpoints.
+        """
+        start_date, end_date = parse_date_range(request, 'from', 'to', allow_past=True)
+        if (end_date - start_date).days >= CALENDAR_MAX_DAYS:
+            raise ValidationError(f"The calendar window cannot exceed {CALENDAR_MAX_DAYS} days.")
+        mode = request.query_params.get('mode', 'days')
+        if mode not in CALENDAR_MODES:
+            raise ValidationError(f"Invalid mode. Must be one of: {CALENDAR_MODES}")
+        return start_date, end_date, mode
+
+    @staticmethod
+    def _calendar_entry(vehicle_id, ranges, start_date, end_date, mode):
+        entry = {"vehicle": vehicle_id, "from": start_date, "to": end_date}
+        if mode == 'intervals':
+            entry["free_intervals"] = free_intervals(ranges, start_date, end_date)
+        else:
+            entry["days"] = day_states(ranges, start_date, end_date)
+        return entry
+
+    @action(detail=True, methods=['get'], url_path='calendar')
+    def calendar(self, request, pk=None):
+        """
+        GET /vehicles/{id}/calendar/?from=YYYY-MM-DD&to=YYYY-MM-DD[&mode=days|intervals]
+        Returns the vehicle's free/occupied state for every day of the
+        window (mode=days, default) or its free intervals (mode=intervals).
+        Built from one range query over the vehicle's active bookings.
+        """
+        start_date, end_date, mode = self._calendar_window(request)
+        vehicle = self.repository.get_by_id(pk)
+        if not vehicle:
+            return Response({'detail': 'Vehicle not found.'}, status=status.HTTP_404_NOT_FOUND)
+        ranges = self.repository.get_occupied_ranges([vehicle.id], start_date, end_date)
+        return Response(self._calendar_entry(vehicle.id, ranges[vehicle.id], start_date, end_date, mode))
+
+    @action(detail=False, methods=['get'], url_path='calendar')
+    def fleet_calendar(self, request):
+        """
+        GET /vehicles/calendar/?from=YYYY-MM-DD&to=YYYY-MM-DD[&mode=days|intervals]
+        Paginated fleet-wide calendar. Supports the same filters as list
+        (vehicle_type, brand, model). Occupancy for the whole page comes
+        from a single range query over bookings.
+        """
+        start_date, end_date, mode = self._calendar_window(request)
+        vehicles = self.repository.get_all(get_vehicle_filters(request))
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(vehicles.values_list('id', flat=True), request)
+        ranges = self.repository.get_occupied_ranges(page, start_date, end_date)
+        return paginator.get_paginated_response([
+            self._calendar_entry(vehicle_id, ranges[vehicle_id], start_date, end_date, mode)
+            for vehicle_id in page
+        ])
 
     def retrieve(self, request, pk=None):
         """
        GET /vehicles/{id}/
        Returns details for a single vehicle.
        If not found -> returns 404.
+       Conditional on ETag / Last-Modified from `updated_at` (304 when unchanged).
        """
+        response, validators = probe_object(request, self.repository.get_all(), pk)
+        if response:
+            return response
         vehicle = self.repository.get_by_id(pk)
         if not vehicle:
             return Response({'detail': 'Vehicle not found.'}, status=status.HTTP_404_NOT_FOUND)
         serializer = VehicleSerializer(vehicle)
-        return Response(serializer.data)
+        return set_validators(Response(serializer.data), *validators)
 
     def create(self, request):
         """
@@ -41,6 +41,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework_simplejwt',
     'django_filters',
@@ -181,8 +182,30 @@ CELERY_BEAT_SCHEDULE = {
         "task": "apps.booking.tasks.auto_cancel_booking_expired",
         "schedule": timedelta(days=1)
     },
+
+    "reconcile_booking_rollup_every_day":{
+        "task": "apps.report.tasks.reconcile_booking_rollup_task",
+        "schedule": timedelta(days=1)
+    },
 }
 
+# Bookings per transaction of the status sweeps (update_status,
+# auto_cancel_booking_expired); bounds how many rows one batch locks.
+BOOKING_SWEEP_BATCH_SIZE = config('BOOKING_SWEEP_BATCH_SIZE', default=1000, cast=int)
+
+# Customer verification service used by the customer status sync. Empty
+# URL: statuses come from the local mock.
+CUSTOMER_VERIFICATION_URL = config('CUSTOMER_VERIFICATION_URL', default='')
+CUSTOMER_VERIFICATION_TIMEOUT = config('CUSTOMER_VERIFICATION_TIMEOUT', default=5, cast=float)
+CUSTOMER_VERIFICATION_RETRIES = config('CUSTOMER_VERIFICATION_RETRIES', default=3, cast=int)
+# Requests per second sent to the service (0: unlimited)
+CUSTOMER_VERIFICATION_RATE = config('CUSTOMER_VERIFICATION_RATE', default=50, cast=float)
+# Concurrent lookups and customers per chunk of sync_customers_status_task
+CUSTOMER_SYNC_WORKERS = config('CUSTOMER_SYNC_WORKERS', default=8, cast=int)
+CUSTOMER_SYNC_CHUNK_SIZE = config('CUSTOMER_SYNC_CHUNK_SIZE', default=500, cast=int)
+# Customers per task of the admin "update selected customers" fan-out
+CUSTOMER_SYNC_BATCH_SIZE = config('CUSTOMER_SYNC_BATCH_SIZE', default=500, cast=int)
+
 # CACHE
 
 CACHES = {
@@ -195,6 +218,17 @@ CACHES = {
     }
 }
 
+# Seconds an `/api/vehicles/available/` result stays cached. Booking and
+# vehicle changes invalidate it earlier (see apps/vehicle/cache.py).
+AVAILABILITY_CACHE_TIMEOUT = config('AVAILABILITY_CACHE_TIMEOUT', default=300, cast=int)
+
+# Report dashboard cache (see apps/report/cache.py): seconds an entry is
+# fresh, seconds an expired entry may still be served while one worker
+# recomputes it, and the recompute lock's lifetime.
+REPORT_DASHBOARD_CACHE_TIMEOUT = config('REPORT_DASHBOARD_CACHE_TIMEOUT', default=60, cast=int)
+REPORT_DASHBOARD_STALE_TIMEOUT = config('REPORT_DASHBOARD_STALE_TIMEOUT', default=3600, cast=int)
+REPORT_DASHBOARD_LOCK_TIMEOUT = config('REPORT_DASHBOARD_LOCK_TIMEOUT', default=30, cast=int)
+
 
 # LOGGER SETTINGS
 LOGGING = {
@@ -1,9 +1,34 @@
 import pytest
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import override_settings
 from rest_framework.test import APIClient
 from apps.vehicle.models import Vehicle
 
 
+@pytest.fixture(scope="session", autouse=True)
+def locmem_cache():
+    # Tests never talk to the Redis server configured in settings
+    with override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clear_cache(locmem_cache):
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def cache_down(monkeypatch):
+    # Every cache call fails, as with an unreachable Redis server
+    def unreachable(*args, **kwargs):
+        raise ConnectionError("Cache server unreachable")
+    for method in ("get", "get_many", "set", "set_many", "add", "incr", "delete", "delete_many"):
+        monkeypatch.setattr(cache, method, unreachable)
+
+
 @pytest.fixture
 def api_client():
     return APIClient()
@@ -65,4 +90,9 @@ def vehicles(db):
         description="bmw car.",
         image=None
     )
-    ]
\ No newline at end of file
+    ]
+
+@pytest.fixture
+def customer(create_user):
+    user = create_user(username="ahmad", password="1234")
+    return user.customer
@@ -0,0 +1,51 @@
+import json
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from apps.booking.management.commands.bench_endpoints import Command
+from apps.booking.models import Booking
+from apps.vehicle.models import Vehicle
+
+
+def bench(tmp_path, *args):
+    output = tmp_path / "bench.json"
+    call_command(
+        "bench_endpoints", "--vehicles", "5", "--customers", "3", "--bookings", "20",
+        "--iterations", "3", "--warmup", "1", "--threads", "1", "--output", str(output), *args,
+    )
+    return json.loads(output.read_text())
+
+
+@pytest.mark.django_db
+def test_bench_endpoints_writes_results_and_cleans_up(tmp_path):
+    results = bench(tmp_path)
+    assert results["meta"]["bookings"] == 20
+    assert set(results["endpoints"]) == {
+        "vehicle-list", "vehicle-available", "booking-list", "booking-create", "report-dashboard",
+        "report-bookings", "report-bookings-pdf", "report-vehicle-utilization-pdf",
+    }
+    for result in results["endpoints"].values():
+        assert result["sequential"]["requests"] == 3
+        assert result["sequential"]["errors"] == 0
+        assert result["sequential"]["p50"] <= result["sequential"]["p99"]
+        assert result["peak_memory_kib"] > 0
+    assert results["endpoints"]["booking-list"]["queries_per_request"] > 0
+    assert not Vehicle.objects.exists()
+    assert not Booking.objects.exists()
+
+
+@pytest.mark.django_db
+def test_bench_endpoints_fails_on_regression_against_baseline(tmp_path):
+    baseline = {"endpoints": {"vehicle-list": {"sequential": {"p95": 0.001}, "queries_per_request": 0}}}
+    baseline_path = tmp_path / "baseline.json"
+    baseline_path.write_text(json.dumps(baseline))
+    with pytest.raises(CommandError, match="vehicle-list"):
+        bench(tmp_path, "--endpoints", "vehicle-list", "--baseline", str(baseline_path))
+
+
+def test_compare_ignores_a_zero_baseline_p95(tmp_path):
+    endpoint = {"sequential": {"p95": 0.0}, "queries_per_request": 2}
+    baseline_path = tmp_path / "baseline.json"
+    baseline_path.write_text(json.dumps({"endpoints": {"vehicle-list": endpoint}}))
+    results = {"endpoints": {"vehicle-list": {"sequential": {"p95": 1.5}, "queries_per_request": 2}}}
+    Command().compare(results, baseline_path, 10)
@@ -0,0 +1,198 @@
+import importlib
+import pytest
+from datetime import date, timedelta
+from types import SimpleNamespace
+from django.apps import apps
+from django.db import connection
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from apps.booking.availability import DayBitmap, availability_index
+from apps.booking.enums import BookingStatus
+from apps.booking.models import Booking, VehicleOccupancy
+
+from tests.conftest import admin_client, user_client, vehicle, vehicles, customer
+
+
+def future(days):
+    return date.today() + timedelta(days=days)
+
+
+def test_day_bitmap_add_and_discard():
+    bitmap = DayBitmap()
+    bitmap.add(date(2030, 1, 10), date(2030, 1, 12))
+    bitmap.add(date(2030, 1, 1), date(2030, 1, 2))
+    assert bitmap.origin == date(2030, 1, 1)
+    assert bitmap.intersects(date(2030, 1, 12), date(2030, 1, 20))
+    assert not bitmap.intersects(date(2030, 1, 3), date(2030, 1, 9))
+
+    bitmap.discard(date(2030, 1, 1), date(2030, 1, 2))
+    assert bitmap.origin == date(2030, 1, 10)
+    assert bitmap.last_day == date(2030, 1, 12)
+
+
+@pytest.mark.django_db
+def test_booking_changes_update_availability_index(customer, vehicle):
+    booking = Booking.objects.create(customer=customer, vehicle=vehicle, start_date=future(5), end_date=future(7))
+    assert not availability_index.is_available(vehicle.id, future(7), future(9))
+    assert availability_index.is_available(vehicle.id, future(8), future(9))
+
+    booking.start_date, booking.end_date = future(10), future(12)
+    booking.save()
+    assert availability_index.is_available(vehicle.id, future(5), future(7))
+    assert vehicle.id in availability_index.busy_vehicle_ids(future(11), future(11))
+
+    booking.status = BookingStatus.CANCELLED.value
+    booking.save()
+    assert availability_index.busy_vehicle_ids(future(0), future(30)) == set()
+    assert availability_index.check() == []
+
+
+@pytest.mark.django_db
+def test_occupancy_migration_builds_the_index_format(vehicles, customer):
+    migration = importlib.import_module("apps.booking.migrations.0002_vehicleoccupancy")
+    Booking.objects.create(customer=customer, vehicle=vehicles[0], start_date=future(8), end_date=future(9))
+    Booking.objects.create(customer=customer, vehicle=vehicles[0], start_date=future(2), end_date=future(4))
+    Booking.objects.create(customer=customer, vehicle=vehicles[1], start_date=future(5), end_date=future(5),
+                           status=BookingStatus.CANCELLED.value)
+    VehicleOccupancy.objects.all().delete()
+    migration.build_occupancy(apps, SimpleNamespace(connection=connection))
+    occupancy = VehicleOccupancy.objects.get()
+    assert (occupancy.first_day, occupancy.last_day) == (future(2), future(9))
+    assert DayBitmap.from_bytes(occupancy.first_day, occupancy.bitmap).bits == 0b11000111
+    assert availability_index.check() == []
+
+
+@pytest.mark.django_db
+def test_available_excludes_booked_vehicle(user_client, vehicles, customer):
+    Booking.objects.create(customer=customer, vehicle=vehicles[0], start_date=future(3), end_date=future(4))
+    response = user_client.get(f"/api/vehicles/available/?start_date={future(4)}&end_date={future(6)}")
+    assert response.status_code == 200
+    assert [item["id"] for item in response.data["results"]] == [vehicles[1].id]
+
+
+@pytest.mark.django_db
+def test_create_booking_rejects_overlap(admin_client, vehicle, customer):
+    Booking.objects.create(customer=customer, vehicle=vehicle, start_date=future(3), end_date=future(5))
+    body = {"customer": customer.id, "vehicle": vehicle.id, "start_date": future(5), "end_date": future(6)}
+    response = admin_client.post("/api/bookings/", body)
+    assert response.status_code == 400
+    assert "error" in response.data
+    assert response.data["suggestions"] == [
+        {"start_date": str(future(1)), "end_date": str(future(2))},
+        {"start_date": str(future(6)), "end_date": str(future(7))},
+    ]
+
+
+@pytest.mark.django_db
+def test_next_free_slots_around_requested_window(user_client, vehicle, customer, django_assert_num_queries):
+    Booking.objects.create(customer=customer, vehicle=vehicle, start_date=future(5), end_date=future(6))
+    Booking.objects.create(customer=customer, vehicle=vehicle, start_date=future(9), end_date=future(12))
+    url = f"/api/vehicles/{vehicle.id}/next-free/?start_date={future(8)}&end_date={future(10)}"
+    # auth user + vehicle + one bookings query
+    with django_assert_num_queries(3):
+        response = user_client.get(url)
+    assert response.status_code == 200
+    assert response.data["available"] is False
+    assert response.data["before"] == {"start_date": future(2), "end_date": future(4)}
+    assert response.data["after"] == {"start_date": future(13), "end_date": future(15)}
+
+
+@pytest.mark.django_db
+def test_check_availability_index_detects_drift(customer, vehicle):
+    Booking.objects.create(customer=customer, vehicle=vehicle, start_date=future(3), end_date=future(5))
+    # Bulk updates bypass the signals that maintain the index
+    Booking.objects.update(status=BookingStatus.CANCELLED.value)
+    with pytest.raises(CommandError):
+        call_command("check_availability_index")
+    call_command("check_availability_index", "--fix")
+    assert availability_index.check() == []
+
+
+@pytest.mark.django_db
+def test_overlap_constraint_rejects_update_into_taken_period(admin_client, vehicle, customer):
+    Booking.objects.create(customer=customer, vehicle=vehicle, start_date=future(3), end_date=future(5))
+    other = Booking.objects.create(customer=customer, vehicle=vehicle, start_date=future(8), end_date=future(9))
+    response = admin_client.patch(f"/api/bookings/{other.id}/", {"start_date": future(5), "end_date": future(9)})
+    assert response.status_code == 400
+    assert response.data["error"] == "This vehicle is not available in the selected period."
+    other.refresh_from_db()
+    assert other.start_date == future(8)
+
+
+@pytest.mark.django_db
+def test_constraint_migration_reports_existing_overlaps(vehicle, customer):
+    migration = importlib.import_module("apps.booking.migrations.0003_booking_period_exclusion_constraint")
+    editor = SimpleNamespace(connection=connection)
+    # The rows as before the constraint (dropped until the test transaction rolls back)
+    with connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {Booking._meta.db_table} DROP CONSTRAINT booking_no_overlapping_active")
+    first = Booking.objects.create(customer=customer, vehicle=vehicle, start_date=future(1), end_date=future(3))
+    Booking.objects.create(customer=customer, vehicle=vehicle, start_date=future(3), end_date=future(4),
+                           status=BookingStatus.CANCELLED.value)
+    migration.check_active_overlaps(apps, editor)
+
+    # A back-to-back booking the old exclusive-bounds check accepted
+    second = Booking.objects.create(customer=customer, vehicle=vehicle, start_date=future(3), end_date=future(4))
+    with pytest.raises(RuntimeError, match=f"booking {first.id} .* overlaps booking {second.id}"):
+        migration.check_active_overlaps(apps, editor)
+
+
+@pytest.mark.django_db
+def test_create_booking_v1_maps_overlap_to_vehicle_error(admin_client, vehicle, customer):
+    Booking.objects.create(customer=customer, vehicle=vehicle, start_date=future(3), end_date=future(5))
+    body = {
+        "username": "new-customer", "password": "1234", "phone_number": "0790000000",
+        "driver_license_number": "LIC-123456", "vehicle": vehicle.id,
+        "start_date": future(1), "end_date": future(3), "payment_method": "cash",
+    }
+    response = admin_client.post("/api/create-booking-v1/", body)
+    assert response.status_code == 400
+    assert "vehicle" in response.data
+    assert not Booking.objects.filter(customer__user__username="new-customer").exists()
+
+
+def batch_item(customer, vehicle, start, end):
+    return {"customer": customer.id, "vehicle": vehicle.id, "start_date": str(future(start)), "end_date": str(future(end))}
+
+
+@pytest.mark.django_db
+def test_batch_create_reports_conflicts_per_item(admin_client, vehicles, customer):
+    Booking.objects.create(customer=customer, vehicle=vehicles[1], start_date=future(10), end_date=future(12))
+    body = {"bookings": [
+        batch_item(customer, vehicles[0], 1, 3),
+        batch_item(customer, vehicles[0], 3, 4),    # overlaps item 0
+        batch_item(customer, vehicles[1], 12, 14),  # overlaps an existing booking
+        batch_item(customer, vehicles[1], 1, 2),
+        {"vehicle": vehicles[0].id, "start_date": str(future(20))},
+    ]}
+    response = admin_client.post("/api/bookings/batch/", body, format="json")
+    assert response.status_code == 207
+    assert [result["status"] for result in response.data["results"]] == [
+        "created", "conflict", "conflict", "created", "invalid",
+    ]
+    assert response.data["created"] == 2
+    assert availability_index.check() == []
+
+
+@pytest.mark.django_db
+def test_batch_create_all_or_nothing(admin_client, vehicles, customer):
+    body = {"all_or_nothing": True, "bookings": [
+        batch_item(customer, vehicles[0], 1, 3),
+        batch_item(customer, vehicles[0], 2, 5),
+    ]}
+    response = admin_client.post("/api/bookings/batch/", body, format="json")
+    assert response.status_code == 400
+    assert [result["status"] for result in response.data["results"]] == ["skipped", "conflict"]
+    assert not Booking.objects.exists()
+
+
+@pytest.mark.django_db
+def test_batch_create_query_count_does_not_grow(admin_client, vehicles, customer, django_assert_max_num_queries):
+    small = {"bookings": [batch_item(customer, vehicles[0], 1, 1)]}
+    large = {"bookings": [batch_item(customer, vehicles[day % 2], 10 + day, 10 + day) for day in range(40)]}
+    with django_assert_max_num_queries(13) as small_queries:
+        assert admin_client.post("/api/bookings/batch/", small, format="json").status_code == 201
+    with django_assert_max_num_queries(13) as large_queries:
+        assert admin_client.post("/api/bookings/batch/", large, format="json").status_code == 201
+    assert len(large_queries) == len(small_queries)
+    assert Booking.objects.count() == 41
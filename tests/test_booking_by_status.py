@@ -0,0 +1,43 @@
+import pytest
+from datetime import date, timedelta
+from apps.booking.enums import BookingStatus
+from apps.booking.models import Booking
+from apps.vehicle.models import Vehicle
+
+from tests.conftest import admin_client, user_client, customer
+
+
+@pytest.fixture
+def bookings(customer):
+    start = date.today() + timedelta(days=1)
+    statuses = [BookingStatus.PENDING.value] * 5 + [BookingStatus.CONFIRMED.value] * 2 + [BookingStatus.CANCELLED.value]
+    return [
+        Booking.objects.create(
+            customer=customer, start_date=start, end_date=start, status=booking_status,
+            vehicle=Vehicle.objects.create(brand="kia", model="Rio", year=2020, daily_rate=30, plate_number=f"KIA-{index}"),
+        )
+        for index, booking_status in enumerate(statuses)
+    ]
+
+
+@pytest.mark.django_db
+def test_by_status_is_paginated_with_counts(admin_client, bookings, django_assert_num_queries):
+    # auth user + GROUP BY counts + one page
+    with django_assert_num_queries(3):
+        response = admin_client.get("/api/bookings/by_status/?status=pending&page_size=2")
+    assert response.status_code == 200
+    assert len(response.data["results"]) == 2
+    assert {item["status"] for item in response.data["results"]} == {"pending"}
+    assert response.data["next"]
+    assert response.data["counts"] == {"pending": 5, "confirmed": 2, "cancelled": 1, "completed": 0}
+
+
+@pytest.mark.django_db
+def test_by_status_rejects_unknown_status(admin_client, bookings):
+    response = admin_client.get("/api/bookings/by_status/?status=lost")
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_by_status_is_admin_only(user_client):
+    assert user_client.get("/api/bookings/by_status/").status_code == 403
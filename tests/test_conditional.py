@@ -0,0 +1,54 @@
+import pytest
+from datetime import date, timedelta
+from apps.booking.models import Booking
+from apps.booking.transitions import run_action
+
+from tests.conftest import admin_client, user_client, vehicle, vehicles, customer
+
+
+@pytest.mark.django_db
+def test_vehicle_retrieve_not_modified(user_client, vehicle, django_assert_num_queries):
+    url = f"/api/vehicles/{vehicle.id}/"
+    response = user_client.get(url)
+    etag = response["ETag"]
+    assert response["Last-Modified"]
+
+    # auth user + updated_at probe; the vehicle is not loaded
+    with django_assert_num_queries(2):
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert user_client.get(url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]).status_code == 304
+
+    vehicle.daily_rate = 99
+    vehicle.save()
+    response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+
+
+@pytest.mark.django_db
+def test_vehicle_list_not_modified(user_client, vehicles, django_assert_num_queries):
+    etag = user_client.get("/api/vehicles/")["ETag"]
+    with django_assert_num_queries(2):
+        assert user_client.get("/api/vehicles/", HTTP_IF_NONE_MATCH=etag).status_code == 304
+    # Another representation of the same rows has its own ETag
+    assert user_client.get("/api/vehicles/?fields=id", HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    vehicles[1].brand = "audi"
+    vehicles[1].save()
+    assert user_client.get("/api/vehicles/", HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+@pytest.mark.django_db
+def test_booking_detail_and_list_not_modified(admin_client, vehicle, customer):
+    start = date.today() + timedelta(days=1)
+    booking = Booking.objects.create(customer=customer, vehicle=vehicle, start_date=start, end_date=start)
+    detail = admin_client.get(f"/api/bookings/{booking.id}/")["ETag"]
+    listing = admin_client.get("/api/bookings/")["ETag"]
+    assert admin_client.get(f"/api/bookings/{booking.id}/", HTTP_IF_NONE_MATCH=detail).status_code == 304
+    assert admin_client.get("/api/bookings/", HTTP_IF_NONE_MATCH=listing).status_code == 304
+
+    run_action('approve', [booking.id])
+    assert admin_client.get(f"/api/bookings/{booking.id}/", HTTP_IF_NONE_MATCH=detail).status_code == 200
+    assert admin_client.get("/api/bookings/", HTTP_IF_NONE_MATCH=listing).status_code == 200
+    assert admin_client.get("/api/bookings/999999/").status_code == 404
@@ -0,0 +1,154 @@
+import re
+import threading
+import time
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection, connections
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from apps.customer.emums import CustomerStatus
+from apps.customer.external_api import RateLimiter, SharedRateLimiter, VerificationClient, VerificationError
+from apps.customer.models import Customer
+from apps.customer.status_sync import sync_statuses
+from apps.customer.tasks import sync_customer_batch_task, sync_customers_status_task
+from tests.verification_stub import VerificationStub
+
+VERIFIED = CustomerStatus.VERIFIED.value
+UNVERIFIED = CustomerStatus.UNVERIFIED.value
+BLOCKED = CustomerStatus.BLOCKED.value
+
+
+@pytest.fixture
+def stub():
+    with VerificationStub(default=UNVERIFIED) as stub:
+        yield stub
+
+
+@pytest.fixture
+def customers(db):
+    users = User.objects.bulk_create([User(username=f"sync-{index}") for index in range(12)])
+    return Customer.objects.bulk_create([Customer(user=user, phone_number="0790000000") for user in users])
+
+
+def client(stub, **kwargs):
+    return VerificationClient(stub.url, timeout=2, retries=2, backoff=0, **kwargs)
+
+
+@pytest.mark.django_db
+def test_sync_writes_only_changed_statuses(stub, customers):
+    stub.statuses = {customers[0].id: VERIFIED, customers[5].id: BLOCKED}
+    with CaptureQueriesContext(connection) as queries:
+        stats = sync_statuses(client(stub).get_status, workers=4, chunk_size=5)
+    assert (stats["checked"], stats["changed"], stats["failed"]) == (12, 2, 0)
+    assert stats["customers_per_second"] > 0
+    # One bulk UPDATE per chunk that has changes (chunks 1 and 2 of 3)
+    assert len([query for query in queries.captured_queries if query["sql"].startswith("UPDATE")]) == 2
+    assert dict(Customer.objects.exclude(status=UNVERIFIED).values_list('id', 'status')) == stub.statuses
+
+
+@pytest.mark.django_db
+def test_sync_retries_then_skips_failing_lookups(stub, customers):
+    stub.default = VERIFIED
+    stub.flaky = {customers[1].id}
+    stub.broken = {customers[2].id}
+    stats = sync_statuses(client(stub).get_status, workers=3, chunk_size=4)
+    assert (stats["changed"], stats["failed"]) == (11, 1)
+    assert stub.requests[customers[1].id] == 2
+    assert stub.requests[customers[2].id] == 3
+    assert Customer.objects.get(id=customers[2].id).status == UNVERIFIED
+
+
+@pytest.mark.django_db
+def test_client_rejects_unknown_status(stub, customers):
+    stub.statuses = {customers[0].id: "Suspended"}
+    with pytest.raises(VerificationError):
+        client(stub).get_status(customers[0].id)
+
+
+def test_rate_limiter_spaces_calls():
+    limiter = RateLimiter(rate=100)
+    started = time.monotonic()
+    for _ in range(11):
+        limiter.acquire()
+    assert time.monotonic() - started >= 0.09
+
+
+def test_shared_rate_limiter_counts_across_instances():
+    # Two limiters (two workers) share the budget of one
+    first, second = SharedRateLimiter(rate=20), SharedRateLimiter(rate=20)
+    started = time.monotonic()
+    for _ in range(5):
+        first.acquire()
+        second.acquire()
+    # 10 calls at 2 per 0.1s window: at least four window boundaries
+    assert time.monotonic() - started >= 0.3
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_batches_share_the_rate_limit(stub, customers):
+    rate = 20
+    ids = [customer.id for customer in customers]
+    batches = [ids[:6], ids[6:]]
+
+    def worker(batch):
+        try:
+            sync_customer_batch_task(batch)
+        finally:
+            connections.close_all()
+
+    with override_settings(CUSTOMER_VERIFICATION_URL=stub.url, CUSTOMER_VERIFICATION_RATE=rate):
+        threads = [threading.Thread(target=worker, args=(batch,)) for batch in batches]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert len(stub.times) == 12
+    # Combined rate of both batches, allowing one burst window at each end
+    limiter = SharedRateLimiter(rate)
+    span = max(stub.times) - min(stub.times)
+    assert len(stub.times) - 2 * limiter.budget <= rate * span
+
+
+@pytest.mark.django_db
+def test_sync_task_uses_configured_service(stub, customers):
+    stub.default = BLOCKED
+    with override_settings(CUSTOMER_VERIFICATION_URL=stub.url, CUSTOMER_VERIFICATION_RATE=0):
+        message = sync_customers_status_task()
+    assert message.startswith("12 customers checked, 12 status updated, 0 failed")
+    assert not Customer.objects.exclude(status=BLOCKED).exists()
+
+
+@pytest.fixture
+def eager_celery(monkeypatch):
+    # Run tasks inline and keep their results in the (in-memory) result backend
+    from rentCarSystem.celery import app
+    monkeypatch.setitem(app.conf, 'task_always_eager', True)
+    monkeypatch.setitem(app.conf, 'task_store_eager_result', True)
+    monkeypatch.setattr(sync_customer_batch_task, 'store_eager_result', True)
+    return app
+
+
+@pytest.mark.django_db
+def test_admin_action_fans_out_batches_with_progress(client, stub, customers, eager_celery):
+    stub.default = VERIFIED
+    admin = User.objects.create_superuser(username="sync-admin", password="1234")
+    client.force_login(admin)
+    with override_settings(CUSTOMER_VERIFICATION_URL=stub.url, CUSTOMER_VERIFICATION_RATE=0, CUSTOMER_SYNC_BATCH_SIZE=5):
+        response = client.post(reverse("admin:customer_customer_changelist"), {
+            "action": "run_sync_single_customers_task",
+            "_selected_action": [customer.id for customer in customers],
+        }, follow=True)
+    message = str(list(response.context["messages"])[0])
+    assert "12 selected customers in 3 batches" in message
+    assert not Customer.objects.filter(id__in=[c.id for c in customers]).exclude(status=VERIFIED).exists()
+
+    progress_url = re.search(r'href="([^"]+)"', message).group(1)
+    response = client.get(progress_url)
+    assert response.status_code == 200
+    assert response.context["finished"]
+    assert response.context["batches"] == {"total": 3, "done": 3, "errors": 0}
+    assert response.context["totals"] == {"checked": 12, "changed": 12, "failed": 0}
+
+    assert client.get(reverse("admin:customer_customer_sync_progress", args=["unknown"])).status_code == 404
@@ -0,0 +1,56 @@
+import pytest
+from datetime import date, timedelta
+from apps.booking.models import Booking
+from apps.vehicle.models import Vehicle
+
+from tests.conftest import admin_client, user_client, customer
+
+
+@pytest.fixture
+def fleet(db):
+    return [
+        Vehicle.objects.create(brand="kia", model="Rio", year=2020, daily_rate=30, plate_number=f"KIA-{index}")
+        for index in range(7)
+    ]
+
+
+def walk(client, url):
+    ids = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        ids += [item["id"] for item in response.data["results"]]
+        url = response.data["next"]
+    return ids
+
+
+@pytest.mark.django_db
+def test_vehicle_list_cursor_walks_newest_first(user_client, fleet):
+    ids = walk(user_client, "/api/vehicles/?page_size=2")
+    assert ids == [vehicle.id for vehicle in reversed(fleet)]
+
+
+@pytest.mark.django_db
+def test_vehicle_list_cursor_page_skips_count(user_client, fleet, django_assert_num_queries):
+    first = user_client.get("/api/vehicles/?page_size=3")
+    # auth user + (id, updated_at) probe of the page + its rows, no COUNT(*)
+    with django_assert_num_queries(3):
+        response = user_client.get(first.data["next"])
+    assert "count" not in response.data
+    assert response.data["previous"]
+
+
+@pytest.mark.django_db
+def test_vehicle_list_estimated_count(user_client, fleet):
+    response = user_client.get("/api/vehicles/?count=estimate&brand=kia")
+    assert isinstance(response.data["estimated_count"], int)
+
+
+@pytest.mark.django_db
+def test_booking_list_cursor_pagination(admin_client, fleet, customer):
+    start = date.today() + timedelta(days=1)
+    bookings = [
+        Booking.objects.create(customer=customer, vehicle=vehicle, start_date=start, end_date=start)
+        for vehicle in fleet
+    ]
+    assert walk(admin_client, "/api/bookings/?page_size=4") == [booking.id for booking in reversed(bookings)]
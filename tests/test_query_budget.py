@@ -0,0 +1,283 @@
+import re
+from collections import Counter
+from datetime import date, timedelta
+from itertools import cycle
+import pytest
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, get_resolver, reverse
+from model_bakery import baker
+from rest_framework.test import APIClient
+from apps.booking.availability import availability_index
+from apps.booking.enums import BookingStatus
+from apps.booking.models import Booking
+from apps.report.enums import ReportJobStatus, ReportKind
+from apps.report.models import ReportJob
+from apps.report.rollup import booking_rollup
+from apps.vehicle.models import Vehicle
+
+# Query-count budget: every route runs against 1 and then 500 rows of
+# vehicles, customers and bookings, and must issue the same number of
+# queries. A growing count is an N+1; the failure lists the query
+# patterns that repeat. Every URL pattern and method must have a route.
+
+SIZES = (1, 500)
+# Not budgeted: admin pages other than the changelists, the DRF API root
+# and the media files served in development
+UNBUDGETED = re.compile(r"^admin/(?!.*_changelist$)|:api-root$|^media/")
+
+
+def future(days):
+    return date.today() + timedelta(days=days)
+
+
+def query_pattern(sql):
+    sql = re.sub(r"'(?:[^']|'')*'", "?", sql)
+    sql = re.sub(r"\b\d+(\.\d+)?\b", "?", sql)
+    return re.sub(r"\(\?(?:, \?)*\)", "(...)", sql)
+
+
+class Budget:
+    """
+    Builds the dataset in steps and sends each route once per step.
+    """
+
+    def __init__(self):
+        self.admin = User.objects.create_superuser(username="budget-admin", password="1234")
+        self.member = User.objects.create_user(username="budget-member", password="1234")
+        self.vehicles, self.customers, self.bookings = [], [], []
+        self.admin_api, self.member_api = APIClient(), APIClient()
+        self.admin_api.force_authenticate(self.admin)
+        self.member_api.force_authenticate(self.member)
+        self.site = Client()
+        self.site.force_login(self.admin)
+        self.covered = set()
+
+    def grow(self, size):
+        missing = size - len(self.vehicles)
+        vehicles = baker.make(Vehicle, _quantity=missing, _bulk_create=True)
+        users = baker.make(User, _quantity=missing)
+        customers = [user.customer for user in User.objects.filter(id__in=[user.id for user in users]).select_related('customer')]
+        statuses = cycle([status.value for status in BookingStatus])
+        self.bookings += baker.make(
+            Booking, _quantity=missing, _bulk_create=True,
+            vehicle=iter(vehicles), customer=iter(customers), status=statuses,
+            start_date=date.today().replace(day=1), end_date=date.today().replace(day=1) + timedelta(days=1),
+            total_price=100,
+        )
+        self.vehicles += vehicles
+        self.customers += customers
+        self.bookings += baker.make(
+            Booking, _quantity=missing, _bulk_create=True,
+            vehicle=iter(vehicles), customer=cycle([self.member.customer]),
+            start_date=future(20), end_date=future(21), total_price=100,
+        )
+        # Rows consumed by the write routes (updated, transitioned or deleted), fresh at every step
+        self.spare_vehicle = baker.make(Vehicle, plate_number=f"BUDGET-SPARE-{size}")
+        self.spares = {
+            name: Booking.objects.create(
+                customer=self.member.customer, vehicle=self.vehicles[0], total_price=100,
+                start_date=future(400 + size % 7 * 10 + offset), end_date=future(400 + size % 7 * 10 + offset),
+            )
+            for offset, name in enumerate(("approve", "reject", "change-status", "update"))
+        }
+        self.report_job = ReportJob.objects.create(
+            report=ReportKind.BOOKINGS.value, status=ReportJobStatus.DONE.value, requested_by=self.admin,
+        )
+        self.report_job.file.save("budget.pdf", ContentFile(b"%PDF-budget"))
+        availability_index.rebuild()
+        booking_rollup.rebuild()
+
+    def cleanup(self):
+        ReportJob.objects.filter(requested_by=self.admin).delete()
+        Booking.objects.filter(id__in=[booking.id for booking in self.bookings]).delete()
+        Booking.objects.filter(customer__user__username__startswith="budget-").delete()
+        Vehicle.objects.filter(id__in=[vehicle.id for vehicle in self.vehicles]).delete()
+        Vehicle.objects.filter(plate_number__startswith="BUDGET-").delete()
+        User.objects.filter(id__in=[customer.user_id for customer in self.customers]).delete()
+        User.objects.filter(username__startswith="budget-").delete()
+
+    def run(self, route, size):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = route(self, size)
+            if getattr(response, 'streaming', False):
+                b"".join(response.streaming_content)
+        assert response.status_code < 400, f"{response.status_code}: {getattr(response, 'data', '')}"
+        self.covered.add((response.resolver_match.func, response.request['REQUEST_METHOD'].lower()))
+        return [query["sql"] for query in queries.captured_queries]
+
+
+def api(method, path, client='admin_api', **data):
+    def route(budget, size):
+        url = path(budget) if callable(path) else path
+        body = data.get('body')
+        return getattr(getattr(budget, client), method)(
+            url, body(budget, size) if callable(body) else body, format='json',
+        )
+    return route
+
+
+def page(path):
+    def route(budget, size):
+        return budget.site.get(path(budget) if callable(path) else path)
+    return route
+
+
+WINDOW = f"start_date={future(30)}&end_date={future(32)}"
+
+ROUTES = {
+    # Authentication / customer
+    "auth-register": api('post', "/api/auth/register/", client='member_api', body=lambda budget, size: {
+        "username": f"budget-new-{size}", "password": "1234", "confirm_password": "1234",
+    }),
+    "auth-login": api('post', "/api/auth/login/", client='member_api', body={"username": "budget-member", "password": "1234"}),
+    "auth-refresh": lambda budget, size: budget.member_api.post(
+        "/api/auth/refresh/",
+        {"refresh": budget.member_api.post("/api/auth/login/", {"username": "budget-member", "password": "1234"}).data["refresh"]},
+    ),
+    "customer-profile": api('get', "/api/customer/profile/", client='member_api'),
+    "customer-profile-update": api('put', "/api/customer/profile/update/", client='member_api', body={"address": "Amman, Street 1"}),
+    # Vehicles
+    "vehicle-list": api('get', "/api/vehicles/"),
+    "vehicle-detail": api('get', lambda budget: f"/api/vehicles/{budget.vehicles[0].id}/"),
+    "vehicle-update": api('put', lambda budget: f"/api/vehicles/{budget.vehicles[0].id}/", body=lambda budget, size: {
+        "brand": "Audi", "model": "A4", "year": 2020, "vehicle_type": "car", "daily_rate": "50.00",
+        "plate_number": budget.vehicles[0].plate_number,
+    }),
+    "vehicle-create": api('post', "/api/vehicles/", body=lambda budget, size: {
+        "brand": "Audi", "model": "A4", "year": 2020, "vehicle_type": "car", "daily_rate": "50.00",
+        "plate_number": f"BUDGET-NEW-{size}",
+    }),
+    "vehicle-delete": api('delete', lambda budget: f"/api/vehicles/{budget.spare_vehicle.id}/"),
+    "vehicle-available": api('get', f"/api/vehicles/available/?{WINDOW}"),
+    "vehicle-available-stream": api('get', f"/api/vehicles/available/?{WINDOW}&stream=ndjson&vehicle_type=none"),
+    "vehicle-available-cache-stats": api('get', "/api/vehicles/available/cache-stats/"),
+    "vehicle-availability-matrix": api('get', f"/api/vehicles/availability-matrix/?windows={future(30)}:{future(32)},{future(40)}:{future(41)}"),
+    "vehicle-calendar": api('get', lambda budget: f"/api/vehicles/{budget.vehicles[0].id}/calendar/?from={future(0)}&to={future(60)}"),
+    "vehicle-fleet-calendar": api('get', f"/api/vehicles/calendar/?from={future(0)}&to={future(60)}"),
+    "vehicle-next-free": api('get', lambda budget: f"/api/vehicles/{budget.vehicles[0].id}/next-free/?start_date={future(20)}&end_date={future(21)}"),
+    "cache-get": api('get', "/api/cache/?key=budget"),
+    "cache-set": api('post', "/api/cache/", body={"key": "budget", "data": "value"}),
+    # Bookings
+    "booking-list": api('get', "/api/bookings/"),
+    "booking-list-expanded": api('get', "/api/bookings/?expand=customer,vehicle"),
+    "booking-list-member": api('get', "/api/bookings/", client='member_api'),
+    "booking-detail": api('get', lambda budget: f"/api/bookings/{budget.bookings[0].id}/"),
+    "booking-by-status": api('get', "/api/bookings/by_status/?status=pending"),
+    "booking-create": api('post', "/api/bookings/", body=lambda budget, size: {
+        "customer": budget.customers[0].id, "vehicle": budget.vehicles[0].id,
+        "start_date": str(future(100 + size % 7)), "end_date": str(future(100 + size % 7)),
+    }),
+    "booking-batch": api('post', "/api/bookings/batch/", body=lambda budget, size: {"bookings": [{
+        "customer": budget.customers[0].id, "vehicle": budget.vehicles[0].id,
+        "start_date": str(future(200 + size % 7)), "end_date": str(future(200 + size % 7)),
+    }]}),
+    "booking-bulk-transition": api('post', "/api/bookings/bulk-transition/", body=lambda budget, size: {
+        "action": "cancel", "ids":[booking.id for booking in budget.bookings],
+    }),
+    "booking-create-v1": api('post', "/api/create-booking-v1/", body=lambda budget, size: {
+        "username": f"budget-v1-{size}", "password": "1234", "phone_number": "0790000000",
+        "driver_license_number": f"LIC-V1-{size}", "vehicle": budget.vehicles[0].id,
+        "start_date": str(future(300 + size % 7)), "end_date": str(future(300 + size % 7)), "payment_method": "cash",
+    }),
+    "booking-create-v2": api('post', "/api/create-booking-v2/", body=lambda budget, size: {
+        "user": {"username": f"budget-v2-{size}", "password": "1234"},
+        "customer": {"phone_number": f"0791{size:06d}"},
+        "booking": {
+            "vehicle": budget.vehicles[0].id, "payment_method": "cash",
+            "start_date": str(future(350 + size % 7)), "end_date": str(future(350 + size % 7)),
+        },
+    }),
+    "booking-update": api('put', lambda budget: f"/api/bookings/{budget.spares['update'].id}/", body=lambda budget, size: {
+        "vehicle": budget.vehicles[0].id, "payment_method": "cash",
+        "start_date": str(budget.spares['update'].start_date), "end_date": str(budget.spares['update'].end_date),
+    }),
+    "booking-partial-update": api('patch', lambda budget: f"/api/bookings/{budget.spares['update'].id}/", body={"notes": "budget"}),
+    "booking-delete": api('delete', lambda budget: f"/api/bookings/{budget.spares['update'].id}/"),
+    "booking-approve": api('patch', lambda budget: f"/api/bookings/{budget.spares['approve'].id}/approve/"),
+    "booking-reject": api('patch', lambda budget: f"/api/bookings/{budget.spares['reject'].id}/reject/"),
+    "booking-change-status": api('patch', lambda budget: f"/api/bookings/{budget.spares['change-status'].id}/change-status/",
+                                 body={"status": "cancelled"}),
+    # Reports
+    "report-dashboard": page("/reports/dashboard/"),
+    "report-bookings": page("/reports/bookings/"),
+    "report-bookings-pdf": page("/reports/bookings/pdf/"),
+    "report-vehicle-utilization": page("/reports/vehicle-utilization/"),
+    "report-vehicle-utilization-pdf": page("/reports/vehicle-utilization/pdf/"),
+    "report-job-create": api('post', "/reports/jobs/", body={"report": "bookings", "params": {"status": "PENDING"}}),
+    "report-job-detail": api('get', lambda budget: f"/reports/jobs/{budget.report_job.id}/"),
+    "report-job-download": api('get', lambda budget: f"/reports/jobs/{budget.report_job.id}/download/"),
+}
+# Admin changelists of every registered model
+for model in admin.site._registry:
+    ROUTES[f"admin-{model._meta.app_label}-{model._meta.model_name}"] = page(
+        lambda budget, model=model: reverse(f"admin:{model._meta.app_label}_{model._meta.model_name}_changelist")
+    )
+
+
+def url_methods(patterns=None, prefix=""):
+    """
+    Yield ("route:name", view, method) for every URL pattern and HTTP method it serves.
+    """
+    for pattern in get_resolver().url_patterns if patterns is None else patterns:
+        route = prefix + str(pattern.pattern).lstrip("^")
+        if isinstance(pattern, URLResolver):
+            yield from url_methods(pattern.url_patterns, route)
+            continue
+        view = pattern.callback
+        if getattr(view, "actions", None):
+            methods = view.actions
+        elif hasattr(view, "view_class"):
+            methods = [method for method in view.view_class.http_method_names if hasattr(view.view_class, method)]
+        else:
+            methods = ["get"]
+        for method in methods:
+            if method not in ("head", "options"):
+                yield f"{route}:{pattern.name}" if pattern.name else route, view, method
+
+
+@pytest.fixture(scope="module")
+def budget(django_db_setup, django_db_blocker, tmp_path_factory):
+    """
+    The Budget after every route ran at every size, with `queries`:
+    {route name: [queries at SIZES[0], queries at SIZES[1]]}
+    """
+    with django_db_blocker.unblock(), override_settings(MEDIA_ROOT=tmp_path_factory.mktemp("media")):
+        budget = Budget()
+        budget.queries = {name: [] for name in ROUTES}
+        try:
+            for size in SIZES:
+                budget.grow(size)
+                for name, route in ROUTES.items():
+                    budget.queries[name].append(budget.run(route, size))
+        finally:
+            budget.cleanup()
+    return budget
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("name", ROUTES)
+def test_query_count_does_not_grow_with_rows(budget, name):
+    few, many = budget.queries[name]
+    if len(many) != len(few):
+        grown = Counter(map(query_pattern, many)) - Counter(map(query_pattern, few))
+        report = "\n".join(f"  +{count}x {pattern}" for pattern, count in grown.most_common(5))
+        pytest.fail(
+            f"{name}: {len(few)} queries with {SIZES[0]} row(s), {len(many)} with {SIZES[1]}.\n"
+            f"Repeated query patterns:\n{report}"
+        )
+
+
+@pytest.mark.django_db
+def test_every_url_has_a_route(budget):
+    missing = sorted(
+        f"{method.upper()} {route}" for route, view, method in url_methods()
+        if not UNBUDGETED.search(route) and (view, method) not in budget.covered
+    )
+    assert not missing, "URLs without a ROUTES entry:\n" + "\n".join(missing)
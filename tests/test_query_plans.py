@@ -0,0 +1,126 @@
+import random
+import re
+import pytest
+from datetime import date, timedelta
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import RequestFactory
+from django.utils import timezone
+from apps.booking.enums import BookingStatus, ACTIVE_BOOKING_STATUSES
+from apps.booking.models import Booking
+from apps.report.utils.filters import get_filtered_bookings
+from apps.vehicle.models import Vehicle
+
+# EXPLAIN-plan regression suite: every hot booking query must be answered
+# through an index on a realistically sized table, never a sequential scan.
+
+VEHICLES = 200
+BOOKINGS_PER_VEHICLE = 150
+INDEX_SCAN = re.compile(r"Index Scan|Index Only Scan|Bitmap Index Scan")
+
+
+@pytest.fixture(scope="module")
+def seeded_bookings(django_db_setup, django_db_blocker):
+    """
+    Seed 30k bookings with a realistic status mix: everything that ended
+    before the last sweep is finished, only recent bookings are active.
+    Then ANALYZE so the planner sees the volume.
+    """
+    rng = random.Random(7)
+    with django_db_blocker.unblock():
+        customer = User.objects.create_user(username="plans-customer").customer
+        vehicles = Vehicle.objects.bulk_create([
+            Vehicle(brand="Plan", model=str(index), year=2020, daily_rate=40, plate_number=f"PLAN-{index}")
+            for index in range(VEHICLES)
+        ])
+        today = timezone.localdate()
+        bookings = []
+        for vehicle in vehicles:
+            day = today - timedelta(days=480)
+            for _ in range(BOOKINGS_PER_VEHICLE):
+                start_date = day + timedelta(days=rng.randrange(1, 4))
+                end_date = start_date + timedelta(days=rng.randrange(0, 4))
+                day = end_date
+                if end_date < today - timedelta(days=2):
+                    status = rng.choice([BookingStatus.COMPLETED.value] * 9 + [BookingStatus.CANCELLED.value])
+                else:
+                    status = rng.choice(ACTIVE_BOOKING_STATUSES + (BookingStatus.CANCELLED.value,))
+                bookings.append(Booking(
+                    customer=customer, vehicle=vehicle, start_date=start_date,
+                    end_date=end_date, status=status, total_price=100,
+                ))
+        Booking.objects.bulk_create(bookings, batch_size=5000)
+        with connection.cursor() as cursor:
+            # created_at follows start_date like real traffic, not the seeding time
+            cursor.execute(
+                "UPDATE booking_booking SET created_at = start_date - interval '7 days' WHERE customer_id = %s",
+                [customer.id],
+            )
+            cursor.execute("ANALYZE booking_booking")
+        yield vehicles
+        Vehicle.objects.filter(id__in=[vehicle.id for vehicle in vehicles]).delete()
+        customer.user.delete()
+
+
+def assert_index_scan(queryset):
+    plan = queryset.explain()
+    assert INDEX_SCAN.search(plan), f"Expected an index scan, got:\n{plan}"
+    assert "Seq Scan on booking_booking" not in plan, f"Sequential scan on bookings:\n{plan}"
+
+
+@pytest.mark.django_db
+def test_update_status_uses_index(seeded_bookings):
+    assert_index_scan(Booking.objects.filter(
+        status=BookingStatus.CONFIRMED.value, end_date__lt=timezone.localdate(),
+    ))
+
+
+@pytest.mark.django_db
+def test_update_status_batch_lookup_uses_index(seeded_bookings):
+    assert_index_scan(Booking.objects.filter(
+        status=BookingStatus.CONFIRMED.value, end_date__lt=timezone.localdate(), pk__gt=0,
+    ).order_by('pk').values_list('pk', flat=True)[:1000])
+
+
+@pytest.mark.django_db
+def test_auto_cancel_expired_uses_index(seeded_bookings):
+    assert_index_scan(Booking.objects.filter(
+        status=BookingStatus.PENDING.value, created_at__lt=timezone.now() - timedelta(hours=24),
+    ))
+
+
+@pytest.mark.django_db
+def test_vehicle_overlap_check_uses_index(seeded_bookings):
+    today = timezone.localdate()
+    assert_index_scan(Booking.objects.filter(
+        vehicle=seeded_bookings[0],
+        status__in=ACTIVE_BOOKING_STATUSES,
+        start_date__lte=today + timedelta(days=10),
+        end_date__gte=today,
+    ))
+
+
+@pytest.mark.django_db
+def test_active_bookings_scan_uses_index(seeded_bookings):
+    # Availability index rebuild for a subset of vehicles
+    assert_index_scan(Booking.objects.filter(
+        status__in=ACTIVE_BOOKING_STATUSES, vehicle_id__in=[v.id for v in seeded_bookings[:5]],
+    ))
+
+
+@pytest.mark.django_db
+def test_report_listing_uses_start_date_index(seeded_bookings):
+    request = RequestFactory().get("/reports/bookings/")
+    assert_index_scan(get_filtered_bookings(request)[:50])
+
+
+@pytest.mark.django_db
+def test_report_listing_by_status_uses_index(seeded_bookings):
+    request = RequestFactory().get("/reports/bookings/", {"status": "CANCELLED", "start_date": date.today().isoformat()})
+    assert_index_scan(get_filtered_bookings(request)[:50])
+
+
+@pytest.mark.django_db
+def test_booking_keyset_page_uses_index(seeded_bookings):
+    position = Booking.objects.order_by('-created_at', 'id').values_list('created_at', flat=True)[5000]
+    assert_index_scan(Booking.objects.filter(created_at__lt=position).order_by('-created_at', 'id')[:20])
@@ -0,0 +1,109 @@
+import threading
+import time
+import pytest
+from datetime import date, timedelta
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from apps.booking.models import Booking
+from apps.report.cache import DashboardCache, dashboard_cache
+
+from tests.conftest import cache_down, customer, vehicle
+
+
+FILTERS = (None, None, None)
+
+
+class Compute:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return {"total_bookings": self.calls}
+
+
+def test_fresh_entry_is_served_from_cache():
+    compute = Compute()
+    first = dashboard_cache.get(FILTERS, compute)
+    second = dashboard_cache.get(FILTERS, compute)
+    assert compute.calls == 1
+    assert second == first
+    assert dashboard_cache.get((date(2030, 1, 1), None, None), compute)["context"] == {"total_bookings": 2}
+
+
+@pytest.mark.django_db
+def test_expired_entry_is_recomputed_by_one_worker(django_capture_on_commit_callbacks):
+    compute = Compute()
+    dashboard_cache.get(FILTERS, compute)
+    with django_capture_on_commit_callbacks(execute=True):
+        dashboard_cache.invalidate()
+
+    # Another worker holds the recompute lock: the stale entry is served
+    lock = f"{DashboardCache._key(FILTERS)}:lock"
+    cache.add(lock, 1)
+    assert dashboard_cache.get(FILTERS, compute)["context"] == {"total_bookings": 1}
+    assert compute.calls == 1
+
+    cache.delete(lock)
+    assert dashboard_cache.get(FILTERS, compute)["context"] == {"total_bookings": 2}
+    assert not cache.get(lock)
+
+
+def test_entries_expire_after_timeout():
+    compute = Compute()
+    short = DashboardCache(timeout=0)
+    short.get(FILTERS, compute)
+    short.get(FILTERS, compute)
+    assert compute.calls == 2
+
+
+def test_cold_miss_waits_for_the_lock_holder():
+    compute = Compute()
+    lock = f"{DashboardCache._key(FILTERS)}:lock"
+    cache.add(lock, 1)
+
+    def holder():
+        time.sleep(0.2)
+        dashboard_cache._compute(DashboardCache._key(FILTERS), dashboard_cache._version(), lambda: {"from": "holder"})
+
+    thread = threading.Thread(target=holder)
+    thread.start()
+    assert dashboard_cache.get(FILTERS, compute)["context"] == {"from": "holder"}
+    thread.join()
+    assert compute.calls == 0
+
+    # The holder died: computed anyway once the lock times out
+    cache.delete(DashboardCache._key(FILTERS))
+    assert DashboardCache(lock_timeout=0.1).get(FILTERS, compute)["context"] == {"total_bookings": 1}
+
+
+@pytest.mark.django_db
+def test_dashboard_is_cached_and_invalidated_by_writes(admin_user, client, vehicle, customer, django_capture_on_commit_callbacks):
+    client.force_login(admin_user)
+    assert client.get("/reports/dashboard/").context["total_bookings"] == 0
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get("/reports/dashboard/")
+    assert response.context["total_bookings"] == 0
+    assert "Data as of" in response.content.decode()
+    assert not any("report_dailybookingstat" in query["sql"] for query in queries.captured_queries)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Booking.objects.create(customer=customer, vehicle=vehicle, start_date=date.today() + timedelta(days=1),
+                               end_date=date.today() + timedelta(days=2))
+    response = client.get("/reports/dashboard/")
+    assert response.context["total_bookings"] == 1
+    assert response.context["data_age"] == 0
+
+
+@pytest.mark.django_db
+def test_dashboard_is_computed_when_the_cache_is_down(admin_user, client, cache_down):
+    compute = Compute()
+    assert dashboard_cache.get(FILTERS, compute)["context"] == {"total_bookings": 1}
+    assert dashboard_cache.get(FILTERS, compute)["context"] == {"total_bookings": 2}
+
+    client.force_login(admin_user)
+    response = client.get("/reports/dashboard/")
+    assert response.status_code == 200
+    assert response.context["total_bookings"] == 0
@@ -0,0 +1,104 @@
+import pytest
+from datetime import date, timedelta
+from apps.booking.models import Booking
+from apps.report import pdf_reports
+from apps.report.enums import ReportJobStatus
+from apps.report.models import ReportJob
+from apps.report.tasks import generate_report_task
+from rest_framework.test import APIClient
+
+from tests.conftest import admin_client, create_user, customer, vehicle
+
+
+@pytest.fixture
+def eager_celery(monkeypatch, settings, tmp_path):
+    # Run tasks inline and store the PDFs in a temporary media root
+    from rentCarSystem.celery import app
+    monkeypatch.setitem(app.conf, 'task_always_eager', True)
+    settings.MEDIA_ROOT = tmp_path
+    return app
+
+
+def request_report(client, capture, report, params=None):
+    with capture(execute=True):
+        response = client.post("/reports/jobs/", {"report": report, "params": params or {}}, format="json")
+    assert response.status_code == 202, response.data
+    assert response.data["status"] == "pending"
+    return client.get(response.data["status_url"])
+
+
+@pytest.mark.django_db
+def test_bookings_report_job_renders_a_downloadable_pdf(
+    admin_client, customer, vehicle, eager_celery, django_capture_on_commit_callbacks,
+):
+    Booking.objects.create(customer=customer, vehicle=vehicle, start_date=date.today() + timedelta(days=1),
+                           end_date=date.today() + timedelta(days=2))
+    response = request_report(admin_client, django_capture_on_commit_callbacks, "bookings", {"status": "PENDING"})
+    assert response.status_code == 200
+    assert response.data["status"] == "done"
+    assert response.data["duration_ms"] is not None
+    assert response.data["params"] == {"status": ["PENDING"]}
+
+    download = admin_client.get(response.data["download_url"])
+    assert download.status_code == 200
+    assert download["Content-Disposition"] == 'attachment; filename="bookings_report.pdf"'
+    assert b"".join(download.streaming_content).startswith(b"%PDF")
+
+
+@pytest.mark.django_db
+def test_utilization_report_job_keeps_repeated_params(admin_client, eager_celery, django_capture_on_commit_callbacks):
+    response = request_report(admin_client, django_capture_on_commit_callbacks, "vehicle-utilization", {
+        "start_date": "2030-03-01", "end_date": "2030-03-31", "status": ["PENDING", "CONFIRMED"],
+    })
+    assert response.data["status"] == "done"
+    job = ReportJob.objects.get(id=response.data["id"])
+    assert job.file.name.endswith("vehicle_utilization_2030-03-01_2030-03-31.pdf")
+
+
+@pytest.mark.django_db
+def test_failed_report_job_records_the_error(admin_client, eager_celery, django_capture_on_commit_callbacks, monkeypatch):
+    monkeypatch.setattr(pdf_reports, "render_to_pdf", lambda template, context: None)
+    response = request_report(admin_client, django_capture_on_commit_callbacks, "bookings")
+    assert response.data["status"] == "failed"
+    assert response.data["error"] == "Error generating PDF"
+    assert response.data["download_url"] is None
+
+
+@pytest.mark.django_db
+def test_report_job_of_a_deleted_user_still_renders(create_user, eager_celery):
+    user = create_user(username="report-admin", is_staff=True)
+    job = ReportJob.objects.create(report="vehicle-utilization", requested_by=user)
+    user.delete()
+    generate_report_task(str(job.id))
+    job.refresh_from_db()
+    assert (job.status, job.requested_by, job.error) == (ReportJobStatus.DONE.value, None, "")
+
+
+@pytest.mark.django_db
+def test_redelivered_report_job_is_skipped(admin_client, eager_celery, django_capture_on_commit_callbacks, monkeypatch):
+    response = request_report(admin_client, django_capture_on_commit_callbacks, "bookings")
+    job = ReportJob.objects.get(id=response.data["id"])
+    monkeypatch.setattr(pdf_reports, "render_to_pdf", lambda template, context: pytest.fail("rendered twice"))
+    assert generate_report_task(str(job.id)) == f"Report job {job.id} skipped"
+
+    running = ReportJob.objects.create(report="bookings", status=ReportJobStatus.RUNNING.value)
+    assert generate_report_task(str(running.id)) == f"Report job {running.id} skipped"
+    refreshed = ReportJob.objects.get(id=job.id)
+    assert (refreshed.file.name, refreshed.finished_at) == (job.file.name, job.finished_at)
+
+
+@pytest.mark.django_db
+def test_report_job_api_validation_and_permissions(admin_client, customer, django_capture_on_commit_callbacks):
+    assert admin_client.post("/reports/jobs/", {"report": "fleet"}, format="json").status_code == 400
+    response = admin_client.post("/reports/jobs/", {"report": "bookings", "params": {"page": 2}}, format="json")
+    assert response.status_code == 400
+
+    # Queued but not rendered yet
+    with django_capture_on_commit_callbacks(execute=False):
+        job_id = admin_client.post("/reports/jobs/", {"report": "bookings"}, format="json").data["id"]
+    assert admin_client.get(f"/reports/jobs/{job_id}/download/").status_code == 409
+
+    user_client = APIClient()
+    user_client.force_authenticate(customer.user)
+    assert user_client.post("/reports/jobs/", {"report": "bookings"}, format="json").status_code == 403
+    assert user_client.get(f"/reports/jobs/{job_id}/").status_code == 403
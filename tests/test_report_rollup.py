@@ -0,0 +1,146 @@
+import pytest
+from datetime import date, timedelta
+from decimal import Decimal
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from apps.booking.enums import BookingStatus
+from apps.booking.models import Booking
+from apps.booking.transitions import transition
+from apps.report.models import DailyBookingStat
+from apps.report.rollup import booking_rollup
+from apps.report.tasks import reconcile_booking_rollup_task
+from apps.report.utils.calculations import monthly_revenue, report_summary, rollup_summary
+
+from tests.conftest import admin_client, customer, vehicle, vehicles
+
+
+def future(days):
+    return date.today() + timedelta(days=days)
+
+
+def stats():
+    return {
+        (row.day, row.vehicle_id, row.vehicle_type, row.status): (row.booking_count, row.booked_days, row.revenue)
+        for row in DailyBookingStat.objects.exclude(booking_count=0)
+    }
+
+
+@pytest.mark.django_db
+def test_rollup_follows_booking_writes(vehicles, customer):
+    first, second = vehicles
+    booking = Booking.objects.create(
+        customer=customer, vehicle=first, start_date=future(5), end_date=future(7), total_price=150,
+    )
+    Booking.objects.create(customer=customer, vehicle=first, start_date=future(5), end_date=future(5),
+                           total_price=50, status=BookingStatus.CANCELLED.value)
+    assert stats() == {
+        (future(5), first.id, "car", "pending"): (1, 3, Decimal("150.00")),
+        (future(5), first.id, "car", "cancelled"): (1, 1, Decimal("50.00")),
+    }
+
+    # Edit: moved to another vehicle and day
+    booking = Booking.objects.get(pk=booking.pk)
+    booking.vehicle, booking.start_date, booking.end_date = second, future(9), future(10)
+    booking.save()
+    # Status transition
+    transition([booking.id], BookingStatus.CONFIRMED.value)
+    second.vehicle_type = "van"
+    second.save()
+    assert stats() == {
+        (future(9), second.id, "van", "confirmed"): (1, 2, Decimal("150.00")),
+        (future(5), first.id, "car", "cancelled"): (1, 1, Decimal("50.00")),
+    }
+    assert booking_rollup.check() == []
+
+    Booking.objects.get(pk=booking.pk).delete()
+    assert stats() == {(future(5), first.id, "car", "cancelled"): (1, 1, Decimal("50.00"))}
+    assert booking_rollup.check() == []
+
+
+@pytest.mark.django_db
+def test_rollup_follows_batch_create(admin_client, vehicles, customer):
+    response = admin_client.post("/api/bookings/batch/", {"bookings": [
+        {"customer": customer.id, "vehicle": vehicle.id, "start_date": str(future(3)), "end_date": str(future(4))}
+        for vehicle in vehicles
+    ]}, format="json")
+    assert response.status_code == 201
+    assert sum(row[0] for row in stats().values()) == 2
+    assert booking_rollup.check() == []
+
+
+@pytest.mark.django_db
+def test_reconcile_rebuilds_drifted_vehicles(vehicles, customer):
+    Booking.objects.create(customer=customer, vehicle=vehicles[0], start_date=future(1), end_date=future(1))
+    # bulk_create bypasses the signals
+    Booking.objects.bulk_create([
+        Booking(customer=customer, vehicle=vehicles[1], start_date=future(2), end_date=future(3), total_price=20),
+    ])
+    assert booking_rollup.check() == [vehicles[1].id]
+    assert reconcile_booking_rollup_task() == "Booking rollup rebuilt for 1 vehicles"
+    assert booking_rollup.check() == []
+    assert reconcile_booking_rollup_task() == "Booking rollup is consistent"
+
+
+@pytest.mark.django_db
+def test_reports_read_the_rollup(admin_user, client, vehicle, customer):
+    Booking.objects.create(customer=customer, vehicle=vehicle, start_date=future(1), end_date=future(2), total_price=80)
+    Booking.objects.create(customer=customer, vehicle=vehicle, start_date=future(1), end_date=future(1),
+                           total_price=40, status=BookingStatus.CANCELLED.value)
+    client.force_login(admin_user)
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get("/reports/dashboard/")
+    assert response.context["total_bookings"] == 2
+    assert response.context["total_revenue"] == Decimal("120.00")
+    assert {row["status"]: row["count"] for row in response.context["by_status"]}["Cancelled"] == 1
+    assert not any(Booking._meta.db_table in query["sql"] for query in queries.captured_queries)
+
+    response = client.get("/reports/bookings/", {"status": "CANCELLED", "end_date": str(future(1))})
+    assert response.context["total_bookings"] == 1
+    assert [booking.status for booking in response.context["bookings"]] == ["cancelled"]
+
+
+@pytest.mark.django_db
+def test_bookings_report_totals_match_its_rows(admin_user, client, vehicle, customer):
+    Booking.objects.create(customer=customer, vehicle=vehicle, start_date=future(1), end_date=future(3), total_price=60)
+    Booking.objects.create(customer=customer, vehicle=vehicle, start_date=future(5), end_date=future(6), total_price=40)
+    client.force_login(admin_user)
+    # The first booking ends after end_date: neither listed nor counted
+    response = client.get("/reports/bookings/", {"start_date": str(future(1)), "end_date": str(future(6))})
+    bookings = list(response.context["bookings"])
+    assert response.context["total_bookings"] == len(bookings)
+    assert response.context["total_revenue"] == sum(booking.total_price for booking in bookings)
+    response = client.get("/reports/bookings/", {"start_date": str(future(1)), "end_date": str(future(2))})
+    assert (response.context["total_bookings"], list(response.context["bookings"])) == (0, [])
+
+    response = client.get("/reports/dashboard/", {"end_date": str(future(2))})
+    assert response.context["total_bookings"] == 0
+
+
+@pytest.mark.django_db
+def test_monthly_revenue_is_one_query(vehicle, customer, django_assert_num_queries):
+    Booking.objects.create(customer=customer, vehicle=vehicle, start_date=date(2031, 2, 27),
+                           end_date=date(2031, 3, 2), total_price=100)
+    with django_assert_num_queries(1):
+        revenue = monthly_revenue(2031)
+    assert [row["revenue"] for row in revenue][:3] == [0, Decimal("100.00"), 0]
+
+
+@pytest.mark.django_db
+def test_report_summary_is_one_query(vehicles, customer, django_assert_num_queries):
+    for vehicle in vehicles:
+        Booking.objects.create(customer=customer, vehicle=vehicle, start_date=future(1), end_date=future(2), total_price=60)
+    Booking.objects.create(customer=customer, vehicle=vehicles[0], start_date=future(1), end_date=future(1),
+                           total_price=25, status=BookingStatus.CANCELLED.value)
+    with django_assert_num_queries(1):
+        summary = report_summary(Booking.objects.all())
+    assert rollup_summary(DailyBookingStat.objects.all()) == summary
+    assert summary["total_bookings"] == 3
+    assert summary["total_revenue"] == Decimal("145.00")
+    assert summary["by_status"] == [
+        {"status": "Pending", "count": 2, "revenue": Decimal("120.00")},
+        {"status": "Confirmed", "count": 0, "revenue": Decimal("0")},
+        {"status": "Cancelled", "count": 1, "revenue": Decimal("25.00")},
+        {"status": "Completed", "count": 0, "revenue": Decimal("0")},
+    ]
+    assert report_summary(Booking.objects.none())["total_bookings"] == 0
+    assert rollup_summary(DailyBookingStat.objects.none())["total_bookings"] == 0
@@ -0,0 +1,58 @@
+import pytest
+from datetime import date
+from apps.booking.enums import BookingStatus
+from apps.booking.models import Booking
+from apps.report.utils.calculations import vehicle_utilization
+from apps.vehicle.models import Vehicle
+from model_bakery import baker
+
+
+@pytest.fixture
+def fleet(db):
+    return baker.make(Vehicle, _quantity=3)
+
+
+def book(customer, vehicle, start, end, status=BookingStatus.CONFIRMED.value):
+    return Booking.objects.create(customer=customer, vehicle=vehicle, start_date=start, end_date=end, status=status)
+
+
+@pytest.mark.django_db
+def test_utilization_clips_bookings_to_the_window(customer, fleet):
+    first, second, third = fleet[:3]
+    # Started in the previous month: only its 3 days in March count
+    book(customer, first, date(2030, 2, 25), date(2030, 3, 3))
+    # Runs past the window: 2 days
+    book(customer, first, date(2030, 3, 30), date(2030, 4, 5))
+    book(customer, second, date(2030, 3, 10), date(2030, 3, 14), BookingStatus.COMPLETED.value)
+    # Cancelled and outside bookings do not count
+    book(customer, second, date(2030, 3, 20), date(2030, 3, 21), BookingStatus.CANCELLED.value)
+    book(customer, third, date(2030, 4, 1), date(2030, 4, 2))
+
+    report = {row["vehicle"].id: row for row in vehicle_utilization(date(2030, 3, 1), date(2030, 3, 31))}
+    assert report[first.id]["booked_days"] == 5
+    assert report[first.id]["utilization"] == round(5 / 31 * 100, 1)
+    assert report[second.id]["booked_days"] == 5
+    assert report[third.id]["booked_days"] == 0
+    assert report[third.id]["total_days"] == 31
+
+
+@pytest.mark.django_db
+def test_utilization_status_filter_and_single_query(customer, fleet, django_assert_num_queries):
+    book(customer, fleet[0], date(2030, 3, 10), date(2030, 3, 11), BookingStatus.CANCELLED.value)
+    book(customer, fleet[1], date(2030, 3, 10), date(2030, 3, 12), BookingStatus.PENDING.value)
+    with django_assert_num_queries(1):
+        report = vehicle_utilization(date(2030, 3, 1), date(2030, 3, 31), statuses=[BookingStatus.CANCELLED.value])
+    assert {row["vehicle"].id: row["booked_days"] for row in report if row["booked_days"]} == {fleet[0].id: 2}
+
+
+@pytest.mark.django_db
+def test_utilization_report_view_filters(admin_user, client, customer, fleet):
+    book(customer, fleet[0], date(2030, 3, 10), date(2030, 3, 11), BookingStatus.PENDING.value)
+    client.force_login(admin_user)
+    response = client.get("/reports/vehicle-utilization/", {
+        "start_date": "2030-03-01", "end_date": "2030-03-31", "status": "PENDING",
+    })
+    assert response.status_code == 200
+    assert response.context["start_date"] == date(2030, 3, 1)
+    rows = {row["vehicle"].id: row["booked_days"] for row in response.context["vehicles_data"]}
+    assert rows[fleet[0].id] == 2
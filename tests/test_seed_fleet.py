@@ -0,0 +1,57 @@
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Exists, OuterRef
+from apps.booking.availability import availability_index
+from apps.booking.enums import BookingStatus
+from apps.booking.models import Booking
+from apps.customer.models import Customer
+from apps.vehicle.models import Vehicle
+
+
+def seed(*args):
+    call_command(
+        "seed_fleet", "--vehicles", "20", "--customers", "30", "--bookings", "500", "--years", "1",
+        "--workers", "1", *args,
+    )
+
+
+def snapshot():
+    vehicles = list(Vehicle.objects.order_by('plate_number').values_list('plate_number', 'brand', 'model', 'daily_rate'))
+    bookings = sorted(Booking.objects.values_list(
+        'vehicle__plate_number', 'customer__user__username', 'start_date', 'end_date', 'status', 'total_price',
+    ))
+    return vehicles, bookings
+
+
+@pytest.mark.django_db
+def test_seed_fleet_generates_non_overlapping_bookings():
+    seed("--chunk-size", "100")
+    assert Vehicle.objects.count() == 20
+    assert Customer.objects.filter(user__username__startswith="seed42-").count() == 30
+    assert Booking.objects.count() == 500
+    assert set(Booking.objects.values_list('status', flat=True)) == {status.value for status in BookingStatus}
+
+    overlapping = Booking.objects.filter(
+        vehicle_id=OuterRef('vehicle_id'),
+        start_date__lte=OuterRef('end_date'),
+        end_date__gte=OuterRef('start_date'),
+    ).exclude(pk=OuterRef('pk'))
+    assert not Booking.objects.filter(Exists(overlapping)).exists()
+    assert availability_index.check() == []
+
+
+@pytest.mark.django_db
+def test_seed_fleet_is_deterministic_by_seed():
+    seed("--chunk-size", "100")
+    first = snapshot()
+    with pytest.raises(CommandError):
+        seed()
+    seed("--clear", "--chunk-size", "7")
+    assert snapshot() == first
+
+
+@pytest.mark.django_db
+def test_seed_fleet_rejects_bookings_that_do_not_fit():
+    with pytest.raises(CommandError):
+        call_command("seed_fleet", "--vehicles", "1", "--customers", "1", "--bookings", "1000", "--years", "1")
@@ -0,0 +1,70 @@
+import pytest
+from datetime import date, timedelta
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from apps.booking.models import Booking
+from apps.vehicle.models import Vehicle
+
+from tests.conftest import admin_client, user_client, customer
+
+
+@pytest.fixture
+def bookings(customer):
+    start = date.today() + timedelta(days=1)
+    return [
+        Booking.objects.create(
+            customer=customer, start_date=start, end_date=start, notes="call first",
+            vehicle=Vehicle.objects.create(brand="kia", model="Rio", year=2020, daily_rate=30, plate_number=f"KIA-{index}"),
+        )
+        for index in range(3)
+    ]
+
+
+def booking_select(queries):
+    # The last booking query loads the rows of the page
+    return [query["sql"] for query in queries if 'FROM "booking_booking"' in query["sql"]][-1]
+
+
+@pytest.mark.django_db
+def test_booking_fields_select_only_requested_columns(admin_client, bookings):
+    with CaptureQueriesContext(connection) as queries:
+        response = admin_client.get("/api/bookings/?fields=id,status")
+    assert response.status_code == 200
+    assert [set(item) for item in response.data["results"]] == [{"id", "status"}] * 3
+    sql = booking_select(queries)
+    assert '"notes"' not in sql
+    assert "JOIN" not in sql
+
+
+@pytest.mark.django_db
+def test_booking_expand_embeds_relations_in_one_query(admin_client, bookings, django_assert_num_queries):
+    # auth user + one joined page query, whatever the page size
+    with django_assert_num_queries(2):
+        response = admin_client.get("/api/bookings/?fields=id,vehicle&expand=vehicle,customer")
+    item = response.data["results"][0]
+    assert set(item) == {"id", "vehicle", "customer"}
+    assert item["vehicle"]["brand"] == "kia"
+    assert item["customer"]["id"] == bookings[0].customer_id
+
+
+@pytest.mark.django_db
+def test_booking_without_expand_returns_ids(admin_client, bookings):
+    item = admin_client.get("/api/bookings/").data["results"][0]
+    assert item["vehicle"] == bookings[-1].vehicle_id
+    assert item["notes"] == "call first"
+
+
+@pytest.mark.django_db
+def test_unknown_fields_are_rejected(admin_client, bookings):
+    assert admin_client.get("/api/bookings/?fields=id,secret").status_code == 400
+    assert admin_client.get("/api/bookings/?expand=payments").status_code == 400
+    assert admin_client.get("/api/vehicles/?expand=bookings").status_code == 400
+
+
+@pytest.mark.django_db
+def test_vehicle_list_fields(user_client, bookings):
+    with CaptureQueriesContext(connection) as queries:
+        response = user_client.get("/api/vehicles/?fields=id,brand")
+    assert [set(item) for item in response.data["results"]] == [{"id", "brand"}] * 3
+    vehicle_select = [query["sql"] for query in queries if 'FROM "vehicle_vehicle"' in query["sql"]][-1]
+    assert '"description"' not in vehicle_select
@@ -0,0 +1,131 @@
+import pytest
+from datetime import date, timedelta
+from django.utils import timezone
+from apps.booking.availability import availability_index
+from apps.booking.enums import BookingStatus
+from apps.booking.models import Booking
+from apps.booking.tasks import auto_cancel_booking_expired, update_status
+from apps.booking.transitions import InvalidTransition, run_action, transition, transition_in_batches
+from apps.vehicle.models import Vehicle
+
+from tests.conftest import admin_client, customer, vehicle
+
+
+def future(days):
+    return date.today() + timedelta(days=days)
+
+
+@pytest.fixture
+def pending_bookings(customer):
+    vehicles = Vehicle.objects.bulk_create([
+        Vehicle(brand="kia", model="Rio", year=2020, daily_rate=30, plate_number=f"KIA-{index}")
+        for index in range(30)
+    ])
+    return [
+        Booking.objects.create(customer=customer, vehicle=vehicle, start_date=future(2), end_date=future(3))
+        for vehicle in vehicles
+    ]
+
+
+@pytest.mark.django_db
+def test_approve_updates_status_only(admin_client, vehicle, customer):
+    booking = Booking.objects.create(
+        customer=customer, vehicle=vehicle, start_date=future(1), end_date=future(2), total_price=1,
+    )
+    response = admin_client.patch(f"/api/bookings/{booking.id}/approve/")
+    assert response.status_code == 200
+    booking.refresh_from_db()
+    assert booking.status == BookingStatus.CONFIRMED.value
+    assert booking.total_price == 1
+
+    response = admin_client.patch(f"/api/bookings/{booking.id}/approve/")
+    assert response.status_code == 400
+    assert admin_client.patch("/api/bookings/999999/approve/").status_code == 404
+
+
+@pytest.mark.django_db
+def test_change_status_follows_state_machine(admin_client, vehicle, customer):
+    booking = Booking.objects.create(customer=customer, vehicle=vehicle, start_date=future(1), end_date=future(2))
+    url = f"/api/bookings/{booking.id}/change-status/"
+    assert admin_client.patch(url, {"status": "completed"}).status_code == 400
+    assert admin_client.patch(url, {"status": "pending"}).status_code == 400
+    assert admin_client.patch(url, {"status": "cancelled"}).status_code == 200
+    assert availability_index.is_available(vehicle.id, future(1), future(2))
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("action, body", [
+    ("approve", {}), ("reject", {}), ("change-status", {"status": "cancelled"}),
+])
+def test_status_actions_answer_404_for_unknown_ids(admin_client, action, body):
+    assert admin_client.patch(f"/api/bookings/abc/{action}/", body).status_code == 404
+    assert admin_client.patch(f"/api/bookings/999999/{action}/", body).status_code == 404
+
+
+@pytest.mark.django_db
+def test_transition_is_compare_and_swap(vehicle, customer):
+    booking = Booking.objects.create(customer=customer, vehicle=vehicle, start_date=future(1), end_date=future(2))
+    assert [row.old_status for row in run_action('approve', [booking.id])] == [BookingStatus.PENDING.value]
+    assert run_action('approve', [booking.id]) == []
+    assert run_action('reject', [booking.id]) == []
+    with pytest.raises(InvalidTransition):
+        transition([booking.id], BookingStatus.PENDING.value)
+
+
+@pytest.mark.django_db
+def test_bulk_transition_reports_skipped_ids(admin_client, pending_bookings):
+    confirmed = pending_bookings[0]
+    run_action('approve', [confirmed.id])
+    ids = [booking.id for booking in pending_bookings]
+    response = admin_client.post("/api/bookings/bulk-transition/", {"action": "reject", "ids": ids}, format="json")
+    assert response.status_code == 200
+    assert response.data["applied"] == sorted(ids[1:])
+    assert response.data["skipped"] == [confirmed.id]
+    assert Booking.objects.filter(status=BookingStatus.CANCELLED.value).count() == 29
+    assert availability_index.check() == []
+
+
+@pytest.mark.django_db
+def test_bulk_transition_query_count_does_not_grow(admin_client, pending_bookings, django_assert_max_num_queries):
+    ids = [booking.id for booking in pending_bookings]
+    admin_client.post("/api/bookings/bulk-transition/", {"action": "approve", "ids": ids[:2]}, format="json")
+    # auth user + compare-and-swap UPDATE + report rollup upsert (+ savepoint statements)
+    with django_assert_max_num_queries(5):
+        response = admin_client.post("/api/bookings/bulk-transition/", {"action": "approve", "ids": ids}, format="json")
+    assert len(response.data["applied"]) == 28
+
+
+@pytest.mark.django_db
+def test_update_status_task_completes_ended_bookings(vehicle, customer):
+    booking = Booking.objects.create(
+        customer=customer, vehicle=vehicle, start_date=future(-5), end_date=future(-2),
+        status=BookingStatus.CONFIRMED.value,
+    )
+    assert update_status() == "Updated 1 bookings to COMPLETED status"
+    booking.refresh_from_db()
+    assert booking.status == BookingStatus.COMPLETED.value
+    assert availability_index.check() == []
+
+
+@pytest.mark.django_db
+def test_transition_in_batches_locks_bounded_chunks(pending_bookings):
+    candidates = Booking.objects.filter(status=BookingStatus.PENDING.value)
+    # Approved by an admin before the sweep reaches it: not a candidate any more
+    transition([pending_bookings[-1].id], BookingStatus.CONFIRMED.value)
+    batches = list(transition_in_batches(candidates, BookingStatus.CANCELLED.value, batch_size=7))
+    assert [len(rows) for rows, _ in batches] == [7, 7, 7, 7, 1]
+    assert all(elapsed_ms >= 0 for _, elapsed_ms in batches)
+    assert not candidates.exists()
+    assert availability_index.check() == []
+
+
+@pytest.mark.django_db
+def test_interrupted_sweep_resumes_on_next_run(pending_bookings):
+    Booking.objects.update(created_at=timezone.now() - timedelta(days=2))
+    candidates = Booking.objects.filter(status=BookingStatus.PENDING.value)
+    batches = transition_in_batches(candidates, BookingStatus.CANCELLED.value, batch_size=10)
+    next(batches)
+    batches.close()
+    assert candidates.count() == 20
+    assert auto_cancel_booking_expired(batch_size=8) == "Updated 20 bookings to CANCELLED status"
+    assert not candidates.exists()
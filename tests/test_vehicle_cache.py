@@ -0,0 +1,119 @@
+import json
+import pytest
+from datetime import date, timedelta
+from apps.booking.enums import BookingStatus
+from apps.booking.models import Booking
+from apps.vehicle.cache import availability_cache, month_buckets
+from apps.vehicle.models import Vehicle
+
+from tests.conftest import admin_client, cache_down, user_client, vehicles, customer
+
+
+def future(days):
+    return date.today() + timedelta(days=days)
+
+
+def available(client):
+    response = client.get(f"/api/vehicles/available/?start_date={future(10)}&end_date={future(12)}")
+    assert response.status_code == 200
+    return response.data["results"]
+
+
+def test_month_buckets_span_years():
+    assert month_buckets(date(2030, 11, 30), date(2031, 2, 1)) == ["2030-11", "2030-12", "2031-01", "2031-02"]
+
+
+@pytest.mark.django_db
+def test_available_is_served_from_cache(user_client, vehicles, django_assert_num_queries):
+    first = available(user_client)
+    # Only the authenticated user is loaded on a hit
+    with django_assert_num_queries(1):
+        assert available(user_client) == first
+    stats = availability_cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+@pytest.mark.django_db
+def test_available_is_computed_when_the_cache_is_down(user_client, admin_client, vehicles, cache_down):
+    assert [vehicle["id"] for vehicle in available(user_client)] == [vehicle.id for vehicle in reversed(vehicles)]
+    response = admin_client.get("/api/vehicles/available/cache-stats/?reset=true")
+    assert response.status_code == 200
+    assert response.data["hit_ratio"] is None
+
+
+@pytest.mark.django_db
+def test_booking_change_invalidates_its_months_only(
+        user_client, vehicles, customer, django_capture_on_commit_callbacks):
+    available(user_client)
+    with django_capture_on_commit_callbacks(execute=True):
+        booking = Booking.objects.create(
+            customer=customer, vehicle=vehicles[0], start_date=future(11), end_date=future(11),
+        )
+    assert [item["id"] for item in available(user_client)] == [vehicles[1].id]
+
+    far = f"/api/vehicles/available/?start_date={future(400)}&end_date={future(401)}"
+    user_client.get(far)
+    with django_capture_on_commit_callbacks(execute=True):
+        booking.status = BookingStatus.CANCELLED.value
+        booking.save()
+    user_client.get(far)
+    assert len(available(user_client)) == 2
+    # The far range was not touched by the booking and stayed cached
+    assert availability_cache.stats()["hits"] == 1
+
+
+@pytest.mark.django_db
+def test_vehicle_update_refreshes_only_its_payload(
+        admin_client, vehicles, django_capture_on_commit_callbacks):
+    available(admin_client)
+    with django_capture_on_commit_callbacks(execute=True):
+        vehicles[0].daily_rate = 75
+        vehicles[0].save()
+    payloads = {item["id"]: item for item in available(admin_client)}
+    assert payloads[vehicles[0].id]["daily_rate"] == "75.00"
+    stats = availability_cache.stats()
+    assert stats["hits"] == 1
+    assert (stats["vehicle_hits"], stats["vehicle_misses"]) == (1, 3)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        vehicles[1].vehicle_type = "van"
+        vehicles[1].save()
+    response = admin_client.get(
+        f"/api/vehicles/available/?start_date={future(10)}&end_date={future(12)}&vehicle_type=car"
+    )
+    assert [item["id"] for item in response.data["results"]] == [vehicles[0].id]
+
+
+@pytest.mark.django_db
+def test_cache_stats_is_admin_only(user_client, vehicles):
+    assert user_client.get("/api/vehicles/available/cache-stats/").status_code == 403
+
+
+@pytest.mark.django_db
+def test_available_is_paginated_by_page_number(user_client, vehicles):
+    for index in range(2):
+        Vehicle.objects.create(brand="kia", model="Rio", year=2020, daily_rate=30, plate_number=f"KIA-{index}")
+    url = f"/api/vehicles/available/?start_date={future(10)}&end_date={future(12)}"
+    first = user_client.get(url).data
+    assert set(first) == {"count", "next", "previous", "results"}
+    assert first["count"] == 4
+    assert len(first["results"]) == 3
+    assert "page=2" in first["next"] and first["previous"] is None
+    second = user_client.get(first["next"]).data
+    assert len(second["results"]) == 1
+    assert second["next"] is None and second["previous"] is not None
+    assert {item["id"] for item in first["results"] + second["results"]} == {
+        vehicle.id for vehicle in Vehicle.objects.all()
+    }
+
+
+@pytest.mark.django_db
+def test_available_streams_ndjson(user_client, vehicles, customer):
+    Booking.objects.create(customer=customer, vehicle=vehicles[0], start_date=future(11), end_date=future(11))
+    response = user_client.get(
+        f"/api/vehicles/available/?start_date={future(10)}&end_date={future(12)}&stream=ndjson"
+    )
+    assert response.status_code == 200
+    assert response["Content-Type"] == "application/x-ndjson"
+    lines = b"".join(response.streaming_content).decode().splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [vehicles[1].id]
@@ -0,0 +1,109 @@
+import pytest
+from datetime import date, timedelta
+from apps.booking.enums import BookingStatus
+from apps.booking.models import Booking
+from apps.vehicle.models import Vehicle
+from model_bakery import baker
+
+from tests.conftest import user_client, vehicle, vehicles, customer
+
+
+def day(offset):
+    return date(2030, 3, 1) + timedelta(days=offset)
+
+
+@pytest.fixture
+def bookings(customer, vehicles):
+    return [
+        Booking.objects.create(customer=customer, vehicle=vehicles[0], start_date=day(-3), end_date=day(1)),
+        Booking.objects.create(customer=customer, vehicle=vehicles[0], start_date=day(5), end_date=day(6)),
+        Booking.objects.create(
+            customer=customer, vehicle=vehicles[1], start_date=day(2), end_date=day(3),
+            status=BookingStatus.CANCELLED.value,
+        ),
+    ]
+
+
+@pytest.mark.django_db
+def test_vehicle_calendar_days(user_client, vehicles, bookings):
+    response = user_client.get(f"/api/vehicles/{vehicles[0].id}/calendar/?from={day(0)}&to={day(6)}")
+    assert response.status_code == 200
+    assert [entry["status"] for entry in response.data["days"]] == [
+        "occupied", "occupied", "free", "free", "free", "occupied", "occupied",
+    ]
+
+
+@pytest.mark.django_db
+def test_vehicle_calendar_free_intervals(user_client, vehicles, bookings):
+    response = user_client.get(f"/api/vehicles/{vehicles[0].id}/calendar/?from={day(0)}&to={day(9)}&mode=intervals")
+    assert response.status_code == 200
+    assert response.data["free_intervals"] == [
+        {"start_date": day(2), "end_date": day(4)},
+        {"start_date": day(7), "end_date": day(9)},
+    ]
+
+
+@pytest.mark.django_db
+def test_fleet_calendar_uses_one_booking_query(user_client, vehicles, bookings, django_assert_num_queries):
+    # auth user + vehicle count + vehicle page + bookings
+    with django_assert_num_queries(4):
+        response = user_client.get(f"/api/vehicles/calendar/?from={day(0)}&to={day(30)}&mode=intervals")
+    assert response.status_code == 200
+    calendars = {entry["vehicle"]: entry["free_intervals"] for entry in response.data["results"]}
+    assert calendars[vehicles[1].id] == [{"start_date": day(0), "end_date": day(30)}]
+    assert len(calendars[vehicles[0].id]) == 2
+
+
+@pytest.mark.django_db
+def test_vehicle_calendar_requires_window(user_client, vehicle):
+    response = user_client.get(f"/api/vehicles/{vehicle.id}/calendar/?from={day(0)}")
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_availability_matrix(user_client, vehicles, bookings, django_assert_num_queries):
+    windows = f"{day(0)}:{day(1)},{day(2)}:{day(4)},{day(4)}:{day(5)}"
+    # auth user + vehicle count + page of vehicle ids + bookings over the window clusters + free counts
+    with django_assert_num_queries(5):
+        response = user_client.get(f"/api/vehicles/availability-matrix/?windows={windows}")
+    assert response.status_code == 200
+    rows = dict(zip(response.data["vehicles"], response.data["matrix"]))
+    assert rows[vehicles[0].id] == [False, True, False]
+    assert rows[vehicles[1].id] == [True, True, True]
+    assert [window["free_vehicles"] for window in response.data["windows"]] == [1, 2, 1]
+    assert set(response.data["timings"]) == {"parse_ms", "fetch_ms", "evaluate_ms"}
+    assert (response.data["count"], response.data["next"]) == (2, None)
+
+
+@pytest.mark.django_db
+def test_availability_matrix_rejects_bad_window(user_client, vehicles):
+    response = user_client.get(f"/api/vehicles/availability-matrix/?windows={day(3)}:{day(1)}")
+    assert response.status_code == 400
+    # A single window longer than a year
+    response = user_client.get(f"/api/vehicles/availability-matrix/?windows={day(1)}:9999-12-31")
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_availability_matrix_paginates_vehicle_rows(user_client):
+    fleet = baker.make(Vehicle, _quantity=5)
+    url = f"/api/vehicles/availability-matrix/?windows={day(1)}:{day(2)}"
+    first = user_client.get(url).data
+    second = user_client.get(first["next"]).data
+    assert first["count"] == 5
+    assert len(first["vehicles"]) == len(first["matrix"]) == 3
+    assert sorted(first["vehicles"] + second["vehicles"]) == sorted(vehicle.id for vehicle in fleet)
+    # Counted over every matching vehicle, not just the page
+    assert first["windows"][0]["free_vehicles"] == second["windows"][0]["free_vehicles"] == 5
+
+
+@pytest.mark.django_db
+def test_availability_matrix_accepts_distant_windows(user_client, customer, vehicles, bookings):
+    Booking.objects.create(customer=customer, vehicle=vehicles[1], start_date=day(398), end_date=day(400))
+    windows = f"{day(0)}:{day(6)},{day(395)}:{day(401)},{day(402)}:{day(408)}"
+    response = user_client.get(f"/api/vehicles/availability-matrix/?windows={windows}")
+    assert response.status_code == 200
+    rows = dict(zip(response.data["vehicles"], response.data["matrix"]))
+    assert rows[vehicles[0].id] == [False, True, True]
+    assert rows[vehicles[1].id] == [True, False, True]
+    assert [window["free_vehicles"] for window in response.data["windows"]] == [1, 1, 2]
@@ -0,0 +1,56 @@
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class VerificationStub:
+    """
+    Local stand-in for the customer verification service.
+
+    GET /customers/<id>/status answers `statuses.get(id, default)`.
+    Ids in `flaky` fail once with 503 before answering; ids in `broken`
+    always answer 500. `requests` counts the calls per id and `times`
+    records when each call arrived (monotonic clock).
+    """
+
+    def __init__(self, default="Verified"):
+        self.default = default
+        self.statuses, self.flaky, self.broken = {}, set(), set()
+        self.requests = Counter()
+        self.times = []
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                customer_id = int(self.path.strip('/').split('/')[1])
+                with stub.lock:
+                    stub.requests[customer_id] += 1
+                    stub.times.append(time.monotonic())
+                    first_call = stub.requests[customer_id] == 1
+                if customer_id in stub.broken or (customer_id in stub.flaky and first_call):
+                    self.send_response(500 if customer_id in stub.broken else 503)
+                    self.end_headers()
+                    return
+                body = json.dumps({"status": stub.statuses.get(customer_id, stub.default)}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()